@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Async Runtime - One persistent event loop per process, running in a background thread.
+Synchronous callers (Gradio handlers, CLI, workers) submit coroutines to it instead of calling
+asyncio.run per request, and coroutines on other loops await submit(), so the provider clients'
+keep-alive connection pools stay bound to a single living loop and are reused across requests.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+async def _next_item(async_iterator: AsyncIterator[T]) -> T:
+    return await async_iterator.__anext__() # Wrapped: run_coroutine_threadsafe needs a real coroutine
+
+
+async def _close_iterator(async_iterator: AsyncIterator[Any]):
+    aclose = getattr(async_iterator, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+class BackgroundLoop:
+    """An asyncio loop running forever in a daemon thread, with a sync facade."""
+
+    def __init__(self, name: str = "infogen-async-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def run(self, coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Runs a coroutine on the background loop and blocks the calling thread for its result."""
+        if self.in_loop_thread():
+            raise RuntimeError("run_sync() called from the background loop itself; await the coroutine instead.")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    async def submit(self, coroutine: Awaitable[T]) -> T:
+        """Awaits a coroutine on the background loop from any other event loop (e.g. an ASGI server's),
+        so it still uses the clients and connection pools bound to this loop. Cancelling the caller
+        cancels the submitted task."""
+        if asyncio.get_running_loop() is self.loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self.loop))
+
+    def iterate(self, async_iterator: AsyncIterator[T]) -> Iterator[T]:
+        """Drives an async iterator from synchronous code (e.g. a Gradio generator handler)."""
+        try:
+            while True:
+                try:
+                    yield self.run(_next_item(async_iterator))
+                except StopAsyncIteration:
+                    break
+        finally:
+            self.run(_close_iterator(async_iterator))
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_loop_pid: Optional[int] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Process-wide loop, created lazily (and re-created in a forked child, where the thread does not exist)."""
+    global _background_loop, _background_loop_pid
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            _background_loop = BackgroundLoop()
+            _background_loop_pid = os.getpid()
+        return _background_loop
+
+
+def run_sync(coroutine: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Sync facade: run a coroutine on the shared background loop."""
+    return get_background_loop().run(coroutine, timeout)
+
+
+def iterate_sync(async_iterator: AsyncIterator[T]) -> Iterator[T]:
+    """Sync facade: iterate an async iterator on the shared background loop."""
+    return get_background_loop().iterate(async_iterator)
+
+
+@atexit.register
+def _stop_background_loop():
+    if _background_loop is not None and _background_loop_pid == os.getpid():
+        _background_loop.stop()
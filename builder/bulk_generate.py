@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Bulk Generate - Headless catalog generation from a manifest, for unattended (e.g. nightly) runs.
+
+    python bulk_generate.py manifest.json --set-concurrency 4 --rpm 300 --max-concurrent-calls 12
+
+Manifest (JSON):
+{
+  "defaults": {"provider": "gemini_openai", "max_topics": 10, "batch_size": null},
+  "sets": [
+    {"creator_id": "creator_001", "guidance": "História da exploração lunar",
+     "source_file": "sources/lua.md",                 # topics are extracted from it...
+     "set": {"title": "A Corrida Espacial", "difficulty_level": "beginner", "tags": ["lua"]}},
+    {"creator_id": "creator_002", "guidance": "Hidratação",
+     "topics": ["Quanto beber por dia", "Mitos da água"]}   # ...or given directly
+  ]
+}
+Relative source_file paths are resolved against the manifest's folder. A JSON report with per-set
+results, throughput, failures and estimated cost is written next to the data directory (or --report).
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any
+
+from dotenv import load_dotenv
+
+BUILDER_DIR = Path(__file__).resolve().parent
+dotenv_path = BUILDER_DIR.parent / ".env"
+if dotenv_path.exists():
+    load_dotenv(dotenv_path=dotenv_path)
+
+from json_database import JSONDatabaseManager
+from content_manager import ContentManager
+from metrics import METRICS
+
+DEFAULT_MAX_TOPICS = 10
+
+
+def load_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
+    """Returns the set entries with defaults applied; raises ValueError on invalid entries."""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    defaults = manifest.get("defaults", {})
+    entries = []
+    for position, raw_entry in enumerate(manifest.get("sets", []), 1):
+        entry = {**defaults, **raw_entry}
+        if not entry.get("creator_id"):
+            raise ValueError(f"Set #{position}: 'creator_id' is required")
+        if not entry.get("topics") and not entry.get("source_file"):
+            raise ValueError(f"Set #{position} ({entry['creator_id']}): provide 'topics' or 'source_file'")
+        if not entry.get("provider"):
+            raise ValueError(f"Set #{position} ({entry['creator_id']}): 'provider' is required (here or in defaults)")
+        if entry.get("source_file"):
+            entry["source_file"] = str((manifest_path.parent / entry["source_file"]).resolve())
+        entry["position"] = position
+        entries.append(entry)
+    return entries
+
+
+def run_set(content_manager: ContentManager, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Topic extraction (if needed) and card generation for one manifest entry.
+    Called from several threads; the LLM calls of all sets share the generator's background event loop."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"position": entry["position"], "creator_id": entry["creator_id"], "status": "failed",
+                              "set_id": None, "job_id": None, "topics": 0, "cards_done": 0, "cards_failed": 0, "error": None}
+    try:
+        creator = content_manager.db.get_creator(entry["creator_id"])
+        if not creator:
+            raise ValueError(f"Creator '{entry['creator_id']}' not found")
+        creator_name = creator["display_name"]
+        guidance = entry.get("guidance", "")
+
+        topics = entry.get("topics")
+        if not topics:
+            with open(entry["source_file"], 'r', encoding='utf-8') as f:
+                source_text = f.read()
+            topics = content_manager.extract_topics_with_ai(source_text, guidance, creator_name, entry["provider"])
+            if not topics:
+                raise ValueError(f"No topics extracted from {entry['source_file']}")
+        topics = topics[:entry.get("max_topics") or DEFAULT_MAX_TOPICS]
+        result["topics"] = len(topics)
+
+        job = content_manager.create_generation_job(creator_name, guidance, topics, entry["provider"],
+                                                    entry.get("batch_size"), entry.get("set"))
+        result.update(set_id=job.set_id, job_id=job.job_id)
+        job = content_manager.run_generation_job(job)
+        counts = job.counts()
+        result.update(status=job.status, cards_done=counts["done"], cards_failed=counts["failed"] + counts["pending"] + counts["generated"])
+    except Exception as e:
+        result["error"] = str(e)
+        print(f"❌ Set #{entry['position']} ({entry['creator_id']}) failed: {e}")
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def build_report(results: List[Dict[str, Any]], wall_seconds: float, args: argparse.Namespace) -> Dict[str, Any]:
+    usage = METRICS.llm_usage_by_model()
+    cards_done = sum(r["cards_done"] for r in results)
+    return {
+        "started_at": args.started_at,
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "manifest": str(args.manifest),
+        "limits": {"set_concurrency": args.set_concurrency, "requests_per_minute": args.rpm,
+                   "max_concurrent_calls": args.max_concurrent_calls},
+        "totals": {
+            "sets": len(results),
+            "sets_completed": sum(1 for r in results if r["status"] == "completed"),
+            "sets_partial": sum(1 for r in results if r["status"] == "partial"),
+            "sets_failed": sum(1 for r in results if r["status"] == "failed"),
+            "cards_generated": cards_done,
+            "cards_failed": sum(r["cards_failed"] for r in results),
+            "wall_seconds": round(wall_seconds, 2),
+            "cards_per_minute": round(cards_done / wall_seconds * 60, 2) if wall_seconds else 0.0,
+            "llm_calls": int(sum(row["requests"] for row in usage)),
+            "llm_errors": int(sum(row["errors"] for row in usage)),
+            "prompt_tokens": int(sum(row["prompt_tokens"] for row in usage)),
+            "cached_prompt_tokens": int(sum(row["cached_tokens"] for row in usage)),
+            "completion_tokens": int(sum(row["completion_tokens"] for row in usage)),
+            "estimated_cost_usd": round(sum(row["cost_usd"] for row in usage), 4),
+        },
+        "usage_by_model": usage,
+        "sets": sorted(results, key=lambda r: r["position"]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate many content sets from a manifest without the Gradio UI.")
+    parser.add_argument("manifest", type=Path, help="Path to the JSON manifest")
+    parser.add_argument("--data-dir", default=str(BUILDER_DIR / "data"), help="Builder data directory")
+    parser.add_argument("--set-concurrency", type=int, default=2, help="Sets processed at the same time")
+    parser.add_argument("--rpm", type=float, default=None, help="Global LLM requests per minute (all sets and providers)")
+    parser.add_argument("--max-concurrent-calls", type=int, default=8, help="Global cap on LLM calls in flight")
+    parser.add_argument("--report", type=Path, default=None, help="Report path (default: <data-dir>/reports/bulk_<timestamp>.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the manifest and exit")
+    args = parser.parse_args()
+    args.started_at = datetime.now().isoformat(timespec="seconds")
+
+    try:
+        entries = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid manifest: {e}")
+        return 2
+    print(f"📋 Manifest {args.manifest}: {len(entries)} set(s)")
+    if args.dry_run:
+        return 0
+
+    content_manager = ContentManager(JSONDatabaseManager(data_dir=args.data_dir))
+    if not content_manager.content_generator:
+        print("❌ No content generator available. Check API keys.")
+        return 2
+    content_manager.content_generator.set_rate_limit(args.rpm, args.max_concurrent_calls)
+    if content_manager.content_generator.rate_limiter:
+        print(f"🚦 Global LLM limit: {content_manager.content_generator.rate_limiter.describe()}")
+
+    started = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args.set_concurrency), thread_name_prefix="bulk-set") as executor:
+        futures = [executor.submit(run_set, content_manager, entry) for entry in entries]
+        for finished_count, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            print(f"[{finished_count}/{len(entries)}] {result['creator_id']} -> {result['set_id']}: {result['status']}, "
+                  f"{result['cards_done']}/{result['topics']} cards in {result['seconds']}s")
+
+    report = build_report(results, time.perf_counter() - started, args)
+    report_path = args.report or Path(args.data_dir) / "reports" / f"bulk_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    totals = report["totals"]
+    print(f"\n✅ {totals['sets_completed']}/{totals['sets']} sets complete, {totals['sets_partial']} partial, {totals['sets_failed']} failed")
+    print(f"   {totals['cards_generated']} cards in {totals['wall_seconds']}s ({totals['cards_per_minute']} cards/min), "
+          f"{totals['llm_calls']} LLM calls, est. cost ${totals['estimated_cost_usd']}")
+    print(f"📄 Report written to {report_path}")
+    # Non-zero exit lets cron/CI flag runs that need attention (failed sets can be resumed by job_id)
+    return 0 if totals["sets_failed"] == 0 and totals["sets_partial"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
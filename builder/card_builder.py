@@ -7,6 +7,8 @@ Main application with improved UI and modular structure
 import gradio as gr
 import json
 import os
+import time
+import traceback
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import Optional
@@ -29,6 +31,10 @@ try:
     from content_manager import ContentManager
     from core_models import ContentType # For category choices if needed, though manager handles it
     from unified_generator import LLMProvider # For default provider value
+    from metrics import METRICS, combined_registry, start_metrics_server
+    from job_queue import (JobQueue, KIND_GENERATE_CARDS, KIND_EXTRACT_TOPICS, KIND_RESUME_GENERATION,
+                           COMPLETED, FAILED, CANCELLED, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH)
+    from worker import start_worker_pool
 except ImportError as e:
     print(f"Critical Error: Failed to import one or more project modules: {e}")
     print("Please ensure all .py files (json_database, creator_manager, content_manager, core_models, unified_generator) are in the 'builder' directory and there are no circular dependencies.")
@@ -53,6 +59,13 @@ except ImportError as e:
         def get_generator_status(self): return "Error: ContentManager module missing"
         def get_homepage_preview(self): return "{}"
     class LLMProvider(Enum): GEMINI_OPENAI = "gemini_openai"
+    METRICS = None
+    def start_metrics_server(port, **kwargs): print("Metrics module missing; /metrics endpoint disabled.")
+    JobQueue = None
+    KIND_GENERATE_CARDS, KIND_EXTRACT_TOPICS, KIND_RESUME_GENERATION = "generate_cards", "extract_topics", "resume_generation"
+    COMPLETED, FAILED, CANCELLED = "completed", "failed", "cancelled"
+    PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH = -10, 0, 10
+    def start_worker_pool(processes, data_dir=None, queue_path=None): print("Worker module missing; background jobs disabled."); return []
 
 
 class InfogenApp:
@@ -67,6 +80,9 @@ class InfogenApp:
         self.db = JSONDatabaseManager(data_dir=str(self.data_dir_path))
         self.creator_manager = CreatorManager(self.db)
         self.content_manager = ContentManager(self.db)
+        # Background generation queue shared with worker.py processes
+        self.queue_path = self.data_dir_path / "job_queue.sqlite3"
+        self.job_queue = JobQueue(str(self.queue_path)) if JobQueue else None
         print(f"InfogenApp initialized. Data directory resolved to: {self.data_dir_path.resolve()}")
     
     def create_new_creator_with_clear(self, display_name: str, description: str,
@@ -140,9 +156,22 @@ class InfogenApp:
         except Exception as e:
             return f"Error getting database status: {str(e)}"
     
+    def usage_registry(self):
+        """This process's metrics plus the latest snapshot of every worker process that reported since startup."""
+        if not self.job_queue:
+            return METRICS
+        return combined_registry(METRICS, self.job_queue.worker_metrics(updated_since=METRICS.started_at))
+
+    def get_usage_status(self) -> str:
+        """Token, latency and cost totals per provider/model since startup, background workers included."""
+        try:
+            return self.usage_registry().summary_markdown()
+        except Exception as e:
+            return f"Error getting usage metrics: {str(e)}"
+    
     def refresh_all_status(self):
-        """Refresh both API and database status"""
-        return self.get_api_status_display(), self.get_database_status()
+        """Refresh API, database and usage status"""
+        return self.get_api_status_display(), self.get_database_status(), self.get_usage_status()
     
     def get_creator_choices_for_content(self) -> list:
         """Get creator choices for content generation (display names only)"""
@@ -155,8 +184,60 @@ class InfogenApp:
         except Exception as e:
             return [f"Error loading creators: {str(e)}"]
     
-    def extract_topics_from_content(self, creator_name, guidance, input_method, content_text, content_file, provider_str):
-        """Extract topics from user content using AI"""
+    QUEUE_POLL_INTERVAL_SECONDS = 1.0
+    EXTRACTION_TIMEOUT_SECONDS = 300 # Then the topics only show up in the 🗂️ Background Jobs tab
+
+    def poll_queue_job(self, queue_id: str, timeout: Optional[float] = None):
+        """Yields the queue entry every poll interval until it finishes (last yield) or the timeout passes."""
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            job = self.job_queue.get(queue_id)
+            yield job
+            if job is None or job["status"] in (COMPLETED, FAILED, CANCELLED):
+                return
+            if deadline and time.time() > deadline:
+                return
+            time.sleep(self.QUEUE_POLL_INTERVAL_SECONDS)
+
+    @staticmethod
+    def extraction_outputs(status: str, topics_list: Optional[list] = None):
+        """Outputs of the extraction handlers: status, topic list HTML, checkboxes, topics state, selection count,
+        and visibility of the selection row, validate button and generate button."""
+        if not topics_list:
+            return (status, "", gr.update(choices=[], value=[]), [], "", gr.update(visible=False),
+                    gr.update(visible=False), gr.update(visible=False))
+
+        # Format topics for display
+        topic_display_html = f"<div style='padding: 10px; background: #f5f5f5; border-radius: 8px;'>"
+        topic_display_html += f"<h4>Extracted {len(topics_list)} Topics:</h4><ul>"
+        for i, topic in enumerate(topics_list, 1):
+            topic_display_html += f"<li><strong>{i}.</strong> {topic}</li>"
+        topic_display_html += "</ul></div>"
+
+        # Initial selection count
+        count_html = f"<p><strong>Selected:</strong> 0 of {len(topics_list)} topics</p>"
+
+        return (
+            status,
+            topic_display_html,
+            gr.update(choices=topics_list, value=[]),  # Update checkboxes with new choices and empty selection
+            topics_list,  # store in state for select all functionality
+            count_html,
+            gr.update(visible=True),  # Show topic_selection_row
+            gr.update(visible=True),  # Show validate_topics_btn
+            gr.update(visible=False)  # Hide generate_cards_btn until validation
+        )
+
+    def refresh_topics_from_content(self, creator_name, guidance, input_method, content_text, content_file, provider_str):
+        """Extract topics again, ignoring (and replacing) the cached result for this content"""
+        yield from self.extract_topics_from_content(creator_name, guidance, input_method, content_text, content_file,
+                                                    provider_str, use_cache=False)
+
+    def extract_topics_from_content(self, creator_name, guidance, input_method, content_text, content_file, provider_str,
+                                    use_cache=True):
+        """Extract topics from user content using AI.
+        The extraction is enqueued for the worker processes and polled until it finishes
+        (it runs in this process only when the queue is unavailable)."""
         try:
             print(f"\n🔍 UI: extract_topics_from_content called")
             print(f"   Creator: {creator_name}, Guidance: '{guidance[:50]}...', Input: {input_method}, Provider: {provider_str}")
@@ -173,53 +254,63 @@ class InfogenApp:
             if not content_to_process or len(content_to_process.strip()) < 50:
                 msg = "❌ Content too short (min 50 chars)."
                 print(msg)
-                return (msg, "", gr.update(choices=[], value=[]), [], "", gr.update(visible=False), 
-                       gr.update(visible=False), gr.update(visible=False))
+                yield self.extraction_outputs(msg)
+                return
             
             if not creator_name or creator_name.startswith("No creators") or creator_name.startswith("Error loading"):
                 msg = "❌ Please select a valid creator first."
                 print(msg)
-                return (msg, "", gr.update(choices=[], value=[]), [], "", gr.update(visible=False), 
-                       gr.update(visible=False), gr.update(visible=False))
-            
-            print(f"   Content and creator validated, calling ContentManager for AI extraction...")
+                yield self.extraction_outputs(msg)
+                return
             
-            topics_list = self.content_manager.extract_topics_with_ai(content_to_process, guidance, creator_name, provider_str)
-            
-            print(f"   ContentManager returned {len(topics_list)} topics: {topics_list}")
+            if not self.job_queue:
+                print(f"   Content and creator validated, calling ContentManager for AI extraction...")
+                topics_list, from_cache = self.content_manager.extract_topics_with_ai(
+                    content_to_process, guidance, creator_name, provider_str, use_cache=use_cache, return_cache_status=True)
+            else:
+                # Interactive step: ahead of normal-priority generation jobs
+                queue_id = self.job_queue.enqueue(
+                    KIND_EXTRACT_TOPICS,
+                    {"creator_name": creator_name, "guidance": guidance, "content": content_to_process,
+                     "provider": provider_str, "use_cache": use_cache},
+                    priority=PRIORITY_HIGH
+                )
+                job = None
+                for job in self.poll_queue_job(queue_id, timeout=self.EXTRACTION_TIMEOUT_SECONDS):
+                    if job and job["status"] not in (COMPLETED, FAILED, CANCELLED):
+                        waiting = job["message"] or "Waiting for a background worker..."
+                        yield self.extraction_outputs(f"⏳ {waiting} (job {queue_id})")
+
+                if not job or job["status"] not in (COMPLETED, FAILED, CANCELLED):
+                    yield self.extraction_outputs(f"⏳ Extraction job {queue_id} is still waiting or running; "
+                                                  f"its topics will be listed in the 🗂️ Background Jobs tab.")
+                    return
+                if job["status"] == CANCELLED:
+                    yield self.extraction_outputs(f"🛑 Extraction job {queue_id} was cancelled.")
+                    return
+                if job["status"] == FAILED:
+                    yield self.extraction_outputs(f"❌ Failed to extract topics: {job['error']}")
+                    return
+                result = job["result"] or {}
+                topics_list, from_cache = result.get("topics", []), result.get("from_cache", False)
+            
+            print(f"   Extraction returned {len(topics_list)} topics: {topics_list}")
             
             if not topics_list:
                 msg = "❌ Failed to extract topics. Check content, API keys, or console logs."
                 print(msg)
-                return (msg, "", gr.update(choices=[], value=[]), [], "", gr.update(visible=False), 
-                       gr.update(visible=False), gr.update(visible=False))
-            
-            # Format topics for display
-            topic_display_html = f"<div style='padding: 10px; background: #f5f5f5; border-radius: 8px;'>"
-            topic_display_html += f"<h4>Extracted {len(topics_list)} Topics:</h4><ul>"
-            for i, topic in enumerate(topics_list, 1):
-                topic_display_html += f"<li><strong>{i}.</strong> {topic}</li>"
-            topic_display_html += "</ul></div>"
-            
-            # Initial selection count
-            count_html = f"<p><strong>Selected:</strong> 0 of {len(topics_list)} topics</p>"
+                yield self.extraction_outputs(msg)
+                return
             
-            return (
-                f"✅ Extracted {len(topics_list)} topics. Select the ones you want to generate cards for:",
-                topic_display_html,
-                gr.update(choices=topics_list, value=[]),  # Update checkboxes with new choices and empty selection
-                topics_list,  # store in state for select all functionality
-                count_html,
-                gr.update(visible=True),  # Show topic_selection_row
-                gr.update(visible=True),  # Show validate_topics_btn
-                gr.update(visible=False)  # Hide generate_cards_btn until validation
+            yield self.extraction_outputs(
+                f"✅ Extracted {len(topics_list)} topics{' (cached result — use 🔄 Re-extract to refresh)' if from_cache else ''}. Select the ones you want to generate cards for:",
+                topics_list
             )
             
         except Exception as e:
             print(f"💥 Exception in UI extract_topics_from_content: {e}")
             traceback.print_exc()
-            return (f"❌ Error extracting topics: {str(e)}", "", gr.update(choices=[], value=[]), [], "", 
-                   gr.update(visible=False), gr.update(visible=False), gr.update(visible=False))
+            yield self.extraction_outputs(f"❌ Error extracting topics: {str(e)}")
 
     def read_uploaded_file(self, temp_file_wrapper) -> str:
         """Reads content from a Gradio temporary file object."""
@@ -308,67 +399,154 @@ class InfogenApp:
             traceback.print_exc()
             return f"❌ Error validating topics: {str(e)}"
     
-    def generate_content_from_topics(self, creator_name, guidance, selected_topics, provider_str):
-        """Generate content cards from selected topics with visual feedback."""
+    def render_live_cards_html(self, live_cards: dict, total: int) -> str:
+        """Renders the cards being streamed, in topic order, for the live preview panel."""
+        html = "<div style='max-height: 600px; overflow-y: auto;'>"
+        for index in sorted(live_cards):
+            entry = live_cards[index]
+            card = entry.get('card') or {}
+            state = entry.get('state', 'streaming')
+            border = {'done': '#28a745', 'error': '#dc3545'}.get(state, '#ffc107')
+            html += f"""
+                <div style='border: 2px solid {border}; margin: 10px 0; padding: 15px; border-radius: 8px; background: #f9f9f9;'>
+                    <p style='color: #666; margin: 0;'>Card {index} of {total} · {entry.get('topic', '')} · {state}</p>
+                    <h3 style='color: #333;'>{card.get('title', '...')}</h3>
+                    <p><strong>Summary:</strong> {card.get('summary', '')}</p>
+                    <p style='white-space: pre-wrap;'>{card.get('detailed_content', '')}</p>
+                    {f"<p><strong>Keywords:</strong> {', '.join(card.get('keywords', []))}</p>" if card.get('keywords') else ''}
+                    {f"<p style='color: #dc3545;'>{entry['error']}</p>" if entry.get('error') else ''}
+                </div>
+                """
+        html += "</div>"
+        return html
+
+    def generate_content_from_topics(self, creator_name, guidance, selected_topics, provider_str, live_preview=True,
+                                     run_in_background=False, priority_label="Normal"):
+        """Generate content cards from selected topics with visual feedback.
+        Yields (status, live_html) so Gradio can show each card filling in while it streams.
+        With run_in_background, the job is only enqueued for the worker processes."""
         try:
             validation_result = self.validate_topic_format(selected_topics)
             if not validation_result.startswith("✅"):
-                return f"Validation Failed: {validation_result}"
+                yield f"Validation Failed: {validation_result}", ""
+                return
             
             topics = [topic.strip() for topic in selected_topics if topic.strip()]
             
             print(f"UI: Generating content for {len(topics)} selected topics. Creator: {creator_name}, Provider: {provider_str}")
+
+            if run_in_background:
+                if not self.job_queue:
+                    yield "❌ Background queue unavailable. Check console logs for details.", ""
+                    return
+                queue_id = self.job_queue.enqueue(
+                    KIND_GENERATE_CARDS,
+                    {"creator_name": creator_name, "guidance": guidance, "topics": topics, "provider": provider_str},
+                    priority=self.QUEUE_PRIORITIES.get(priority_label, PRIORITY_NORMAL)
+                )
+                yield f"📥 Queued {len(topics)} cards as background job {queue_id}. Track it in the 🗂️ Background Jobs tab.", ""
+                return
             
-            # Update status to show generation in progress
-            progress_message = f"🔴 GENERATING {len(topics)} CARDS - PLEASE WAIT (This may take 1-2 minutes)..."
-            
-            # Start generation
-            success = self.content_manager.generate_cards_from_topics(
-                creator_name, 
-                guidance, 
-                topics, 
-                provider_str,
-                set_id_placeholder=f"{creator_name.lower().replace(' ','_')}_topic_set"
-            )
-            
-            if success:
-                return f"✅ Content generation completed for {len(topics)} selected topics. Check database files!"
-            else:
-                return f"❌ Content generation failed. Check console logs for details."
+            if not live_preview:
+                # Update status to show generation in progress
+                yield f"🔴 GENERATING {len(topics)} CARDS - PLEASE WAIT (This may take 1-2 minutes)...", ""
+                
+                # Start generation as a resumable job (checkpointed after every card)
+                job = self.content_manager.create_generation_job(creator_name, guidance, topics, provider_str)
+                yield f"🔴 GENERATING {len(topics)} CARDS (job {job.job_id}) - PLEASE WAIT (This may take 1-2 minutes)...", ""
+                try:
+                    job = self.content_manager.run_generation_job(job)
+                except Exception as e:
+                    yield f"❌ Content generation failed: {e}. Resume later with job id {job.job_id}.", ""
+                    return
+                
+                yield f"✅ Content generation finished. {job.summary()}", ""
+                return
+
+            yield f"🟡 Starting generation of {len(topics)} cards...", ""
+            live_cards = {}
+            for event in self.content_manager.stream_cards_from_topics(creator_name, guidance, topics, provider_str):
+                kind = event['event']
+                if kind == 'started':
+                    status = f"🟡 Generating {event['total']} cards into set {event['set_id']} (job {event['job_id']})..."
+                elif kind == 'partial':
+                    live_cards[event['index']] = {'topic': event['topic'], 'card': event['partial'], 'state': 'streaming'}
+                    status = f"🟡 Writing card {event['index']} of {len(topics)}: {event['topic']}"
+                elif kind == 'card':
+                    live_cards[event['index']] = {'topic': event['topic'], 'card': event['card'], 'state': 'done' if event['saved'] else 'error'}
+                    status = f"🟡 Card {event['index']} of {len(topics)} saved."
+                elif kind == 'error':
+                    live_cards[event['index']] = {'topic': event['topic'], 'card': {}, 'state': 'error', 'error': event['error']}
+                    status = f"⚠️ Card {event['index']} of {len(topics)} failed: {event['error']}"
+                else: # finished
+                    status = f"✅ Content generation completed: {event['generated']} of {event['total']} cards saved to set {event['set_id']}."
+                yield status, self.render_live_cards_html(live_cards, len(topics))
             
         except Exception as e:
             print(f"💥 Exception in UI generate_content_from_topics: {e}")
             traceback.print_exc()
-            return f"❌ Error generating content: {str(e)}"
-        """Generate content cards from selected topics."""
+            yield f"❌ Error generating content: {str(e)}", ""
+
+    QUEUE_PRIORITIES = {"Low": PRIORITY_LOW, "Normal": PRIORITY_NORMAL, "High": PRIORITY_HIGH}
+
+    def get_background_jobs_table(self) -> pd.DataFrame:
+        """Recent background jobs for the polling table."""
+        columns = ["Queue ID", "Kind", "Status", "Priority", "Progress", "Message", "Created"]
+        if not self.job_queue:
+            return pd.DataFrame(columns=columns)
+        rows = []
+        for job in self.job_queue.list_jobs(limit=50):
+            message = job["error"] or job["message"]
+            if job["result"] and job["result"].get("topics"):
+                message += ": " + "; ".join(job["result"]["topics"])
+            rows.append([job["queue_id"], job["kind"], job["status"], job["priority"], f"{job['progress'] * 100:.0f}%",
+                         message, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job["created_at"]))])
+        return pd.DataFrame(rows, columns=columns)
+
+    def cancel_background_job(self, queue_id: str) -> str:
+        if not queue_id or not queue_id.strip():
+            return "❌ Please enter a queue id (q_...)."
+        if not self.job_queue:
+            return "❌ Background queue unavailable."
+        if self.job_queue.request_cancel(queue_id.strip()):
+            return f"🛑 Cancellation requested for {queue_id.strip()} (running jobs stop after their current batch)."
+        return f"⚠️ Job {queue_id.strip()} not found or already finished."
+
+    def resume_generation_job(self, job_id: str):
+        """Resumes an interrupted generation job; only missing or failed topics are regenerated.
+        The job is enqueued for the worker processes and its progress polled here."""
+        if not job_id or not job_id.strip():
+            yield "❌ Please enter a job id to resume."
+            return
+        job_id = job_id.strip()
         try:
-            validation_result = self.validate_topic_format(selected_topics)
-            if not validation_result.startswith("✅"):
-                return f"Validation Failed: {validation_result}"
-            
-            topics = [topic.strip() for topic in selected_topics if topic.strip()]
-            
-            print(f"UI: Generating content for {len(topics)} selected topics. Creator: {creator_name}, Provider: {provider_str}")
-            
-            # The set_id would typically come from a selected ContentSet in the UI, or be newly created.
-            # For this flow, it's simplified.
-            success = self.content_manager.generate_cards_from_topics(
-                creator_name, 
-                guidance, 
-                topics, 
-                provider_str,
-                set_id_placeholder=f"{creator_name.lower().replace(' ','_')}_topic_set"
-            )
-            
-            if success:
-                return f"✅ Content generation completed for {len(topics)} selected topics. Check database files!"
+            if not self.job_queue:
+                job = self.content_manager.resume_generation_job(job_id)
+                yield f"✅ {job.summary()}"
+                return
+            if self.content_manager.job_store.load(job_id) is None:
+                yield f"❌ Could not resume job: generation job '{job_id}' not found."
+                return
+
+            active = self.job_queue.find_active(job_id) # Already queued or running: follow it instead of running it twice
+            queue_id = active["queue_id"] if active else self.job_queue.enqueue(KIND_RESUME_GENERATION, {"generation_job_id": job_id})
+            queue_job = None
+            for queue_job in self.poll_queue_job(queue_id):
+                if queue_job and queue_job["status"] not in (COMPLETED, FAILED, CANCELLED):
+                    yield f"🔁 Resuming job {job_id} in background job {queue_id}: {queue_job['progress'] * 100:.0f}% {queue_job['message']}"
+
+            if queue_job is None:
+                yield f"❌ Background job {queue_id} disappeared from the queue."
+            elif queue_job["status"] == COMPLETED:
+                yield f"✅ {queue_job['message']}"
+            elif queue_job["status"] == CANCELLED:
+                yield f"🛑 {queue_job['message']}"
             else:
-                return f"❌ Content generation failed. Check console logs for details."
-            
+                yield f"❌ Could not resume job: {queue_job['error']}"
         except Exception as e:
-            print(f"💥 Exception in UI generate_content_from_topics: {e}")
+            print(f"💥 Exception in UI resume_generation_job: {e}")
             traceback.print_exc()
-            return f"❌ Error generating content: {str(e)}"
+            yield f"❌ Could not resume job: {str(e)}"
 
     def list_existing_creators(self) -> str:
         """List all existing creators from database for display."""
@@ -438,8 +616,10 @@ class InfogenApp:
                     with gr.Column(scale=1):
                         gr.Markdown("### 💾 Database")
                         db_status_display = gr.Markdown(value=self.get_database_status())
+                gr.Markdown("### 📈 LLM Usage & Cost (since startup)")
+                usage_status_display = gr.Markdown(value=self.get_usage_status())
                 refresh_status_btn = gr.Button("🔄 Refresh System Status")
-                refresh_status_btn.click(fn=self.refresh_all_status, outputs=[api_status_display, db_status_display])
+                refresh_status_btn.click(fn=self.refresh_all_status, outputs=[api_status_display, db_status_display, usage_status_display])
 
             with gr.Tab("🧑‍🎨 Creator Management"):
                 gr.Markdown("## Content Creator Profiles")
@@ -539,7 +719,9 @@ class InfogenApp:
 
                         content_gen_provider_dd = gr.Dropdown(choices=available_llm_providers, value=default_llm_provider, label="Select AI Provider", info="Gemini Flash (via OpenAI API) is often cheapest.")
                         
-                        extract_topics_btn = gr.Button("🔍 Extract Topics with AI", variant="primary")
+                        with gr.Row():
+                            extract_topics_btn = gr.Button("🔍 Extract Topics with AI", variant="primary")
+                            refresh_topics_btn = gr.Button("🔄 Re-extract (ignore cache)", variant="secondary")
                         content_gen_refresh_creators_btn = gr.Button("🔄 Refresh Creator List")
 
 
@@ -562,7 +744,15 @@ class InfogenApp:
                                 selected_count = gr.HTML(value="")
                         
                         validate_topics_btn = gr.Button("✔️ Validate Selected Topics", variant="secondary", visible=False)
+                        live_preview_cb = gr.Checkbox(label="Live preview (stream cards one by one; uncheck for faster batched generation)", value=True)
+                        with gr.Row():
+                            background_cb = gr.Checkbox(label="Run in background queue (UI stays free; track in 🗂️ Background Jobs)", value=False)
+                            priority_radio = gr.Radio(["Low", "Normal", "High"], value="Normal", label="Queue priority")
                         generate_cards_btn = gr.Button("✨ Generate Content Cards from Topics", variant="primary", visible=False)
+                        live_cards_display = gr.HTML(value="")
+                        with gr.Accordion("🔁 Resume an interrupted generation job", open=False):
+                            resume_job_id_txt = gr.Textbox(label="Job ID", placeholder="job_20250101_120000_abc123 (shown in the status when generation starts)")
+                            resume_job_btn = gr.Button("🔁 Resume Job", variant="secondary")
                 
                 # Content Generation UI Logic
                 input_method_radio.change(
@@ -575,6 +765,11 @@ class InfogenApp:
                     inputs=[content_gen_creator_dd, content_gen_guidance_txt, input_method_radio, content_text_inp, content_file_inp, content_gen_provider_dd],
                     outputs=[extraction_status_txt, topic_display, topic_checkboxes, available_topics_state, selected_count, topic_selection_row, validate_topics_btn, generate_cards_btn]
                 )
+                refresh_topics_btn.click(
+                    fn=self.refresh_topics_from_content,
+                    inputs=[content_gen_creator_dd, content_gen_guidance_txt, input_method_radio, content_text_inp, content_file_inp, content_gen_provider_dd],
+                    outputs=[extraction_status_txt, topic_display, topic_checkboxes, available_topics_state, selected_count, topic_selection_row, validate_topics_btn, generate_cards_btn]
+                )
                 
                 # Topic selection controls  
                 select_all_btn.click(
@@ -615,8 +810,13 @@ class InfogenApp:
                 
                 generate_cards_btn.click(
                     fn=self.generate_content_from_topics,
-                    inputs=[content_gen_creator_dd, content_gen_guidance_txt, topic_checkboxes, content_gen_provider_dd],
-                    outputs=[extraction_status_txt] # Status of generation
+                    inputs=[content_gen_creator_dd, content_gen_guidance_txt, topic_checkboxes, content_gen_provider_dd, live_preview_cb, background_cb, priority_radio],
+                    outputs=[extraction_status_txt, live_cards_display] # Status of generation + cards filling in live
+                )
+                resume_job_btn.click(
+                    fn=self.resume_generation_job,
+                    inputs=[resume_job_id_txt],
+                    outputs=[extraction_status_txt]
                 )
                 def refresh_content_gen_controls():
                     creator_choices = self.get_creator_choices_for_content()
@@ -632,6 +832,25 @@ class InfogenApp:
                     outputs=[content_gen_creator_dd, content_gen_provider_dd]
                 )
 
+            with gr.Tab("🗂️ Background Jobs"):
+                gr.Markdown("## Background Generation Queue")
+                gr.Markdown("Jobs run in separate worker processes; this table refreshes every few seconds.")
+                background_jobs_table = gr.Dataframe(value=self.get_background_jobs_table, interactive=False, wrap=True)
+                with gr.Row():
+                    cancel_queue_id_txt = gr.Textbox(label="Queue ID to cancel", placeholder="q_...", scale=3)
+                    cancel_job_btn = gr.Button("🛑 Cancel Job", variant="stop", scale=1)
+                    refresh_jobs_btn = gr.Button("🔄 Refresh", scale=1)
+                cancel_job_status_txt = gr.Textbox(label="Cancel Status", show_label=False, interactive=False, placeholder="...")
+
+                jobs_timer = gr.Timer(3)
+                jobs_timer.tick(fn=self.get_background_jobs_table, outputs=[background_jobs_table])
+                refresh_jobs_btn.click(fn=self.get_background_jobs_table, outputs=[background_jobs_table])
+                cancel_job_btn.click(
+                    fn=self.cancel_background_job,
+                    inputs=[cancel_queue_id_txt],
+                    outputs=[cancel_job_status_txt]
+                ).then(fn=self.get_background_jobs_table, outputs=[background_jobs_table])
+
             with gr.Tab("👁️ Homepage Preview"):
                 gr.Markdown("## Netflix-Style Homepage Data Structure")
                 gr.Markdown("Preview the JSON data structure that would be used to render a dynamic homepage with content rows and categories.")
@@ -709,6 +928,17 @@ def main():
     app_data_dir = "data" 
     
     app = InfogenApp(data_dir=app_data_dir)
+
+    # Prometheus scrape endpoint for token/cost metrics; INFOGEN_METRICS_PORT=0 disables it
+    metrics_port = int(os.getenv("INFOGEN_METRICS_PORT", "9105"))
+    if metrics_port:
+        start_metrics_server(metrics_port, collect=app.usage_registry)
+
+    # Background workers for queued generation; INFOGEN_QUEUE_WORKERS=0 disables them (e.g. when running worker.py separately)
+    worker_count = int(os.getenv("INFOGEN_QUEUE_WORKERS", "2"))
+    if worker_count:
+        start_worker_pool(worker_count, data_dir=str(app.data_dir_path), queue_path=str(app.queue_path))
+
     app.launch(default_port=5001) # Start with port 5001
 
 
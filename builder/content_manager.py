@@ -8,13 +8,14 @@ import os
 import asyncio
 import traceback
 import re # Ensure re is imported
-from typing import Dict, List, Any, Tuple, Optional
+import unicodedata
+from typing import Dict, List, Any, Tuple, Optional, Iterator, Callable
 from enum import Enum # Ensure Enum is imported for the fallback LLMProvider
 from datetime import datetime
 
 # Assuming unified_generator.py and core_models.py are in the same directory or Python path
 try:
-    from unified_generator import get_unified_generator, LLMProvider, ContentGenerationError
+    from unified_generator import get_unified_generator, LLMProvider, ContentGenerationError, MAX_CONCURRENT_BATCHES
     UNIFIED_GENERATOR_AVAILABLE = True
 except ImportError:
     UNIFIED_GENERATOR_AVAILABLE = False
@@ -25,6 +26,7 @@ except ImportError:
         ANTHROPIC = "anthropic"
         OPENAI = "openai"
     class ContentGenerationError(Exception): pass
+    MAX_CONCURRENT_BATCHES = 3
 
 
 try:
@@ -52,6 +54,60 @@ except ImportError:
         def add_card(self, card): print(f"Dummy DB: Add card {card}"); return True
         def generate_homepage_data(self): return {"dummy_homepage": True}
 
+from prompt_templates import get_prompt_registry
+from async_runtime import run_sync
+from topic_cache import TopicCache, topic_cache_key
+from navigation_index import write_navigation_index
+from quality_gate import QualityGate, QualityReport, QUALITY_MAX_RETRIES, quality_retry_budget
+from generation_jobs import (GenerationJob, JobStore, TopicState, TOPIC_PENDING, TOPIC_GENERATED, TOPIC_DONE,
+                             TOPIC_FAILED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+# Topic extraction over long documents (map-reduce): the source is split into overlapping chunks,
+# topics are extracted per chunk concurrently, then merged and ranked locally.
+TOPIC_CHUNK_CHARS = 12000            # Roughly 3k-4k tokens per extraction call
+TOPIC_CHUNK_OVERLAP_CHARS = 800      # Context carried into the next chunk so boundary topics are not lost
+MAX_TOPIC_CHUNKS = 48                # Bounds wall-clock time and cost (~200 pages); longer inputs are sampled evenly
+TOPIC_EXTRACTION_CONCURRENCY = 6     # Parallel extraction calls
+TOPIC_SIMILARITY_THRESHOLD = 0.6     # Token Jaccard similarity above which two topics are treated as the same
+MAX_MERGED_TOPICS = 15
+TOPIC_STOPWORDS = {"a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na", "nos", "nas",
+                   "um", "uma", "para", "por", "com", "sobre", "como", "que", "the", "of", "and", "to", "in"}
+
+
+def _topic_tokens(topic: str) -> frozenset:
+    """Accent- and case-insensitive content words of a topic, used for similarity."""
+    normalized = unicodedata.normalize("NFKD", topic.lower())
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return frozenset(word for word in re.findall(r"\w+", normalized) if word not in TOPIC_STOPWORDS)
+
+
+def merge_topic_candidates(candidate_lists: List[List[str]], max_topics: int = MAX_MERGED_TOPICS,
+                           similarity_threshold: float = TOPIC_SIMILARITY_THRESHOLD) -> List[str]:
+    """
+    Reduce step: clusters near-duplicate topics from all chunks (token Jaccard similarity) and ranks
+    clusters by how many chunks mention them, then by where they first appear in the document.
+    """
+    clusters: List[Dict[str, Any]] = []
+    for chunk_index, topics in enumerate(candidate_lists):
+        for position, topic in enumerate(topics):
+            tokens = _topic_tokens(topic)
+            if not tokens:
+                continue
+            best_cluster, best_score = None, 0.0
+            for cluster in clusters:
+                score = len(tokens & cluster["tokens"]) / len(tokens | cluster["tokens"])
+                if score > best_score:
+                    best_cluster, best_score = cluster, score
+            if best_cluster is not None and best_score >= similarity_threshold:
+                best_cluster["chunks"].add(chunk_index)
+            else:
+                clusters.append({"topic": topic, "tokens": tokens, "chunks": {chunk_index},
+                                 "first_seen": (chunk_index, position)})
+
+    ranked = sorted(clusters, key=lambda c: (-len(c["chunks"]), c["first_seen"]))
+    return [cluster["topic"] for cluster in ranked[:max_topics]]
+
 
 class ContentManager:
     """Manages content generation flow including topic extraction and card creation."""
@@ -59,6 +115,9 @@ class ContentManager:
     def __init__(self, db: JSONDatabaseManager):
         self.db = db
         self.content_generator = None
+        self.job_store = JobStore(str(getattr(db, 'data_dir', 'data')))
+        self.prompts = get_prompt_registry()
+        self.topic_cache = TopicCache()
         self._auto_initialize_generator()
     
     def _auto_initialize_generator(self):
@@ -89,43 +148,81 @@ class ContentManager:
         if not self.content_generator or not self.content_generator.get_available_providers():
             raise ContentGenerationError("Content generator is not available or not properly initialized. Check API keys and console logs.")
 
-    def extract_topics_with_ai(self, content: str, guidance: str, creator_name: str, provider_str: str) -> List[str]:
-        """Extracts topics from content using the AI generator."""
+    def _topic_extraction_prompt(self, content: str, guidance: str, creator_name: str, part_note: str = "") -> Tuple[str, str]:
+        """(system prompt, user prompt). The instructions go in the system prompt, identical for every chunk
+        and document so providers can serve them from their prompt cache; the chunk goes in the user turn."""
+        template = self.prompts.get("topic_extraction")
+        system_prompt = f"{self.prompts.render('topic_system')}\n\n{template.prefix}"
+        return system_prompt, template.render_dynamic(content=content, guidance=guidance,
+                                                      creator_name=creator_name, part_note=part_note)
+
+    async def _extract_topics_from_chunks(self, chunks: List[str], guidance: str, creator_name: str,
+                                          provider_enum: LLMProvider) -> List[List[str]]:
+        """Map step: one extraction call per chunk, at most TOPIC_EXTRACTION_CONCURRENCY in flight."""
+        semaphore = asyncio.Semaphore(TOPIC_EXTRACTION_CONCURRENCY)
+
+        async def extract_chunk(index: int, chunk: str) -> List[str]:
+            part_note = f" (trecho {index + 1} de {len(chunks)} de um documento longo)" if len(chunks) > 1 else ""
+            system_prompt, user_prompt = self._topic_extraction_prompt(chunk, guidance, creator_name, part_note)
+            async with semaphore:
+                raw_llm_response = await self.content_generator.generate_generic_text(
+                    prompt_text=user_prompt,
+                    system_prompt=system_prompt,
+                    provider=provider_enum,
+                    max_tokens=200, # Usually enough for a list of 10 short topics
+                    temperature=0.3, # Lower for more deterministic extraction
+                    cache_system_prompt=True
+                )
+            return self.parse_topics_from_response(raw_llm_response)
+
+        results = await asyncio.gather(*(extract_chunk(i, chunk) for i, chunk in enumerate(chunks)), return_exceptions=True)
+        candidate_lists = []
+        for index, result in enumerate(results):
+            if isinstance(result, Exception):
+                print(f"⚠️ Topic extraction failed for chunk {index + 1}/{len(chunks)}: {result}")
+                candidate_lists.append([])
+            else:
+                candidate_lists.append(result)
+        if not any(candidate_lists) and any(isinstance(r, Exception) for r in results):
+            raise ContentGenerationError(f"Topic extraction failed for all {len(chunks)} chunks.")
+        return candidate_lists
+
+    def extract_topics_with_ai(self, content: str, guidance: str, creator_name: str, provider_str: str,
+                               use_cache: bool = True, return_cache_status: bool = False):
+        """Sync wrapper around aextract_topics (runs it on the shared background loop)."""
+        return run_sync(self.aextract_topics(content, guidance, creator_name, provider_str, use_cache=use_cache,
+                                             return_cache_status=return_cache_status))
+
+    async def aextract_topics(self, content: str, guidance: str, creator_name: str, provider_str: str,
+                              use_cache: bool = True, return_cache_status: bool = False):
+        """Extracts topics from content using the AI generator. Long content is chunked and extracted map-reduce style.
+        Results are cached per normalized source + guidance + provider; use_cache=False forces a fresh extraction
+        (and replaces the cached entry). Can be awaited from any event loop; returns [] on failure.
+        With return_cache_status, returns (topics, from_cache) instead of topics."""
+        topics, from_cache = await self._aextract_topics(content, guidance, creator_name, provider_str, use_cache)
+        return (topics, from_cache) if return_cache_status else topics
+
+    async def _aextract_topics(self, content: str, guidance: str, creator_name: str, provider_str: str,
+                               use_cache: bool) -> Tuple[List[str], bool]:
         try:
+            cache_key = None
+            if isinstance(content, str) and content.strip():
+                cache_key = topic_cache_key(content, guidance, creator_name, provider_str,
+                                            self.prompts.get("topic_extraction").version)
+                cached_topics = self.topic_cache.get(cache_key) if use_cache else None
+                if cached_topics:
+                    print(f"⚡ Topic extraction cache hit ({len(cached_topics)} topics, provider {provider_str})")
+                    return cached_topics, True
+
             self._ensure_generator() # Ensure generator is ready
             
-            sanitized_content = self.sanitize_content(content)
+            chunks = [self.sanitize_content(chunk) for chunk in self.split_content_into_chunks(content)]
+            chunks = [chunk for chunk in chunks if chunk]
             print(f"\n🔍 DEBUG: Topic Extraction (ContentManager)")
             print(f"   Creator: {creator_name}, Provider Str: {provider_str}")
-            print(f"   Original content length: {len(content)}, Sanitized: {len(sanitized_content)}")
-            
-            # Refined prompt for better topic extraction
-            prompt = f"""Você é um assistente de IA especializado em análise de texto para extrair tópicos educacionais.
-Analise o seguinte conteúdo fornecido e extraia de 5 a 10 tópicos específicos, concisos e acionáveis para a criação de cartões de conteúdo educacional.
-
----
-Conteúdo para Análise:
-{sanitized_content}
----
-
-Informações Adicionais para guiar a extração:
-- Nome do Criador: {creator_name}
-- Orientação Geral de Conteúdo: {guidance}
-
-Requisitos Estritos para a Lista de Tópicos:
-1.  Cada tópico deve ser uma frase curta ou um termo específico (5-50 caracteres).
-2.  Os tópicos devem estar em Português (Brasil).
-3.  A lista deve conter entre 5 e 10 tópicos únicos.
-4.  Formato da Resposta: APENAS a lista de tópicos, um tópico por linha. NÃO inclua números, marcadores, saudações ou qualquer outro texto.
-
-Exemplo de formato de saída esperado:
-Benefícios da água alcalina
-Como calcular sua hidratação diária
-Mitos sobre a desidratação
-Impacto da água na performance física
-Qualidade da água potável no Brasil
-"""
-            # print(f"   Topic Extraction Prompt (first 300 chars): {prompt[:300]}...") # For debug
+            print(f"   Original content length: {len(content) if isinstance(content, str) else 0}, Chunks: {len(chunks)}")
+            if not chunks:
+                return [], False
 
             try:
                 provider_enum = LLMProvider(provider_str)
@@ -135,41 +232,82 @@ Qualidade da água potável no Brasil
                 if not provider_enum: # Should not happen if _ensure_generator worked
                     raise ContentGenerationError("No default provider available after invalid choice.")
             
-            print(f"   Calling LLM ({provider_enum.value}) for topic extraction...")
+            print(f"   Calling LLM ({provider_enum.value}) for topic extraction on {len(chunks)} chunk(s)...")
             
-            raw_llm_response = asyncio.run(
-                self.content_generator.generate_generic_text(
-                    prompt_text=prompt,
-                    system_prompt="Você é um especialista em extrair tópicos chave de um texto.",
-                    provider=provider_enum,
-                    max_tokens=200, # Usually enough for a list of 10 short topics
-                    temperature=0.3 # Lower for more deterministic extraction
-                )
+            candidate_lists = await self.content_generator.run_async(
+                self._extract_topics_from_chunks(chunks, guidance, creator_name, provider_enum)
             )
-            # print(f"   Raw LLM response for topics: '{raw_llm_response}'") # For debug
-            
-            topics = self.parse_topics_from_response(raw_llm_response)
+            topics = candidate_lists[0] if len(candidate_lists) == 1 else merge_topic_candidates(candidate_lists)
             print(f"✅ Extracted {len(topics)} topics by ContentManager: {topics}")
-            return topics
+            if topics and cache_key:
+                self.topic_cache.put(cache_key, topics)
+            return topics, False
             
         except ContentGenerationError as e: # Catch specific errors from generator
             print(f"❌ Topic extraction failed (ContentGenerationError): {e}")
             # traceback.print_exc() # Already printed in generator usually
-            return []
+            return [], False
         except Exception as e:
             print(f"❌ Unexpected error during topic extraction: {e}")
             traceback.print_exc()
-            return []
+            return [], False
 
-    def sanitize_content(self, content: str) -> str:
-        """Basic sanitization and length limiting for content passed to LLM for topic extraction."""
+    def split_content_into_chunks(self, content: str, chunk_chars: int = TOPIC_CHUNK_CHARS,
+                                  overlap_chars: int = TOPIC_CHUNK_OVERLAP_CHARS,
+                                  max_chunks: int = MAX_TOPIC_CHUNKS) -> List[str]:
+        """Splits raw content on paragraph, then sentence boundaries into overlapping chunks of at most chunk_chars."""
+        if not isinstance(content, str) or not content.strip():
+            return []
+        if len(content) <= chunk_chars:
+            return [content]
+
+        pieces: List[str] = []
+        for paragraph in re.split(r'\n\s*\n', content):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if len(paragraph) <= chunk_chars:
+                pieces.append(paragraph)
+                continue
+            for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+                # A "sentence" longer than a chunk (e.g. unpunctuated transcript) is cut at fixed width
+                pieces.extend(sentence[i:i + chunk_chars] for i in range(0, len(sentence), chunk_chars))
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_len = 0
+        for piece in pieces:
+            if current and current_len + len(piece) + 1 > chunk_chars:
+                chunks.append("\n\n".join(current))
+                # Carry trailing pieces of the previous chunk as overlap
+                overlap: List[str] = []
+                overlap_len = 0
+                for previous in reversed(current):
+                    if overlap_len + len(previous) > overlap_chars or overlap_len + len(previous) + len(piece) > chunk_chars:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_len += len(previous) + 1
+                current, current_len = overlap, overlap_len
+            current.append(piece)
+            current_len += len(piece) + 1
+        if current:
+            chunks.append("\n\n".join(current))
+
+        if len(chunks) > max_chunks:
+            # Keep the call count bounded; evenly spaced chunks still cover the whole document
+            print(f"Warning: {len(chunks)} chunks exceed the limit of {max_chunks}; sampling evenly across the document.")
+            step = len(chunks) / max_chunks
+            chunks = [chunks[int(i * step)] for i in range(max_chunks)]
+        return chunks
+
+    def sanitize_content(self, content: str, max_chars: Optional[int] = None) -> str:
+        """Basic sanitization for content passed to the LLM. Length is bounded by chunking, so
+        truncation only happens when max_chars is given explicitly."""
         if not isinstance(content, str): return ""
         
-        # Limit length to prevent excessive token usage for topic extraction
-        max_chars_for_topic_extraction = 15000 # Roughly 3k-5k tokens
-        if len(content) > max_chars_for_topic_extraction:
-            print(f"Warning: Input content for topic extraction truncated from {len(content)} to {max_chars_for_topic_extraction} chars.")
-            content = content[:max_chars_for_topic_extraction]
+        if max_chars is not None and len(content) > max_chars:
+            print(f"Warning: Input content truncated from {len(content)} to {max_chars} chars.")
+            content = content[:max_chars]
         
         # Remove typical non-textual or problematic characters. Keep basic punctuation.
         sanitized = re.sub(r'[^\w\s\.,;:!?\-áàâãéèêíìîóòôõúùûçÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ]', ' ', content, flags=re.UNICODE)
@@ -195,125 +333,132 @@ Qualidade da água potável no Brasil
 
         return topics[:15] # Return max 15 topics
 
-    def generate_cards_from_topics(self, creator_name: str, guidance: str, topics: List[str], provider_str: str, set_id_placeholder: str = "default_set_id") -> bool:
-        """Generates content cards for given topics and saves them (conceptual)."""
-        try:
-            self._ensure_generator() # Ensure generator is ready
+    def _find_creator(self, creator_name: str) -> Optional[Dict[str, Any]]:
+        creator_data = self.db.get_creator_by_display_name(creator_name) # Assumes this method exists or you adapt it
+        if not creator_data:
+            # Fallback or direct use if get_creator_by_display_name is not available
+            creators = self.db.list_creators()
+            creator_data = next((c for c in creators if c.get('display_name') == creator_name), None)
+        return creator_data
 
-            creator_data = self.db.get_creator_by_display_name(creator_name) # Assumes this method exists or you adapt it
-            if not creator_data:
-                # Fallback or direct use if get_creator_by_display_name is not available
-                creators = self.db.list_creators()
-                creator_data = next((c for c in creators if c.get('display_name') == creator_name), None)
-                if not creator_data:
-                    print(f"❌ Creator '{creator_name}' not found in DB.")
-                    return False
-
-            print(f"\n🔄 Starting card generation for {len(topics)} topics, Creator: {creator_name}, Provider: {provider_str}")
+    def _provider_from_str(self, provider_str: str, purpose: str) -> LLMProvider:
+        try:
+            return LLMProvider(provider_str)
+        except ValueError:
+            print(f"Warning: Invalid provider string '{provider_str}' for {purpose}. Using default.")
+            provider_enum = self.content_generator.default_provider
+            if not provider_enum: raise ContentGenerationError(f"No default provider for {purpose}.")
+            return provider_enum
+
+    def _content_type_for_creator(self, creator_data: Dict[str, Any]) -> ContentType:
+        # Determine content type for cards - this might need more sophisticated logic
+        # For now, using a general content type or one derived from guidance.
+        # This should ideally come from user input in Gradio for the set.
+        main_category_str = (creator_data.get('categories') or ["general"])[0] # Take first category or general
+        try:
+            return ContentType(main_category_str)
+        except ValueError:
+            print(f"Warning: Category '{main_category_str}' not a valid ContentType. Defaulting to GENERAL.")
+            return ContentType.GENERAL
+
+    # ContentSet fields that callers (e.g. bulk_generate.py manifests) may override
+    SET_METADATA_FIELDS = ("title", "description", "thumbnail_url", "banner_url", "estimated_time_minutes", "difficulty_level",
+                           "target_audience", "content_style", "tags", "learning_outcomes", "status", "language")
+
+    def _create_content_set(self, creator_data: Dict[str, Any], creator_name: str, guidance: str,
+                            content_type_for_cards: ContentType, card_count: int,
+                            set_metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Creates the ContentSet for a generation run (if needed) and returns its set_id.
+        set_metadata overrides SET_METADATA_FIELDS (and may pin the set_id)."""
+        set_metadata = set_metadata or {}
+        from core_models import ContentSet, NavigationType
+        
+        # Generate unique set ID based on creator and timestamp
+        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
+        pinned_set_id = set_metadata.get("set_id")
+        base_set_id = pinned_set_id or f"{creator_data['creator_id']}_{content_type_for_cards.value}_{timestamp_str}"
+        
+        # A pinned set_id is reused if it exists; a generated one gets a suffix instead, so runs started
+        # in the same minute (background workers, bulk generation) never share a set
+        for attempt in range(1, 100):
+            actual_set_id = base_set_id if attempt == 1 else f"{base_set_id}_{attempt}"
+            if self.db.get_content_set(actual_set_id):
+                if pinned_set_id:
+                    print(f"📁 Using existing ContentSet: {actual_set_id}")
+                    return actual_set_id
+                continue
+
+            # Create new ContentSet
+            content_set = ContentSet(
+                set_id=actual_set_id,
+                creator_id=creator_data['creator_id'],
+                title=f"Conteúdo sobre {guidance[:50]}..." if guidance else f"Tópicos de {creator_name}",
+                description=f"Conjunto de cartões educativos gerados para {creator_name}. Orientação: {guidance}",
+                category=content_type_for_cards,
+                card_count=card_count,
+                supported_navigation=[NavigationType.THEMATIC, NavigationType.RANDOM],
+                status="published"
+            )
+            for field_name in self.SET_METADATA_FIELDS:
+                if field_name in set_metadata:
+                    setattr(content_set, field_name, set_metadata[field_name])
             
-            try:
-                provider_enum = LLMProvider(provider_str)
-            except ValueError:
-                print(f"Warning: Invalid provider string '{provider_str}' for card generation. Using default.")
-                provider_enum = self.content_generator.default_provider
-                if not provider_enum: raise ContentGenerationError("No default provider for card gen.")
+            # Save ContentSet to database (False means another process just took this id)
+            if self.db.add_content_set(content_set):
+                print(f"✅ Created new ContentSet: {actual_set_id}")
+                return actual_set_id
+        print(f"⚠️ ContentSet creation failed, using placeholder: {actual_set_id}")
+        return actual_set_id
+
+    def _save_generated_card(self, set_id: str, creator_data: Dict[str, Any], order_index: int,
+                             topic_text: str, guidance: str, card_data_dict: Dict[str, Any]):
+        """Converts a generated card dict to a ContentCard and saves it. Returns the card or None."""
+        from core_models import ContentCard
+        import uuid
 
-            # Determine content type for cards - this might need more sophisticated logic
-            # For now, using a general content type or one derived from guidance.
-            # This should ideally come from user input in Gradio for the set.
-            main_category_str = creator_data.get('categories', ["general"])[0] # Take first category or general
-            try:
-                content_type_for_cards = ContentType(main_category_str)
-            except ValueError:
-                print(f"Warning: Category '{main_category_str}' not a valid ContentType. Defaulting to GENERAL.")
-                content_type_for_cards = ContentType.GENERAL
-
-            # Create ContentSet if it doesn't exist
-            from core_models import ContentSet, NavigationType
-            import uuid
-            
-            # Generate unique set ID based on creator and timestamp
-            timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
-            actual_set_id = f"{creator_data['creator_id']}_{content_type_for_cards.value}_{timestamp_str}"
+        try:
+            # Generate unique card ID
+            card_id = f"{set_id}_card_{uuid.uuid4().hex[:8]}"
+            difficulty = next((d for d in card_data_dict.get('difficulty_tags', []) if d in ('beginner', 'intermediate', 'advanced')), 'intermediate')
             
-            # Check if set already exists
-            existing_set = self.db.get_content_set(actual_set_id)
-            if not existing_set:
-                # Create new ContentSet
-                content_set = ContentSet(
-                    set_id=actual_set_id,
-                    creator_id=creator_data['creator_id'],
-                    title=f"Conteúdo sobre {guidance[:50]}..." if guidance else f"Tópicos de {creator_name}",
-                    description=f"Conjunto de cartões educativos gerados para {creator_name}. Orientação: {guidance}",
-                    category=content_type_for_cards,
-                    card_count=len(topics),
-                    supported_navigation=[NavigationType.THEMATIC, NavigationType.RANDOM],
-                    status="published"
-                )
-                
-                # Save ContentSet to database
-                set_created = self.db.add_content_set(content_set)
-                if set_created:
-                    print(f"✅ Created new ContentSet: {actual_set_id}")
-                else:
-                    print(f"⚠️ ContentSet creation failed, using placeholder: {actual_set_id}")
-            else:
-                print(f"📁 Using existing ContentSet: {actual_set_id}")
+            # Create ContentCard instance
+            new_card = ContentCard(
+                card_id=card_id,
+                set_id=set_id,
+                creator_id=creator_data['creator_id'],
+                title=card_data_dict.get('title', f"Card {order_index}: {topic_text}"),
+                summary=card_data_dict.get('summary', "Generated content summary"),
+                detailed_content=card_data_dict.get('detailed_content', "Generated detailed content"),
+                order_index=order_index,
+                tags=card_data_dict.get('keywords', []),
+                domain_data={
+                    'difficulty': difficulty,
+                    'topic': topic_text,
+                    'guidance': guidance,
+                    'generation_mode': card_data_dict.get('generation_metadata', {}).get('generation_mode', 'single'),
+                    'parse_status': card_data_dict.get('generation_metadata', {}).get('parse_status', 'text_fallback'),
+                    'template_version': card_data_dict.get('generation_metadata', {}).get('template_version'),
+                    'quality_score': card_data_dict.get('generation_metadata', {}).get('quality', {}).get('score'),
+                    'quality_issues': card_data_dict.get('generation_metadata', {}).get('quality', {}).get('issues', [])
+                }
+            )
             
-            # Use the actual set ID instead of placeholder
-            set_id_placeholder = actual_set_id
-
-            generated_card_count = 0
-            for i, topic_text in enumerate(topics, 1):
-                print(f"   Generating card {i}/{len(topics)} for topic: '{topic_text}'...")
-                card_context = f"Card {i} of {len(topics)} for a set by {creator_name}. Overall guidance: {guidance}"
-                
-                try:
-                    card_data_dict = asyncio.run(
-                        self.content_generator.generate_content_card(
-                            topic=topic_text,
-                            content_type=content_type_for_cards,
-                            card_context=card_context,
-                            provider=provider_enum
-                        )
-                    )
-                    
-                    # Convert card_data_dict to ContentCard and save to database
-                    from core_models import ContentCard
-                    import uuid
-                    
-                    # Generate unique card ID
-                    card_id = f"{set_id_placeholder}_card_{uuid.uuid4().hex[:8]}"
-                    
-                    # Create ContentCard instance
-                    new_card = ContentCard(
-                        card_id=card_id,
-                        set_id=set_id_placeholder,
-                        creator_id=creator_data['creator_id'],
-                        title=card_data_dict.get('title', f"Card {i}: {topic_text}"),
-                        summary=card_data_dict.get('summary', "Generated content summary"),
-                        detailed_content=card_data_dict.get('detailed_content', "Generated detailed content"),
-                        order_index=i,
-                        tags=card_data_dict.get('keywords', []),
-                        domain_data={
-                            'difficulty': card_data_dict.get('difficulty', 'intermediate'),
-                            'topic': topic_text,
-                            'guidance': guidance
-                        }
-                    )
-                    
-                    # Save card to database
-                    success = self.db.add_card(new_card)
-                    if success:
-                        print(f"   ✅ Card for '{topic_text}' saved to database: {new_card.title[:40]}...")
-                        generated_card_count += 1
-                    else:
-                        print(f"   ⚠️ Card for '{topic_text}' generated but failed to save to database")
-                except Exception as card_e:
-                    print(f"   ❌ Failed to generate/process card for topic '{topic_text}': {card_e}")
-                    # Optionally continue to next topic or re-raise
-
-            print(f"✅ Successfully generated {generated_card_count} cards (conceptually).")
+            # Save card to database
+            if self.db.add_card(new_card):
+                print(f"   ✅ Card for '{topic_text}' saved to database: {new_card.title[:40]}...")
+                return new_card
+            print(f"   ⚠️ Card for '{topic_text}' generated but failed to save to database")
+        except Exception as card_e:
+            print(f"   ❌ Failed to process card for topic '{topic_text}': {card_e}")
+        return None
+
+    def generate_cards_from_topics(self, creator_name: str, guidance: str, topics: List[str], provider_str: str, set_id_placeholder: str = "default_set_id", batch_size: Optional[int] = None) -> bool:
+        """Generates content cards for given topics and saves them, as a resumable job (see generation_jobs.py).
+        Cards are requested `batch_size` at a time (provider default when None; 1 disables batching)."""
+        try:
+            job = self.create_generation_job(creator_name, guidance, topics, provider_str, batch_size)
+            job = self.run_generation_job(job)
+            print(f"✅ {job.summary()}")
             return True
 
         except ContentGenerationError as e:
@@ -323,7 +468,302 @@ Qualidade da água potável no Brasil
             print(f"❌ Unexpected error during card generation process: {e}")
             traceback.print_exc()
             return False
-            
+
+    def create_generation_job(self, creator_name: str, guidance: str, topics: List[str], provider_str: str,
+                              batch_size: Optional[int] = None, set_metadata: Optional[Dict[str, Any]] = None) -> GenerationJob:
+        """Creates the content set and a persisted job record for it; nothing is generated yet."""
+        self._ensure_generator() # Ensure generator is ready
+
+        creator_data = self._find_creator(creator_name)
+        if not creator_data:
+            raise ContentGenerationError(f"Creator '{creator_name}' not found in DB.")
+
+        provider_enum = self._provider_from_str(provider_str, "card generation")
+        content_type_for_cards = self._content_type_for_creator(creator_data)
+        set_id = self._create_content_set(creator_data, creator_name, guidance, content_type_for_cards, len(topics), set_metadata)
+
+        job = GenerationJob.create(creator_name, creator_data['creator_id'], guidance, provider_enum.value, set_id, topics, batch_size)
+        self.job_store.save(job)
+        print(f"📋 Created generation job {job.job_id} for set {set_id} ({len(topics)} topics)")
+        return job
+
+    def resume_generation_job(self, job_id: str, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                              cancel_check: Optional[Callable[[], bool]] = None) -> GenerationJob:
+        """Resumes a job by id: saves already-generated cards and regenerates only pending or failed topics."""
+        job = self.job_store.load(job_id)
+        if job is None:
+            raise ContentGenerationError(f"Generation job '{job_id}' not found.")
+        if job.status == JOB_COMPLETED:
+            print(f"📋 Job {job.job_id} is already complete; nothing to resume.")
+            return job
+        print(f"🔁 Resuming {job.summary()}")
+        return self.run_generation_job(job, progress_callback, cancel_check)
+
+    def run_generation_job(self, job: GenerationJob, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                           cancel_check: Optional[Callable[[], bool]] = None) -> GenerationJob:
+        """Sync wrapper around arun_generation_job (runs it on the generator's background loop)."""
+        self._ensure_generator()
+        return self.content_generator.run_sync(self.arun_generation_job(job, progress_callback, cancel_check))
+
+    async def arun_generation_job(self, job: GenerationJob, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                                  cancel_check: Optional[Callable[[], bool]] = None) -> GenerationJob:
+        """Runs (or continues) a job, checkpointing the job file after every card.
+        progress_callback(done, total, message) is called after each card; when cancel_check() returns True,
+        no further batches are started and the job ends as 'cancelled' (it can be resumed later).
+        Both callbacks are invoked from the generator's background loop thread."""
+        self._ensure_generator()
+        creator_data = await asyncio.to_thread(lambda: self.db.get_creator(job.creator_id) or self._find_creator(job.creator_name))
+        if not creator_data:
+            raise ContentGenerationError(f"Creator '{job.creator_name}' for job {job.job_id} not found in DB.")
+        provider_enum = self._provider_from_str(job.provider, "card generation")
+        content_type_for_cards = self._content_type_for_creator(creator_data)
+
+        job.status = JOB_RUNNING
+        job.error = None
+        await self._checkpoint(job)
+        try:
+            # Responses that were paid for before an interruption are saved without calling the LLM again
+            for state in job.topics_with_status(TOPIC_GENERATED):
+                await asyncio.to_thread(self._save_job_card, job, state, creator_data, True)
+
+            remaining = job.topics_with_status(TOPIC_PENDING, TOPIC_FAILED)
+            if remaining:
+                batch_size = job.batch_size or self.content_generator.get_batch_size(provider_enum)
+                print(f"\n🔄 Job {job.job_id}: generating {len(remaining)} of {len(job.topics)} cards in batches of {batch_size}, Provider: {provider_enum.value}")
+                await self.content_generator.run_async(self._generate_job_cards(job, remaining, creator_data, content_type_for_cards,
+                                                                                provider_enum, batch_size, progress_callback, cancel_check))
+        except Exception as e:
+            job.status = JOB_FAILED
+            job.error = str(e)
+            await self._checkpoint(job)
+            raise
+
+        job.finish()
+        if cancel_check and cancel_check() and job.status != JOB_COMPLETED:
+            job.status = JOB_CANCELLED
+        await self._checkpoint(job)
+        await asyncio.to_thread(self._publish_navigation_index, job.set_id)
+        return job
+
+    def _publish_navigation_index(self, set_id: str):
+        """Rewrites the set's navigation index for the viewer; the cards are already saved, so a failure only warns"""
+        try:
+            write_navigation_index(self.db, set_id)
+        except Exception as e:
+            print(f"⚠️ Navigation index for {set_id} not written: {e}")
+
+    async def agenerate_cards(self, creator_name: str, guidance: str, topics: List[str], provider_str: str,
+                              batch_size: Optional[int] = None, set_metadata: Optional[Dict[str, Any]] = None,
+                              progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                              cancel_check: Optional[Callable[[], bool]] = None) -> GenerationJob:
+        """Async counterpart of generate_cards_from_topics: creates the set and job, generates, returns the finished job.
+        Raises ContentGenerationError instead of returning False."""
+        job = await asyncio.to_thread(self.create_generation_job, creator_name, guidance, topics, provider_str, batch_size, set_metadata)
+        return await self.arun_generation_job(job, progress_callback, cancel_check)
+
+    async def agenerate_set(self, creator_name: str, guidance: str, content: str, provider_str: str,
+                            max_topics: Optional[int] = None, batch_size: Optional[int] = None,
+                            set_metadata: Optional[Dict[str, Any]] = None,
+                            progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                            cancel_check: Optional[Callable[[], bool]] = None) -> GenerationJob:
+        """Source text to finished content set: topic extraction followed by card generation."""
+        topics = await self.aextract_topics(content, guidance, creator_name, provider_str)
+        if not topics:
+            raise ContentGenerationError("No topics could be extracted from the content.")
+        return await self.agenerate_cards(creator_name, guidance, topics[:max_topics] if max_topics else topics, provider_str,
+                                          batch_size, set_metadata, progress_callback, cancel_check)
+
+    async def _checkpoint(self, job: GenerationJob):
+        """job_store.save off the event loop (it fsyncs)."""
+        await asyncio.to_thread(self.job_store.save, job)
+
+    async def _generate_job_cards(self, job: GenerationJob, states: List[TopicState], creator_data: Dict[str, Any],
+                                  content_type_for_cards: ContentType, provider_enum: LLMProvider, batch_size: int,
+                                  progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                                  cancel_check: Optional[Callable[[], bool]] = None):
+        """Requests cards batch by batch and checkpoints each card as soon as its batch returns.
+        Cards rejected by the quality gate are regenerated together (batched, with the reasons in the
+        context) up to QUALITY_MAX_RETRIES rounds and the run's retry budget."""
+        card_context = f"Cards for a set by {job.creator_name}. Overall guidance: {job.guidance}"
+        existing_cards = await asyncio.to_thread(self.db.get_cards_by_set, job.set_id)
+        gate = QualityGate(self.content_generator.language, (card.get('title', '') for card in existing_cards))
+        retries_left = quality_retry_budget(len(states))
+        round_states, round_context = states, card_context
+
+        for round_index in range(QUALITY_MAX_RETRIES + 1):
+            rejected = await self._generate_card_round(job, round_states, creator_data, content_type_for_cards, provider_enum,
+                                                       batch_size, round_context, gate, progress_callback, cancel_check)
+            can_retry = round_index < QUALITY_MAX_RETRIES and not (cancel_check and cancel_check())
+            retry = rejected[:retries_left] if can_retry else []
+            for state, report in rejected[len(retry):]:
+                await self._settle_rejected_card(job, state, report, creator_data, gate, progress_callback)
+            if not retry:
+                return
+            retries_left -= len(retry)
+            print(f"   🔁 Quality gate: regenerating {len(retry)} card(s), {retries_left} retries left in budget")
+            round_states = [state for state, _ in retry]
+            rejection_notes = "\n".join(f"- {state.topic}: {'; '.join(report.issues)}" for state, report in retry)
+            round_context = f"{card_context}\nPrevious attempts for these topics were rejected, avoid these problems:\n{rejection_notes}"
+
+    async def _generate_card_round(self, job: GenerationJob, states: List[TopicState], creator_data: Dict[str, Any],
+                                   content_type_for_cards: ContentType, provider_enum: LLMProvider, batch_size: int,
+                                   card_context: str, gate: QualityGate,
+                                   progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                                   cancel_check: Optional[Callable[[], bool]] = None) -> List[Tuple[TopicState, QualityReport]]:
+        """One pass over `states`. Cards passing the gate are saved; rejected ones are returned (left pending)."""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+        rejected: List[Tuple[TopicState, QualityReport]] = []
+
+        async def run_batch(batch_states: List[TopicState]):
+            async with semaphore:
+                if cancel_check and cancel_check():
+                    return batch_states, None, None # Left pending for a later resume
+                try:
+                    # Topics that fail inside a batch are retried individually by the generator
+                    cards = await self.content_generator.generate_content_cards_batch(
+                        topics=[state.topic for state in batch_states],
+                        content_type=content_type_for_cards,
+                        card_context=card_context,
+                        provider=provider_enum,
+                        batch_size=len(batch_states)
+                    )
+                    return batch_states, cards, None
+                except ContentGenerationError as e:
+                    return batch_states, [None] * len(batch_states), str(e)
+
+        batches = [states[i:i + batch_size] for i in range(0, len(states), batch_size)]
+        for finished in asyncio.as_completed([run_batch(batch) for batch in batches]):
+            batch_states, cards, batch_error = await finished
+            if cards is None:
+                continue
+            for state, card_data_dict in zip(batch_states, cards):
+                state.attempts += 1
+                if card_data_dict is None:
+                    state.status = TOPIC_FAILED
+                    state.error = batch_error or "No card returned for this topic"
+                    print(f"   ❌ Failed to generate card for topic '{state.topic}'")
+                    await self._checkpoint(job)
+                    continue
+                report = gate.evaluate(card_data_dict)
+                card_data_dict.setdefault('generation_metadata', {})['quality'] = report.to_dict()
+                state.card = card_data_dict
+                if not report.passed:
+                    # Kept in the checkpoint (pending) so a card that runs out of retries can still be saved
+                    state.status, state.error = TOPIC_PENDING, f"Quality gate: {'; '.join(report.issues)}"
+                    print(f"   ⚠️ Card for '{state.topic}' rejected (score {report.score}): {'; '.join(report.issues)}")
+                    await self._checkpoint(job)
+                    rejected.append((state, report))
+                    continue
+                gate.accept(card_data_dict)
+                state.status = TOPIC_GENERATED
+                state.error = None
+                await self._checkpoint(job)
+                await asyncio.to_thread(self._save_job_card, job, state, creator_data)
+                self._report_card_progress(job, state, progress_callback)
+        return rejected
+
+    async def _settle_rejected_card(self, job: GenerationJob, state: TopicState, report: QualityReport, creator_data: Dict[str, Any],
+                              gate: QualityGate, progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """Out of retries: unusable cards fail (a resume tries again), cards with minor issues are saved flagged."""
+        if report.hard:
+            state.status = TOPIC_FAILED
+            print(f"   ❌ Card for '{state.topic}' still unusable after retries: {'; '.join(report.issues)}")
+            await self._checkpoint(job)
+            return
+        gate.accept(state.card)
+        state.status, state.error = TOPIC_GENERATED, None
+        await self._checkpoint(job)
+        await asyncio.to_thread(self._save_job_card, job, state, creator_data)
+        self._report_card_progress(job, state, progress_callback)
+
+    def _report_card_progress(self, job: GenerationJob, state: TopicState,
+                              progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        if progress_callback:
+            done = job.counts()[TOPIC_DONE]
+            progress_callback(done, len(job.topics), f"Card {done}/{len(job.topics)} saved: {state.topic}")
+
+    def _save_job_card(self, job: GenerationJob, state: TopicState, creator_data: Dict[str, Any], check_existing: bool = False):
+        """Saves a generated card to the DB and marks the topic done. With check_existing, a card saved
+        just before a crash (but not yet checkpointed) is adopted instead of duplicated."""
+        if check_existing:
+            existing = next((c for c in self.db.get_cards_by_set(job.set_id)
+                             if c.get('order_index') == state.index and c.get('domain_data', {}).get('topic') == state.topic), None)
+            if existing:
+                state.status, state.card_id = TOPIC_DONE, existing['card_id']
+                self.job_store.save(job)
+                return
+        saved_card = self._save_generated_card(job.set_id, creator_data, state.index, state.topic, job.guidance, state.card)
+        if saved_card:
+            state.status, state.card_id = TOPIC_DONE, saved_card.card_id
+        else:
+            state.error = "Generated but failed to save to database" # Stays 'generated'; saving is retried on resume
+        self.job_store.save(job)
+
+    def stream_cards_from_topics(self, creator_name: str, guidance: str, topics: List[str], provider_str: str) -> Iterator[Dict[str, Any]]:
+        """
+        Generates and saves cards one at a time while streaming their text, for live UI feedback.
+        Yields event dicts:
+          {'event': 'started', 'set_id', 'job_id', 'total'}
+          {'event': 'partial', 'index', 'topic', 'partial'}   (many per card)
+          {'event': 'card', 'index', 'topic', 'card', 'saved'}
+          {'event': 'error', 'index', 'topic', 'error'}
+          {'event': 'finished', 'set_id', 'generated', 'total'}
+        """
+        job = self.create_generation_job(creator_name, guidance, topics, provider_str)
+        creator_data = self._find_creator(creator_name)
+        provider_enum = self._provider_from_str(job.provider, "card generation")
+        content_type_for_cards = self._content_type_for_creator(creator_data)
+        set_id = job.set_id
+        job.status = JOB_RUNNING
+        self.job_store.save(job)
+        yield {'event': 'started', 'set_id': set_id, 'job_id': job.job_id, 'total': len(topics)}
+
+        # Live mode does not regenerate: unusable cards are left failed for "Resume job", minor issues are flagged
+        gate = QualityGate(self.content_generator.language)
+        generated_card_count = 0
+        for i, topic_text in enumerate(topics, 1):
+            state = job.topics[i - 1]
+            card_context = f"Card {i} of {len(topics)} for a set by {creator_name}. Overall guidance: {guidance}"
+            card_stream = self.content_generator.stream_content_card(
+                topic=topic_text,
+                content_type=content_type_for_cards,
+                card_context=card_context,
+                provider=provider_enum
+            )
+            try:
+                for stream_event in self.content_generator.iterate_sync(card_stream):
+                    if not stream_event['done']:
+                        yield {'event': 'partial', 'index': i, 'topic': topic_text, 'partial': stream_event['partial']}
+                        continue
+                    state.attempts += 1
+                    report = gate.evaluate(stream_event['card'])
+                    stream_event['card'].setdefault('generation_metadata', {})['quality'] = report.to_dict()
+                    state.card = stream_event['card']
+                    if report.hard:
+                        state.status, state.error = TOPIC_FAILED, f"Quality gate: {'; '.join(report.issues)}"
+                        self.job_store.save(job)
+                        yield {'event': 'error', 'index': i, 'topic': topic_text, 'error': state.error}
+                        continue
+                    gate.accept(state.card)
+                    state.status = TOPIC_GENERATED
+                    self.job_store.save(job)
+                    self._save_job_card(job, state, creator_data)
+                    if state.status == TOPIC_DONE:
+                        generated_card_count += 1
+                    yield {'event': 'card', 'index': i, 'topic': topic_text, 'card': stream_event['card'], 'saved': state.status == TOPIC_DONE}
+            except ContentGenerationError as e:
+                print(f"   ❌ Failed to generate card for topic '{topic_text}': {e}")
+                state.attempts += 1
+                state.status, state.error = TOPIC_FAILED, str(e)
+                self.job_store.save(job)
+                yield {'event': 'error', 'index': i, 'topic': topic_text, 'error': str(e)}
+
+        job.finish()
+        self.job_store.save(job)
+        self._publish_navigation_index(set_id)
+        print(f"✅ Successfully streamed {generated_card_count} cards into set {set_id} (job {job.job_id}).")
+        yield {'event': 'finished', 'set_id': set_id, 'generated': generated_card_count, 'total': len(topics)}
+
     def determine_creator_style(self, categories: List[str]) -> str:
         """Determines a general content style hint based on creator categories."""
         if not categories or not isinstance(categories, list): return 'default'
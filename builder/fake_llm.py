@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Fake LLM Provider - Deterministic, offline stand-in for load testing the generation pipeline.
+Responses are derived from a hash of the prompt (cards: of their topic), so reruns are reproducible.
+Latency, error rate and 429 rate limiting are configurable; a repeated system prompt is reported
+as cached prompt tokens, like provider-side prefix caching.
+
+Two ways to use it:
+  1. In-process: LLMProvider.FAKE inside UnifiedContentGenerator (INFOGEN_FAKE_LLM=1).
+  2. Over HTTP: `python fake_llm.py --port 8765` serves the OpenAI chat-completions protocol,
+     so the real AsyncOpenAI client path can be exercised end to end:
+         OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python card_builder.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+FAKE_MODEL_NAME = "fake-llm"
+
+# Vocabulary used to build deterministic Portuguese-looking content
+FILLER_WORDS = [
+    "ciência", "história", "saúde", "energia", "equilíbrio", "descoberta", "pesquisa", "hábito",
+    "natureza", "tecnologia", "memória", "exploração", "bem-estar", "nutrição", "universo", "cultura",
+]
+DIFFICULTY_LEVELS = ["beginner", "intermediate", "advanced"]
+FAKE_PREFIX_CACHE_SIZE = 256 # Distinct system prompts remembered for simulated prompt caching
+NUMBERED_TOPIC_PATTERN = re.compile(r'^\s*\d+\.\s+(.+?)\s*$', re.MULTILINE)
+TOPIC_LINE_PATTERN = re.compile(r'^Topic to address:\s*(.+?)\s*$', re.MULTILINE)
+CONTENT_BLOCK_PATTERN = re.compile(r'---\s*\n.*?:\s*\n(.+?)\n---', re.DOTALL)
+WORD_PATTERN = re.compile(r'[A-Za-zÀ-ÿ]{5,}')
+
+
+class FakeLLMError(Exception):
+    """Injected provider failure (HTTP 500 equivalent)."""
+    status_code = 500
+
+
+class FakeRateLimitError(FakeLLMError):
+    """Injected rate limit (HTTP 429 equivalent)."""
+    status_code = 429
+
+
+@dataclass
+class FakeLLMConfig:
+    """Latency and failure behaviour of the fake provider."""
+    latency_ms: float = 0.0               # Median latency per call
+    latency_distribution: str = "fixed"   # fixed | uniform | lognormal
+    latency_spread: float = 0.5           # uniform: +/- fraction of latency_ms; lognormal: sigma
+    error_rate: float = 0.0               # Probability of a 500-style failure
+    rate_limit_rate: float = 0.0          # Probability of a 429
+    stream_chunk_chars: int = 24          # Size of streamed deltas
+    seed: int = 0                         # Seeds latency/failure sampling (content is always prompt-derived)
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        """Reads INFOGEN_FAKE_* environment variables."""
+        return cls(
+            latency_ms=float(os.getenv("INFOGEN_FAKE_LATENCY_MS", "0")),
+            latency_distribution=os.getenv("INFOGEN_FAKE_LATENCY_DISTRIBUTION", "fixed"),
+            latency_spread=float(os.getenv("INFOGEN_FAKE_LATENCY_SPREAD", "0.5")),
+            error_rate=float(os.getenv("INFOGEN_FAKE_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("INFOGEN_FAKE_RATE_LIMIT_RATE", "0")),
+            seed=int(os.getenv("INFOGEN_FAKE_SEED", "0")),
+        )
+
+
+def _prompt_hash(*parts: Optional[str]) -> bytes:
+    return hashlib.sha256("\x1f".join(p or "" for p in parts).encode("utf-8")).digest()
+
+
+def _pick(digest: bytes, offset: int, options: List[str]) -> str:
+    return options[digest[offset % len(digest)] % len(options)]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for usage reporting."""
+    return max(1, len(text) // 4)
+
+
+def fake_card(topic: str, digest: bytes) -> Dict[str, Any]:
+    """A schema-valid card for `topic`, fully determined by `digest`."""
+    theme, angle = _pick(digest, 0, FILLER_WORDS), _pick(digest, 1, FILLER_WORDS)
+    topic_words = [w.lower() for w in WORD_PATTERN.findall(topic)]
+    keywords = list(dict.fromkeys(topic_words + [theme, angle, _pick(digest, 2, FILLER_WORDS)]))[:7]
+    while len(keywords) < 5:
+        keywords.append(_pick(digest, 3 + len(keywords), FILLER_WORDS) + str(len(keywords)))
+    paragraphs = [
+        f"{topic} é um tema que conecta {theme} e {angle} de maneiras surpreendentes.",
+        f"Estudos recentes sobre {theme} mostram por que {topic.lower()} importa no dia a dia.",
+        f"Entender {angle} ajuda a aplicar esse conhecimento com segurança e curiosidade.",
+    ]
+    return {
+        "title": f"O que a {theme} revela sobre {topic}?"[:200],
+        "summary": f"{topic} envolve {theme} e {angle}. Este cartão resume os pontos principais de forma acessível."[:300],
+        "detailed_content": "\n\n".join(paragraphs)[:1500],
+        "keywords": keywords,
+        "difficulty_tags": [_pick(digest, 4, DIFFICULTY_LEVELS)],
+    }
+
+
+def render_fake_response(system_prompt: Optional[str], user_prompt: str,
+                         response_schema: Optional[Dict[str, Any]] = None, json_mode: bool = False) -> str:
+    """
+    Builds a deterministic response in whatever format the prompt asks for (cards are keyed
+    on their topic, so batched and single-card calls agree):
+    batched JSON ({"cards": [...]}), a single JSON card, the TITLE:/SUMMARY: line format,
+    or a plain list of topics for topic extraction.
+    """
+    digest = _prompt_hash(system_prompt, user_prompt)
+    wants_json = json_mode or response_schema is not None
+    schema_properties = (response_schema or {}).get("properties", {})
+
+    if "cards" in schema_properties or (wants_json and '"cards"' in (system_prompt or "") + user_prompt):
+        topics = NUMBERED_TOPIC_PATTERN.findall(user_prompt)
+        cards = [dict(topic=topic, **fake_card(topic, _prompt_hash(topic))) for topic in topics]
+        return json.dumps({"cards": cards}, ensure_ascii=False)
+
+    topic_match = TOPIC_LINE_PATTERN.search(user_prompt)
+    if topic_match:
+        card = fake_card(topic_match.group(1), _prompt_hash(topic_match.group(1)))
+        if wants_json:
+            return json.dumps(card, ensure_ascii=False)
+        return (f"TITLE: {card['title']}\nSUMMARY: {card['summary']}\n"
+                f"DETAILED: {card['detailed_content']}\nKEYWORDS: {', '.join(card['keywords'])}\n"
+                f"DIFFICULTY: {card['difficulty_tags'][0]}")
+
+    # Topic extraction / generic text: short topic lines built from the source content
+    content_match = CONTENT_BLOCK_PATTERN.search(user_prompt)
+    source_words = list(dict.fromkeys(w.lower() for w in WORD_PATTERN.findall(content_match.group(1) if content_match else user_prompt)))
+    if not source_words:
+        source_words = FILLER_WORDS
+    topic_count = 5 + digest[5] % 6
+    lines = []
+    for i in range(topic_count):
+        word = source_words[digest[(6 + i) % len(digest)] % len(source_words)]
+        lines.append(f"{word.capitalize()} e {_pick(digest, 10 + i, FILLER_WORDS)}")
+    return "\n".join(dict.fromkeys(lines))
+
+
+class FakeLLMClient:
+    """In-process fake provider used by UnifiedContentGenerator for LLMProvider.FAKE."""
+
+    def __init__(self, config: Optional[FakeLLMConfig] = None):
+        self.config = config or FakeLLMConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes: Dict[str, None] = {}
+        self.calls = 0
+
+    def sample_latency_seconds(self) -> float:
+        config = self.config
+        if config.latency_ms <= 0:
+            return 0.0
+        with self._lock:
+            if config.latency_distribution == "uniform":
+                low = config.latency_ms * (1 - config.latency_spread)
+                high = config.latency_ms * (1 + config.latency_spread)
+                latency_ms = self._rng.uniform(max(0.0, low), high)
+            elif config.latency_distribution == "lognormal":
+                # Median = latency_ms; long right tail like real provider latencies
+                latency_ms = config.latency_ms * self._rng.lognormvariate(0.0, config.latency_spread)
+            else:
+                latency_ms = config.latency_ms
+        return latency_ms / 1000.0
+
+    def sample_failure(self) -> Optional[FakeLLMError]:
+        """Returns the injected failure for this call, if any."""
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+        if roll < self.config.rate_limit_rate:
+            return FakeRateLimitError("Fake provider: rate limit exceeded (429)")
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            return FakeLLMError("Fake provider: injected server error (500)")
+        return None
+
+    def usage_for(self, system_prompt: Optional[str], user_prompt: str, text: str, max_tokens: int) -> Dict[str, int]:
+        """OpenAI-style usage. A system prompt seen before counts as cached, like provider prefix caching."""
+        usage = {"prompt_tokens": estimate_tokens((system_prompt or "") + user_prompt),
+                 "completion_tokens": min(max_tokens, estimate_tokens(text)), "cached_tokens": 0}
+        if system_prompt:
+            key = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+            with self._lock:
+                if key in self._cached_prefixes:
+                    usage["cached_tokens"] = estimate_tokens(system_prompt)
+                elif len(self._cached_prefixes) >= FAKE_PREFIX_CACHE_SIZE:
+                    self._cached_prefixes.pop(next(iter(self._cached_prefixes))) # Oldest out
+                self._cached_prefixes[key] = None
+        return usage
+
+    async def complete(self, system_prompt: Optional[str], user_prompt: str, max_tokens: int,
+                       response_schema: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, int]]:
+        """Returns (response_text, usage) after the sampled latency, or raises an injected failure."""
+        await asyncio.sleep(self.sample_latency_seconds())
+        failure = self.sample_failure()
+        if failure:
+            raise failure
+        text = render_fake_response(system_prompt, user_prompt, response_schema)
+        return text, self.usage_for(system_prompt, user_prompt, text, max_tokens)
+
+    async def stream(self, system_prompt: Optional[str], user_prompt: str, max_tokens: int,
+                     usage: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        """Yields the text-format response in chunks, spreading the sampled latency over them."""
+        latency = self.sample_latency_seconds()
+        failure = self.sample_failure()
+        if failure:
+            await asyncio.sleep(latency)
+            raise failure
+        text = render_fake_response(system_prompt, user_prompt)
+        size = max(1, self.config.stream_chunk_chars)
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        for chunk in chunks:
+            await asyncio.sleep(latency / len(chunks))
+            yield chunk
+        if usage is not None:
+            usage.update(self.usage_for(system_prompt, user_prompt, text, max_tokens))
+
+
+class FakeOpenAIServer:
+    """
+    Local HTTP stand-in for the OpenAI chat-completions API (POST /v1/chat/completions),
+    including streaming (SSE) and 429 responses with Retry-After. Runs in a daemon thread.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, config: Optional[FakeLLMConfig] = None):
+        self.client = FakeLLMClient(config)
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _make_handler(self):
+        fake_client = self.client
+
+        class ChatCompletionsHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                messages = request.get("messages", [])
+                system_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system") or None
+                user_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+                json_mode = (request.get("response_format") or {}).get("type") in ("json_object", "json_schema")
+                max_tokens = int(request.get("max_tokens") or 2000)
+                model = request.get("model", FAKE_MODEL_NAME)
+
+                time.sleep(fake_client.sample_latency_seconds())
+                failure = fake_client.sample_failure()
+                if isinstance(failure, FakeRateLimitError):
+                    self._send_json(429, {"error": {"message": str(failure), "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                                    headers={"Retry-After": "1"})
+                    return
+                if failure:
+                    self._send_json(500, {"error": {"message": str(failure), "type": "server_error"}})
+                    return
+
+                text = render_fake_response(system_prompt, user_prompt, json_mode=json_mode)
+                call_usage = fake_client.usage_for(system_prompt, user_prompt, text, max_tokens)
+                usage = {"prompt_tokens": call_usage["prompt_tokens"], "completion_tokens": call_usage["completion_tokens"],
+                         "total_tokens": call_usage["prompt_tokens"] + call_usage["completion_tokens"],
+                         "prompt_tokens_details": {"cached_tokens": call_usage["cached_tokens"]}}
+                completion_id = f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+                created = int(time.time())
+
+                if request.get("stream"):
+                    self._stream(completion_id, created, model, text, usage,
+                                 include_usage=(request.get("stream_options") or {}).get("include_usage", False))
+                    return
+
+                self._send_json(200, {
+                    "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+
+            def _stream(self, completion_id: str, created: int, model: str, text: str, usage: Dict[str, int], include_usage: bool):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                def send_event(payload: Dict[str, Any]):
+                    self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+                size = max(1, fake_client.config.stream_chunk_chars)
+                for i in range(0, len(text), size):
+                    send_event(dict(base, choices=[{"index": 0, "delta": {"content": text[i:i + size]}, "finish_reason": None}]))
+                send_event(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+                if include_usage:
+                    send_event(dict(base, choices=[], usage=usage))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass # Load tests would flood the console otherwise
+
+        return ChatCompletionsHandler
+
+    def start(self) -> "FakeOpenAIServer":
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.port = self._server.server_address[1] # Resolves port=0 to the bound port
+        threading.Thread(target=self._server.serve_forever, name="fake-openai-server", daemon=True).start()
+        print(f"🧪 Fake OpenAI-compatible server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a deterministic fake OpenAI chat-completions API for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=None, help="Median latency per call")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default=None)
+    parser.add_argument("--spread", type=float, default=None, help="uniform: +/- fraction; lognormal: sigma")
+    parser.add_argument("--error-rate", type=float, default=None)
+    parser.add_argument("--rate-limit-rate", type=float, default=None, help="Probability of answering 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server_config = FakeLLMConfig.from_env()
+    overrides = {"latency_ms": args.latency_ms, "latency_distribution": args.distribution, "latency_spread": args.spread,
+                 "error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate, "seed": args.seed}
+    for field_name, value in overrides.items():
+        if value is not None:
+            setattr(server_config, field_name, value)
+
+    fake_server = FakeOpenAIServer(args.host, args.port, server_config).start()
+    print(f"Point the builder at it with: OPENAI_BASE_URL={fake_server.base_url} OPENAI_API_KEY=fake")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake_server.stop()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Generation Jobs - Persisted, resumable card generation runs.
+Each job is a JSON file in data/jobs/ holding the topics, target set_id, provider and per-topic
+status (with the generated card), checkpointed after every card so a crashed run can be resumed
+without paying for the same LLM responses twice.
+"""
+
+import json
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+
+# Per-topic states
+TOPIC_PENDING = "pending"      # Not generated yet
+TOPIC_GENERATED = "generated"  # LLM response received and stored, not yet saved to the card DB
+TOPIC_DONE = "done"            # Card saved to the DB
+TOPIC_FAILED = "failed"        # Last attempt failed; retried on resume
+
+# Job states
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"    # Every topic done
+JOB_PARTIAL = "partial"        # Finished with some failed topics
+JOB_FAILED = "failed"          # Stopped by an error before finishing
+JOB_CANCELLED = "cancelled"
+
+
+@dataclass
+class TopicState:
+    """Progress of one topic inside a job."""
+    index: int                                  # 1-based position; becomes the card's order_index
+    topic: str
+    status: str = TOPIC_PENDING
+    attempts: int = 0
+    card: Optional[Dict[str, Any]] = None       # Parsed LLM response (kept until and after saving)
+    card_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class GenerationJob:
+    """A card generation run for one content set."""
+    job_id: str
+    creator_name: str
+    creator_id: str
+    guidance: str
+    provider: str
+    set_id: str
+    topics: List[TopicState] = field(default_factory=list)
+    batch_size: Optional[int] = None
+    status: str = JOB_PENDING
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    @classmethod
+    def create(cls, creator_name: str, creator_id: str, guidance: str, provider: str, set_id: str,
+               topics: List[str], batch_size: Optional[int] = None) -> "GenerationJob":
+        job_id = f"job_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        return cls(job_id=job_id, creator_name=creator_name, creator_id=creator_id, guidance=guidance,
+                   provider=provider, set_id=set_id, batch_size=batch_size,
+                   topics=[TopicState(index=i, topic=topic) for i, topic in enumerate(topics, 1)])
+
+    def topics_with_status(self, *statuses: str) -> List[TopicState]:
+        return [state for state in self.topics if state.status in statuses]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {TOPIC_PENDING: 0, TOPIC_GENERATED: 0, TOPIC_DONE: 0, TOPIC_FAILED: 0}
+        for state in self.topics:
+            counts[state.status] = counts.get(state.status, 0) + 1
+        return counts
+
+    def finish(self):
+        """Sets the final job status from the topic states."""
+        counts = self.counts()
+        self.status = JOB_COMPLETED if counts[TOPIC_DONE] == len(self.topics) else JOB_PARTIAL
+
+    def summary(self) -> str:
+        counts = self.counts()
+        return (f"Job {self.job_id} [{self.status}] set {self.set_id}: {counts[TOPIC_DONE]}/{len(self.topics)} cards saved, "
+                f"{counts[TOPIC_FAILED]} failed, {counts[TOPIC_PENDING] + counts[TOPIC_GENERATED]} remaining")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GenerationJob":
+        data = dict(data)
+        data["topics"] = [TopicState(**state) for state in data.get("topics", [])]
+        return cls(**data)
+
+
+class JobStore:
+    """One JSON file per job under <data_dir>/jobs, written atomically."""
+
+    def __init__(self, data_dir: str = "data"):
+        self.jobs_dir = Path(data_dir) / "jobs"
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{Path(job_id).name}.json" # Path().name guards against traversal in ids typed in the UI
+
+    def save(self, job: GenerationJob):
+        """Checkpoint: write to a temp file then os.replace, so a crash never leaves a half-written job."""
+        job.updated_at = datetime.utcnow().isoformat()
+        fd, tmp_path = tempfile.mkstemp(dir=self.jobs_dir, prefix=f".{job.job_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job.to_dict(), f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(job.job_id))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, job_id: str) -> Optional[GenerationJob]:
+        path = self._path(job_id.strip())
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return GenerationJob.from_dict(json.load(f))
+
+    def list_jobs(self) -> List[GenerationJob]:
+        """All jobs, newest first."""
+        jobs = []
+        for path in self.jobs_dir.glob("job_*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    jobs.append(GenerationJob.from_dict(json.load(f)))
+            except (OSError, ValueError, TypeError) as e:
+                print(f"⚠️ Skipping unreadable job file {path.name}: {e}")
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
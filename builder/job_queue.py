@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Job Queue - SQLite-backed local queue for background card generation and topic extraction.
+The Gradio UI enqueues and polls; worker.py processes claim jobs by priority. SQLite handles
+locking across processes, so several workers and UI instances can share one queue file.
+Workers also store their LLM usage metrics here, so the UI can report usage across processes.
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+
+# Job kinds handled by worker.py
+KIND_GENERATE_CARDS = "generate_cards"        # payload: creator_name, guidance, topics, provider, batch_size
+KIND_RESUME_GENERATION = "resume_generation"  # payload: generation_job_id
+KIND_EXTRACT_TOPICS = "extract_topics"        # payload: creator_name, guidance, content, provider, use_cache
+
+# Queue states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_jobs (
+    queue_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    generation_job_id TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_jobs_claim ON queue_jobs (status, priority DESC, created_at);
+CREATE TABLE IF NOT EXISTS worker_metrics (
+    worker_id TEXT PRIMARY KEY,
+    snapshot TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class JobQueue:
+    """Priority job queue stored in a SQLite file (one short-lived connection per operation)."""
+
+    def __init__(self, db_path: str = "data/job_queue.sqlite3"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL") # Readers (UI polling) don't block the writer (workers)
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None) # Autocommit; explicit BEGIN where needed
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], priority: int = PRIORITY_NORMAL) -> str:
+        """Adds a job and returns its queue id."""
+        queue_id = f"q_{uuid.uuid4().hex[:12]}"
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO queue_jobs (queue_id, kind, payload, priority, created_at, generation_job_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (queue_id, kind, json.dumps(payload, ensure_ascii=False), priority, time.time(), payload.get("generation_job_id"))
+            )
+        print(f"📥 Enqueued {kind} job {queue_id} (priority {priority})")
+        return queue_id
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically takes the highest-priority, oldest queued job for this worker."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE") # Write lock up front so two workers can't claim the same row
+            row = conn.execute(
+                "SELECT queue_id FROM queue_jobs WHERE status = ? ORDER BY priority DESC, created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE queue_jobs SET status = ?, worker_id = ?, started_at = ?, message = ? WHERE queue_id = ?",
+                (RUNNING, worker_id, time.time(), "Started", row["queue_id"])
+            )
+            claimed = conn.execute("SELECT * FROM queue_jobs WHERE queue_id = ?", (row["queue_id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._row_to_dict(claimed)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def update_progress(self, queue_id: str, progress: float, message: str = ""):
+        with self._connection() as conn:
+            conn.execute("UPDATE queue_jobs SET progress = ?, message = ? WHERE queue_id = ?",
+                         (max(0.0, min(1.0, progress)), message, queue_id))
+
+    def set_generation_job_id(self, queue_id: str, generation_job_id: str):
+        """Links a queue entry to its resumable generation job (see generation_jobs.py)."""
+        with self._connection() as conn:
+            conn.execute("UPDATE queue_jobs SET generation_job_id = ? WHERE queue_id = ?", (generation_job_id, queue_id))
+
+    def complete(self, queue_id: str, result: Optional[Dict[str, Any]] = None, message: str = "Completed"):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE queue_jobs SET status = ?, progress = 1, message = ?, result = ?, finished_at = ? WHERE queue_id = ?",
+                (COMPLETED, message, json.dumps(result or {}, ensure_ascii=False), time.time(), queue_id)
+            )
+
+    def fail(self, queue_id: str, error: str):
+        with self._connection() as conn:
+            conn.execute("UPDATE queue_jobs SET status = ?, error = ?, message = ?, finished_at = ? WHERE queue_id = ?",
+                         (FAILED, error, "Failed", time.time(), queue_id))
+
+    def mark_cancelled(self, queue_id: str, message: str = "Cancelled"):
+        with self._connection() as conn:
+            conn.execute("UPDATE queue_jobs SET status = ?, message = ?, finished_at = ? WHERE queue_id = ?",
+                         (CANCELLED, message, time.time(), queue_id))
+
+    def request_cancel(self, queue_id: str) -> bool:
+        """Queued jobs are cancelled immediately; running jobs stop at their next checkpoint."""
+        with self._connection() as conn:
+            cancelled_now = conn.execute(
+                "UPDATE queue_jobs SET status = ?, message = ?, finished_at = ? WHERE queue_id = ? AND status = ?",
+                (CANCELLED, "Cancelled before start", time.time(), queue_id, QUEUED)
+            ).rowcount
+            flagged = conn.execute(
+                "UPDATE queue_jobs SET cancel_requested = 1, message = ? WHERE queue_id = ? AND status = ?",
+                ("Cancellation requested", queue_id, RUNNING)
+            ).rowcount
+        return bool(cancelled_now or flagged)
+
+    def is_cancel_requested(self, queue_id: str) -> bool:
+        with self._connection() as conn:
+            row = conn.execute("SELECT cancel_requested FROM queue_jobs WHERE queue_id = ?", (queue_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def requeue_interrupted(self, is_worker_alive: Optional[Callable[[str], bool]] = None) -> int:
+        """Puts jobs left 'running' by dead workers back in the queue (generation resumes from its checkpoint).
+        Without is_worker_alive, every running job is treated as interrupted."""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT queue_id, worker_id FROM queue_jobs WHERE status = ?", (RUNNING,)).fetchall()
+            stale = [row["queue_id"] for row in rows if not (is_worker_alive and row["worker_id"] and is_worker_alive(row["worker_id"]))]
+            for queue_id in stale:
+                conn.execute("UPDATE queue_jobs SET status = ?, worker_id = NULL, message = ? WHERE queue_id = ? AND status = ?",
+                             (QUEUED, "Requeued after worker restart", queue_id, RUNNING))
+        if stale:
+            print(f"🔁 Requeued {len(stale)} interrupted job(s)")
+        return len(stale)
+
+    def get(self, queue_id: str) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM queue_jobs WHERE queue_id = ?", (queue_id.strip(),)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def find_active(self, generation_job_id: str) -> Optional[Dict[str, Any]]:
+        """Queued or running entry for a generation job, so it is not resumed twice at once."""
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM queue_jobs WHERE generation_job_id = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                               (generation_job_id, QUEUED, RUNNING)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first."""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT * FROM queue_jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def save_worker_metrics(self, worker_id: str, snapshot: Dict[str, Any]):
+        """Stores the latest metrics snapshot of a worker process (MetricsRegistry.snapshot(), cumulative)."""
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO worker_metrics (worker_id, snapshot, updated_at) VALUES (?, ?, ?)",
+                         (worker_id, json.dumps(snapshot), time.time()))
+
+    def worker_metrics(self, updated_since: float = 0.0) -> List[Dict[str, Any]]:
+        """Latest metrics snapshot of every worker that reported since updated_since."""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT snapshot FROM worker_metrics WHERE updated_at >= ?", (updated_since,)).fetchall()
+        return [json.loads(row["snapshot"]) for row in rows]
@@ -6,10 +6,18 @@ Uses jsonformer-claude for reliable structured data generation
 
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import fcntl # POSIX advisory locks, so background workers and the UI can write the same files
+except ImportError:
+    fcntl = None
+
 from core_models import Creator, ContentSet, ContentCard, ContentType, NavigationType
 
 
@@ -24,6 +32,8 @@ class JSONDatabaseManager:
         self.creators_file = self.data_dir / "creators.json"
         self.content_sets_file = self.data_dir / "content_sets.json" 
         self.cards_file = self.data_dir / "cards.json"
+        self.lock_file = self.data_dir / ".db.lock"
+        self._thread_lock = threading.RLock()
         
         # Initialize empty collections if files don't exist
         self._init_collections()
@@ -41,22 +51,44 @@ class JSONDatabaseManager:
             return json.load(f)
     
     def _save_collection(self, file_path: Path, data: List[Dict]):
-        """Save a JSON collection file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """Save a JSON collection file (temp file + rename, so readers never see a partial write)"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, prefix=f".{file_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @contextmanager
+    def _write_lock(self):
+        """Serializes read-modify-write cycles across threads and worker processes"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_file, 'a') as lock_handle:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
     
     # Creator operations
     def add_creator(self, creator: Creator) -> bool:
         """Add a new creator"""
-        creators = self._load_collection(self.creators_file)
+        with self._write_lock():
+            creators = self._load_collection(self.creators_file)
         
-        # Check if creator already exists
-        if any(c['creator_id'] == creator.creator_id for c in creators):
-            return False
+            # Check if creator already exists
+            if any(c['creator_id'] == creator.creator_id for c in creators):
+                return False
         
-        creators.append(creator.to_dict())
-        self._save_collection(self.creators_file, creators)
-        return True
+            creators.append(creator.to_dict())
+            self._save_collection(self.creators_file, creators)
+            return True
     
     def get_creator(self, creator_id: str) -> Optional[Dict]:
         """Get creator by ID"""
@@ -80,29 +112,31 @@ class JSONDatabaseManager:
     
     def delete_creator(self, creator_id: str) -> bool:
         """Delete a creator by ID"""
-        creators = self._load_collection(self.creators_file)
-        original_count = len(creators)
+        with self._write_lock():
+            creators = self._load_collection(self.creators_file)
+            original_count = len(creators)
         
-        # Remove creator with matching ID
-        creators = [c for c in creators if c['creator_id'] != creator_id]
+            # Remove creator with matching ID
+            creators = [c for c in creators if c['creator_id'] != creator_id]
         
-        if len(creators) < original_count:
-            self._save_collection(self.creators_file, creators)
-            return True
-        return False
+            if len(creators) < original_count:
+                self._save_collection(self.creators_file, creators)
+                return True
+            return False
     
     # Content Set operations  
     def add_content_set(self, content_set: ContentSet) -> bool:
         """Add a new content set"""
-        sets = self._load_collection(self.content_sets_file)
+        with self._write_lock():
+            sets = self._load_collection(self.content_sets_file)
         
-        # Check if set already exists
-        if any(s['set_id'] == content_set.set_id for s in sets):
-            return False
+            # Check if set already exists
+            if any(s['set_id'] == content_set.set_id for s in sets):
+                return False
         
-        sets.append(content_set.to_dict())
-        self._save_collection(self.content_sets_file, sets)
-        return True
+            sets.append(content_set.to_dict())
+            self._save_collection(self.content_sets_file, sets)
+            return True
     
     def get_content_set(self, set_id: str) -> Optional[Dict]:
         """Get content set by ID"""
@@ -125,29 +159,31 @@ class JSONDatabaseManager:
     # Card operations
     def add_card(self, card: ContentCard) -> bool:
         """Add a new card"""
-        cards = self._load_collection(self.cards_file)
+        with self._write_lock():
+            cards = self._load_collection(self.cards_file)
         
-        # Check if card already exists
-        if any(c['card_id'] == card.card_id for c in cards):
-            return False
+            # Check if card already exists
+            if any(c['card_id'] == card.card_id for c in cards):
+                return False
         
-        cards.append(card.to_dict())
-        self._save_collection(self.cards_file, cards)
-        return True
+            cards.append(card.to_dict())
+            self._save_collection(self.cards_file, cards)
+            return True
     
     def add_cards_batch(self, cards: List[ContentCard]) -> int:
         """Add multiple cards in batch"""
-        existing_cards = self._load_collection(self.cards_file)
-        existing_ids = {c['card_id'] for c in existing_cards}
+        with self._write_lock():
+            existing_cards = self._load_collection(self.cards_file)
+            existing_ids = {c['card_id'] for c in existing_cards}
         
-        new_cards_data = []
-        for card in cards:
-            if card.card_id not in existing_ids:
-                new_cards_data.append(card.to_dict())
+            new_cards_data = []
+            for card in cards:
+                if card.card_id not in existing_ids:
+                    new_cards_data.append(card.to_dict())
         
-        existing_cards.extend(new_cards_data)
-        self._save_collection(self.cards_file, existing_cards)
-        return len(new_cards_data)
+            existing_cards.extend(new_cards_data)
+            self._save_collection(self.cards_file, existing_cards)
+            return len(new_cards_data)
     
     def get_cards_by_set(self, set_id: str) -> List[Dict]:
         """Get all cards in a content set"""
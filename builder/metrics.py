@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Metrics Registry - In-process counters and histograms for LLM usage and cost.
+Exposed as Prometheus text (optional HTTP endpoint) and as a Markdown summary for the Gradio UI.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# USD per 1M tokens (input, output). Update when provider pricing changes.
+MODEL_PRICING_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "models/gemini-1.5-flash-latest": (0.075, 0.30),
+    "models/gemini-2.0-flash": (0.10, 0.40),
+}
+
+# Price of cached prompt tokens relative to the normal input price (read, write), by model-name prefix.
+# Anthropic bills cache reads at 10% and cache writes at 125%; OpenAI discounts cached reads by 50%
+# and Gemini's implicit cache by 75%, with no write surcharge.
+CACHE_PRICE_FACTORS: Dict[str, Tuple[float, float]] = {
+    "claude": (0.10, 1.25),
+    "models/gemini": (0.25, 1.0),
+}
+DEFAULT_CACHE_PRICE_FACTORS = (0.50, 1.0)
+
+LATENCY_BUCKETS_SECONDS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def estimate_cost_usd(model: str, prompt_tokens: int, completion_tokens: int,
+                      cached_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """Estimated cost of one call; unknown models are counted as free rather than guessed.
+    `prompt_tokens` is the total input, including the cached and cache-write parts."""
+    input_price, output_price = MODEL_PRICING_PER_MILLION.get(model, (0.0, 0.0))
+    read_factor, write_factor = next((factors for prefix, factors in CACHE_PRICE_FACTORS.items() if model.startswith(prefix)),
+                                     DEFAULT_CACHE_PRICE_FACTORS)
+    uncached_tokens = max(0, prompt_tokens - cached_tokens - cache_write_tokens)
+    input_cost = (uncached_tokens + cached_tokens * read_factor + cache_write_tokens * write_factor) * input_price
+    return (input_cost + completion_tokens * output_price) / 1_000_000
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.bucket_counts[i] += 1
+
+
+class MetricsRegistry:
+    """Thread-safe registry of labelled counters and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _label_key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1.0, help_text: str = "", **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = self._label_key(labels)
+            series[key] = series.get(key, 0.0) + value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS_SECONDS,
+                help_text: str = "", **labels):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = self._label_key(labels)
+            if key not in series:
+                series[key] = _Histogram(buckets)
+            series[key].observe(value)
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """Sum of a counter over all series matching the given labels."""
+        with self._lock:
+            wanted = set(self._label_key(labels))
+            return sum(value for key, value in self._counters.get(name, {}).items() if wanted <= set(key))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serialisable copy of every series, for merging into another process's registry."""
+        with self._lock:
+            return {
+                "counters": {name: [[list(map(list, key)), value] for key, value in series.items()]
+                             for name, series in self._counters.items()},
+                "histograms": {name: [[list(map(list, key)), list(h.buckets), list(h.bucket_counts), h.count, h.sum]
+                                      for key, h in series.items()]
+                               for name, series in self._histograms.items()},
+                "help": dict(self._help),
+            }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """Adds the series of a snapshot() to this registry."""
+        with self._lock:
+            for name, series in snapshot.get("counters", {}).items():
+                target = self._counters.setdefault(name, {})
+                for labels, value in series:
+                    key = self._label_key(dict(labels))
+                    target[key] = target.get(key, 0.0) + value
+            for name, series in snapshot.get("histograms", {}).items():
+                target = self._histograms.setdefault(name, {})
+                for labels, buckets, bucket_counts, count, total in series:
+                    key = self._label_key(dict(labels))
+                    histogram = target.setdefault(key, _Histogram(tuple(buckets)))
+                    histogram.bucket_counts = [a + b for a, b in zip(histogram.bucket_counts, bucket_counts)]
+                    histogram.count += count
+                    histogram.sum += total
+            for name, help_text in snapshot.get("help", {}).items():
+                self._help.setdefault(name, help_text)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = (f'{k}="{_escape_label_value(v)}"' for k, v in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    for upper_bound, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                        lines.append(f"{name}_bucket{self._format_labels(key, ('le', str(upper_bound)))} {bucket_count}")
+                    lines.append(f"{name}_bucket{self._format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def llm_usage_by_model(self) -> List[Dict[str, float]]:
+        """Per provider/model totals used by the UI summary and reports."""
+        rows: Dict[Tuple[str, str], Dict[str, float]] = {}
+        with self._lock:
+            def row_for(key: LabelKey) -> Dict[str, float]:
+                labels = dict(key)
+                row_key = (labels.get("provider", "?"), labels.get("model", "?"))
+                return rows.setdefault(row_key, {"provider": row_key[0], "model": row_key[1], "requests": 0, "errors": 0,
+                                                  "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+                                                  "cache_write_tokens": 0, "cost_usd": 0.0, "cards": 0, "latency_sum": 0.0})
+
+            for key, value in self._counters.get("infogen_llm_requests_total", {}).items():
+                row = row_for(key)
+                row["requests"] += value
+                if dict(key).get("outcome") != "success":
+                    row["errors"] += value
+            counter_fields = {
+                "infogen_llm_prompt_tokens_total": "prompt_tokens",
+                "infogen_llm_completion_tokens_total": "completion_tokens",
+                "infogen_llm_cached_tokens_total": "cached_tokens",
+                "infogen_llm_cache_write_tokens_total": "cache_write_tokens",
+                "infogen_llm_cost_usd_total": "cost_usd",
+                "infogen_cards_generated_total": "cards",
+            }
+            for metric_name, field_name in counter_fields.items():
+                for key, value in self._counters.get(metric_name, {}).items():
+                    row_for(key)[field_name] += value
+            for key, histogram in self._histograms.get("infogen_llm_request_latency_seconds", {}).items():
+                row_for(key)["latency_sum"] += histogram.sum
+        return sorted(rows.values(), key=lambda r: (r["provider"], r["model"]))
+
+    def summary_markdown(self) -> str:
+        """Markdown table for the Gradio status panel."""
+        rows = self.llm_usage_by_model()
+        if not rows:
+            return "No LLM calls recorded since startup."
+        lines = [
+            "| Provider | Model | Calls | Errors | Prompt tok | Cached tok | Completion tok | Cost (USD) | Avg latency | Cards | Cost/card |",
+            "|---|---|---|---|---|---|---|---|---|---|---|",
+        ]
+        for r in rows:
+            avg_latency = r["latency_sum"] / r["requests"] if r["requests"] else 0.0
+            cost_per_card = f"${r['cost_usd'] / r['cards']:.5f}" if r["cards"] else "-"
+            lines.append(
+                f"| {r['provider']} | {r['model']} | {int(r['requests'])} | {int(r['errors'])} | "
+                f"{int(r['prompt_tokens'])} | {int(r['cached_tokens'])} | {int(r['completion_tokens'])} | ${r['cost_usd']:.4f} | "
+                f"{avg_latency:.2f}s | {int(r['cards'])} | {cost_per_card} |"
+            )
+        total_cost = sum(r["cost_usd"] for r in rows)
+        lines.append(f"\n**Total estimated cost since startup:** ${total_cost:.4f}")
+        return "\n".join(lines)
+
+
+# Process-wide default registry shared by the generator, UI and metrics endpoint
+METRICS = MetricsRegistry()
+
+
+def record_llm_call(provider: str, model: str, outcome: str, latency_seconds: float,
+                    prompt_tokens: int = 0, completion_tokens: int = 0, cached_tokens: int = 0,
+                    cache_write_tokens: int = 0, registry: Optional[MetricsRegistry] = None):
+    """Records one provider call: outcome counter, token/cost counters and latency histogram."""
+    registry = registry or METRICS
+    labels = {"provider": provider, "model": model}
+    registry.inc("infogen_llm_requests_total", help_text="LLM provider calls by outcome", outcome=outcome, **labels)
+    registry.observe("infogen_llm_request_latency_seconds", latency_seconds,
+                     help_text="LLM provider call latency", **labels)
+    if prompt_tokens or completion_tokens:
+        registry.inc("infogen_llm_prompt_tokens_total", prompt_tokens, help_text="Prompt (input) tokens", **labels)
+        registry.inc("infogen_llm_completion_tokens_total", completion_tokens, help_text="Completion (output) tokens", **labels)
+        registry.observe("infogen_llm_completion_tokens", completion_tokens, buckets=TOKEN_BUCKETS,
+                         help_text="Completion tokens per call", **labels)
+        registry.inc("infogen_llm_cost_usd_total", estimate_cost_usd(model, prompt_tokens, completion_tokens, cached_tokens, cache_write_tokens),
+                     help_text="Estimated spend in USD", **labels)
+    if cached_tokens:
+        registry.inc("infogen_llm_cached_tokens_total", cached_tokens, help_text="Prompt tokens served from provider cache", **labels)
+    if cache_write_tokens:
+        registry.inc("infogen_llm_cache_write_tokens_total", cache_write_tokens, help_text="Prompt tokens written to provider cache", **labels)
+
+
+def record_cards_generated(provider: str, model: str, count: int = 1, registry: Optional[MetricsRegistry] = None):
+    """Counts generated cards so cost per card can be derived."""
+    (registry or METRICS).inc("infogen_cards_generated_total", count, help_text="Cards produced by the generator",
+                              provider=provider, model=model)
+
+
+def combined_registry(registry: MetricsRegistry, snapshots: Iterable[Dict[str, Any]]) -> MetricsRegistry:
+    """New registry holding registry's series plus the given snapshots (e.g. those of worker processes)."""
+    combined = MetricsRegistry()
+    combined.started_at = registry.started_at
+    combined.merge_snapshot(registry.snapshot())
+    for snapshot in snapshots:
+        combined.merge_snapshot(snapshot)
+    return combined
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None,
+                         collect: Optional[Callable[[], MetricsRegistry]] = None) -> Optional[ThreadingHTTPServer]:
+    """Serves GET /metrics in Prometheus text format from a daemon thread. Returns None if the port is taken.
+    collect, when given, is called on every scrape for the registry to render (e.g. one including worker processes)."""
+    registry = registry or METRICS
+    collect = collect or (lambda: registry)
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = collect().render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Keep scrapes out of the console
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        print(f"⚠️ Metrics endpoint not started on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"📈 Prometheus metrics available at http://{host}:{port}/metrics")
+    return server
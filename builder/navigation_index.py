@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Navigation Index - Card orders of a set for every NavigationType, computed from the cards' metadata
+and written to data/navigation/<set_id>.json, which the viewer loads instead of computing anything.
+
+A card's place in an order comes from, in priority order:
+  1. its NavigationContext for that type (navigation_contexts[type].position),
+  2. its domain_data: ORDER_FIELDS[type] (date/year for timeline, theme/era for thematic, difficulty
+     for difficulty), or a field named after the type for any other NavigationType,
+  3. its order_index (cards without data for a type keep their set order, after the others).
+Categorical values (themes, eras) form groups in order of first appearance in the set; RANKED_VALUES
+orders known scales. RANDOM is not indexed: the viewer derives it from a seed at request time.
+
+Usage:
+    python navigation_index.py                      # every published set in data/
+    python navigation_index.py --set <set_id>
+    python navigation_index.py --lunar ../viewer/data/lunar_cards_json_10q_v1.json --output ../viewer/data/lunar_navigation.json
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core_models import NavigationType
+
+NAVIGATION_INDEX_DIR = "navigation"
+INDEX_FORMAT_VERSION = 1
+
+# domain_data fields that order each navigation type, first present field wins
+ORDER_FIELDS = {
+    NavigationType.TIMELINE.value: ("date", "year"),
+    NavigationType.THEMATIC.value: ("theme", "era"),
+    NavigationType.DIFFICULTY.value: ("difficulty",),
+}
+CHRONOLOGICAL_FIELDS = ("date", "year")
+ISO_DATE_PATTERN = re.compile(r"\s*(-?\d+)(?:-(\d{1,2})(?:-(\d{1,2}))?)?")  # 1969, 1969-07, 1969-07-20[T...]
+RANKED_VALUES = {"difficulty": ("beginner", "intermediate", "advanced")}
+UNINDEXED_TYPES = (NavigationType.RANDOM.value,)
+
+
+def card_order_value(card: Dict[str, Any], nav_type: str):
+    """(kind, value) of a card for a navigation type: ('position', n), (field name, value) or None"""
+    context = (card.get("navigation_contexts") or {}).get(nav_type)
+    if context and context.get("position") is not None:
+        return "position", context["position"]
+    domain_data = card.get("domain_data") or {}
+    for field_name in ORDER_FIELDS.get(nav_type, (nav_type,)):
+        value = domain_data.get(field_name)
+        if value not in (None, ""):
+            return field_name, value
+    return None
+
+
+def chronological_key(raw):
+    """Sortable key of a date/year value: (0, year, month, day) for int years and ISO dates (a bare year
+    sorts before the dates within it), (1, text) after them for anything that does not parse"""
+    if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        return (0, int(raw), 0, 0)
+    match = ISO_DATE_PATTERN.match(str(raw))
+    if match:
+        year, month, day = match.groups()
+        return (0, int(year), int(month or 0), int(day or 0))
+    return (1, str(raw))
+
+
+def compute_order(cards: List[Dict[str, Any]], nav_type: str) -> Optional[List[Any]]:
+    """Card ids of cards (already in set order) for nav_type, or None when no card has data for it"""
+    values = [card_order_value(card, nav_type) for card in cards]
+    if nav_type != NavigationType.TIMELINE.value and not any(values):
+        return None
+
+    def group_key(value):
+        return value[0], json.dumps(value[1], ensure_ascii=False, sort_keys=True, default=str)
+
+    first_seen: Dict[Any, int] = {}
+    for value in values:
+        if value and value[0] not in CHRONOLOGICAL_FIELDS + ("position",) and value[0] not in RANKED_VALUES:
+            first_seen.setdefault(group_key(value), len(first_seen))
+
+    def sort_key(item):
+        set_index, value = item
+        if value is None:
+            return (1, 0, "", set_index)
+        kind, raw = value
+        if kind == "position":
+            return (0, 0, f"{raw:012d}" if isinstance(raw, int) else str(raw), set_index)
+        if kind in CHRONOLOGICAL_FIELDS:
+            return (0, 1, chronological_key(raw), set_index)
+        if kind in RANKED_VALUES:
+            scale = RANKED_VALUES[kind]
+            return (0, 2, f"{scale.index(raw) if raw in scale else len(scale):04d}", set_index)
+        return (0, 3, f"{first_seen[group_key(value)]:06d}", set_index)
+
+    ordered = sorted(enumerate(values), key=sort_key)
+    return [cards[set_index]["card_id"] for set_index, _ in ordered]
+
+
+def build_navigation_index(set_id: str, cards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Navigation index of a set: {'format', 'set_id', 'card_count', 'orders': {type: [card_id, ...]}}"""
+    cards = sorted(cards, key=lambda c: (c.get("order_index", 0), c.get("created_at", "")))
+    orders = {}
+    for nav_type in NavigationType:
+        if nav_type.value in UNINDEXED_TYPES:
+            continue
+        order = compute_order(cards, nav_type.value)
+        if order is not None:
+            orders[nav_type.value] = order
+    return {"format": INDEX_FORMAT_VERSION, "set_id": set_id, "card_count": len(cards), "orders": orders}
+
+
+def write_index_file(index: Dict[str, Any], path: Path) -> Path:
+    """Compact JSON via temp file + rename, so the viewer never reads a partial index"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def navigation_index_path(data_dir, set_id: str) -> Path:
+    return Path(data_dir) / NAVIGATION_INDEX_DIR / f"{set_id}.json"
+
+
+def write_navigation_index(db, set_id: str) -> Path:
+    """Recompute and write the navigation index of a set from the database (db: JSONDatabaseManager)"""
+    index = build_navigation_index(set_id, db.get_cards_by_set(set_id))
+    path = write_index_file(index, navigation_index_path(db.data_dir, set_id))
+    print(f"🧭 Navigation index for {set_id}: {', '.join(index['orders'])} ({index['card_count']} cards)")
+    return path
+
+
+def lunar_navigation_index(cards_json_path) -> Dict[str, Any]:
+    """Navigation index of the viewer's original lunar cards (card ids are their numeric ids)"""
+    with open(cards_json_path, "r", encoding="utf-8") as f:
+        lunar_cards = json.load(f)["cards"]
+    cards = [{"card_id": card["id"], "order_index": card["id"], "domain_data": card.get("domain_data", {})}
+             for card in lunar_cards]
+    return build_navigation_index("lunar", cards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write navigation index files for the viewer")
+    parser.add_argument("--data-dir", default=str(Path(__file__).resolve().parent / "data"), help="Builder data directory")
+    parser.add_argument("--set", dest="set_id", help="Only this set (default: every published set)")
+    parser.add_argument("--lunar", type=Path, help="Index the viewer's lunar cards JSON instead (needs --output)")
+    parser.add_argument("--output", type=Path, help="Output file for --lunar")
+    args = parser.parse_args()
+
+    if args.lunar:
+        if not args.output:
+            parser.error("--lunar needs --output")
+        index = lunar_navigation_index(args.lunar)
+        write_index_file(index, args.output)
+        print(f"🧭 Navigation index for the lunar cards: {', '.join(index['orders'])} -> {args.output}")
+        return
+
+    from json_database import JSONDatabaseManager
+    db = JSONDatabaseManager(args.data_dir)
+    if args.set_id:
+        set_ids = [args.set_id]
+    else:
+        with open(db.content_sets_file, "r", encoding="utf-8") as f:
+            set_ids = [s["set_id"] for s in json.load(f) if s.get("status") == "published"]
+    for set_id in set_ids:
+        write_navigation_index(db, set_id)
+
+
+if __name__ == "__main__":
+    main()
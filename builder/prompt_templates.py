@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Prompt Templates - Versioned prompt files (builder/prompts/) loaded once and precompiled.
+
+A template file starts with `# key: value` header lines (`version` is required), followed by the body
+in str.format syntax. Variants are picked by file name, most specific first:
+    card_json.space_exploration.pt-BR.txt > card_json.space_exploration.txt > card_json.pt-BR.txt > card_json.txt
+Fields starting with `_` include another template (resolved with the same variant rules, e.g. {_guidance});
+`content_type`, `language` and `language_name` are bound at compile time too. Only the per-call fields
+(topic, context, content...) are left for render(), so a compiled template is one format string whose
+static paragraphs before the first per-call field are identical on every call (see `prefix`).
+"""
+
+import os
+import string
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROMPTS_DIR = Path(os.getenv("INFOGEN_PROMPTS_DIR", Path(__file__).resolve().parent / "prompts"))
+TEMPLATE_SUFFIX = ".txt"
+DEFAULT_LANGUAGE = "pt-BR"
+
+# How the output language is named inside the (English) instruction templates
+LANGUAGE_NAMES = {
+    "pt-BR": "Portuguese (Brazil)",
+    "pt-PT": "Portuguese (Portugal)",
+    "en": "English",
+    "es": "Spanish",
+}
+
+STATIC_FIELDS = ("content_type", "language", "language_name")
+
+_FORMATTER = string.Formatter()
+
+
+class PromptTemplateError(Exception):
+    """Missing template file, missing version header or missing render field."""
+    pass
+
+
+class TemplateSource:
+    """One parsed template file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.variant = path.name[:-len(TEMPLATE_SUFFIX)]
+        self.header: Dict[str, str] = {}
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+        body_start = 0
+        for body_start, line in enumerate(lines):
+            if not line.startswith("#"):
+                break
+            key, _, value = line[1:].partition(":")
+            self.header[key.strip().lower()] = value.strip()
+        else:
+            body_start = len(lines)
+        if not self.header.get("version"):
+            raise PromptTemplateError(f"Prompt template {path} has no '# version:' header")
+        self.version = self.header["version"]
+        self.body = "".join(lines[body_start:]).strip("\n") # Leading/trailing blank lines are layout only
+
+    @property
+    def version_id(self) -> str:
+        return f"{self.variant}@{self.version}"
+
+
+class PromptTemplate:
+    """A compiled template: static parts inlined, per-call fields left as format placeholders.
+    `prefix` is the static block (every paragraph before the first per-call field); it is identical on
+    every call, so callers can send it as a cacheable system prompt and render_dynamic() as the user turn."""
+
+    __slots__ = ("name", "version", "fields", "prefix", "_format", "_format_dynamic")
+
+    def __init__(self, name: str, version: str, format_string: str, fields: Tuple[str, ...]):
+        self.name = name
+        self.version = version   # e.g. "card_json@2+card_fields@1+guidance.wellness@1", stored on each card
+        self.fields = fields     # Per-call fields, in order of appearance
+        self._format = format_string.format
+        static_text, dynamic_format = self._split_static_block(format_string)
+        self.prefix = static_text
+        self._format_dynamic = dynamic_format.format
+
+    @staticmethod
+    def _split_static_block(format_string: str) -> Tuple[str, str]:
+        """Splits at the last paragraph break before the first per-call field."""
+        static_text = []
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(format_string):
+            if field_name is not None:
+                break
+            static_text.append(literal)
+        else:
+            return "".join(static_text).strip(), "" # No per-call fields: all static
+        head = "".join(static_text) + literal # Unescaped text up to the first field
+        cut = head.rfind("\n\n")
+        if cut == -1:
+            return "", format_string
+        escaped_cut = len(head[:cut].replace("{", "{{").replace("}", "}}"))
+        return head[:cut].strip(), format_string[escaped_cut:].lstrip("\n")
+
+    def render(self, **values: str) -> str:
+        try:
+            return self._format(**values)
+        except KeyError as e:
+            raise PromptTemplateError(f"Prompt template '{self.name}' needs field {e}") from None
+
+    def render_dynamic(self, **values: str) -> str:
+        """Only the per-call part (everything after `prefix`)."""
+        try:
+            return self._format_dynamic(**values)
+        except KeyError as e:
+            raise PromptTemplateError(f"Prompt template '{self.name}' needs field {e}") from None
+
+
+class PromptRegistry:
+    """Loads template files on first use and caches one compiled template per (name, content_type, language)."""
+
+    def __init__(self, prompts_dir: Optional[Path] = None):
+        self.prompts_dir = Path(prompts_dir or PROMPTS_DIR)
+        self._sources: Dict[str, Optional[TemplateSource]] = {}
+        self._compiled: Dict[Tuple[str, str, str], PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def _source(self, variant: str) -> Optional[TemplateSource]:
+        if variant not in self._sources:
+            path = self.prompts_dir / f"{variant}{TEMPLATE_SUFFIX}"
+            self._sources[variant] = TemplateSource(path) if path.exists() else None
+        return self._sources[variant]
+
+    def _resolve(self, name: str, content_type: str, language: str) -> TemplateSource:
+        candidates = [f"{name}.{content_type}.{language}", f"{name}.{content_type}", f"{name}.{language}", name]
+        for variant in candidates:
+            source = self._source(variant)
+            if source is not None:
+                return source
+        raise PromptTemplateError(f"No prompt template '{name}' in {self.prompts_dir}")
+
+    def _compile(self, name: str, content_type: str, language: str, versions: List[str], including: Tuple[str, ...] = ()) -> str:
+        """Returns the body as a format string with includes and static fields inlined (literal braces re-escaped)."""
+        if name in including:
+            raise PromptTemplateError(f"Prompt template include cycle: {' -> '.join(including + (name,))}")
+        source = self._resolve(name, content_type, language)
+        versions.append(source.version_id)
+        static_values = {"content_type": content_type, "language": language,
+                         "language_name": LANGUAGE_NAMES.get(language, language)}
+        parts = []
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(source.body):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field_name is None:
+                continue
+            if field_name.startswith("_"):
+                parts.append(self._compile(field_name[1:], content_type, language, versions, including + (name,)))
+            elif field_name in static_values:
+                parts.append(format(static_values[field_name], format_spec or "").replace("{", "{{").replace("}", "}}"))
+            else:
+                parts.append("{" + field_name + (f"!{conversion}" if conversion else "") + (f":{format_spec}" if format_spec else "") + "}")
+        return "".join(parts)
+
+    def get(self, name: str, content_type: Optional[str] = None, language: Optional[str] = None) -> PromptTemplate:
+        key = (name, content_type or "", language or DEFAULT_LANGUAGE)
+        template = self._compiled.get(key)
+        if template is None:
+            with self._lock:
+                template = self._compiled.get(key)
+                if template is None:
+                    versions: List[str] = []
+                    format_string = self._compile(name, key[1] or "general", key[2], versions)
+                    fields = tuple(dict.fromkeys(f for _, f, _, _ in _FORMATTER.parse(format_string) if f is not None))
+                    template = PromptTemplate(name, "+".join(versions), format_string, fields)
+                    self._compiled[key] = template
+        return template
+
+    def render(self, name: str, content_type: Optional[str] = None, language: Optional[str] = None, **values: str) -> str:
+        return self.get(name, content_type, language).render(**values)
+
+    def reload(self):
+        """Drops every cached file and compiled template (picks up edited prompt files)."""
+        with self._lock:
+            self._sources.clear()
+            self._compiled.clear()
+
+
+_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry()
+    return _registry
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Quality Gate - Post-generation checks for cards before they are saved.
+Scores each card on schema completeness (no parser placeholders), length bounds, output language
+(stopword heuristic, no extra dependency) and duplicate titles within the set. ContentManager
+regenerates only the rejected cards, batched together, within a retry budget.
+"""
+
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Length limits requested in the card prompts (prompts/card_fields.txt); small overruns are tolerated
+MAX_TITLE_CHARS = 200
+MAX_SUMMARY_CHARS = 300
+MAX_DETAILED_CHARS = 1500
+LENGTH_TOLERANCE = 1.1
+MIN_SUMMARY_CHARS = 40
+MIN_DETAILED_CHARS = 200
+MIN_KEYWORDS = 3
+
+# Retry policy: each rejected card gets at most QUALITY_MAX_RETRIES regenerations, and a run spends at
+# most QUALITY_RETRY_BUDGET_RATIO extra cards (at least one) on regeneration
+QUALITY_MAX_RETRIES = 2
+QUALITY_RETRY_BUDGET_RATIO = 0.5
+
+# Defaults filled in by UnifiedContentGenerator._parse_structured_response when parsing failed
+PLACEHOLDER_MARKERS = ("Parsing Issue", "parsing failed or not provided", "_parse_issue")
+
+# Language heuristic: share of very common function words. Short texts are not judged.
+MIN_WORDS_FOR_LANGUAGE_CHECK = 30
+STOPWORDS = {
+    "pt": {"de", "a", "o", "que", "e", "do", "da", "em", "um", "uma", "para", "é", "com", "não", "os", "as", "no", "na",
+           "por", "mais", "dos", "das", "como", "mas", "ao", "à", "seu", "sua", "ou", "são", "também", "pelo", "pela",
+           "isso", "entre", "quando", "muito", "nos", "já", "foi", "pode", "sobre", "seus", "suas", "ser", "está"},
+    "en": {"the", "and", "of", "to", "is", "in", "that", "it", "for", "with", "as", "are", "this", "on", "was", "be",
+           "by", "from", "or", "an", "which", "can", "its", "has", "have", "were", "their", "these", "they", "also"},
+    "es": {"el", "la", "los", "las", "que", "y", "en", "del", "se", "por", "con", "para", "una", "es", "al", "lo",
+           "como", "más", "pero", "sus", "le", "ya", "fue", "este", "también", "entre", "muy", "sin", "sobre", "hay"},
+}
+WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Issues that make a card unusable (never saved); the others are saved with a flag once retries run out
+HARD_ISSUES = ("missing", "placeholder")
+ISSUE_PENALTIES = {"missing": 0.5, "placeholder": 0.5, "language": 0.4, "duplicate_title": 0.3, "too_long": 0.15, "too_short": 0.15}
+
+
+@dataclass
+class QualityReport:
+    score: float                                  # 1.0 = no issues
+    issues: List[str] = field(default_factory=list)  # "kind: detail"
+    hard: bool = False                            # Structural failure: must not be saved
+
+    @property
+    def passed(self) -> bool:
+        return not self.issues
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def normalize_title(title: str) -> str:
+    """Case-, accent- and punctuation-insensitive form used for duplicate detection."""
+    decomposed = unicodedata.normalize("NFKD", title.casefold())
+    return " ".join(WORD_PATTERN.findall("".join(c for c in decomposed if not unicodedata.combining(c))))
+
+
+def detect_language(text: str) -> Optional[str]:
+    """Best stopword match among STOPWORDS ('pt', 'en', 'es'), or None for short or unclear text."""
+    words = [word.casefold() for word in WORD_PATTERN.findall(text)]
+    if len(words) < MIN_WORDS_FOR_LANGUAGE_CHECK:
+        return None
+    hits = {language: sum(1 for word in words if word in stopwords) for language, stopwords in STOPWORDS.items()}
+    best = max(hits, key=hits.get)
+    return best if hits[best] >= len(words) * 0.05 else None
+
+
+def quality_retry_budget(card_count: int) -> int:
+    return max(1, math.ceil(card_count * QUALITY_RETRY_BUDGET_RATIO))
+
+
+class QualityGate:
+    """Evaluates cards of one set. Titles of accepted cards are remembered to catch duplicates."""
+
+    def __init__(self, language: str = "pt-BR", existing_titles: Iterable[str] = ()):
+        self.language = language.split("-")[0].lower()
+        self._titles = {normalize_title(title) for title in existing_titles if title}
+
+    def evaluate(self, card: Dict[str, Any]) -> QualityReport:
+        issues = []
+        for key, max_chars, min_chars in (("title", MAX_TITLE_CHARS, 1), ("summary", MAX_SUMMARY_CHARS, MIN_SUMMARY_CHARS),
+                                          ("detailed_content", MAX_DETAILED_CHARS, MIN_DETAILED_CHARS)):
+            value = card.get(key)
+            if not isinstance(value, str) or not value.strip():
+                issues.append(f"missing: {key}")
+            elif any(marker in value for marker in PLACEHOLDER_MARKERS):
+                issues.append(f"placeholder: {key} could not be parsed")
+            elif len(value) > max_chars * LENGTH_TOLERANCE:
+                issues.append(f"too_long: {key} has {len(value)} characters (max {max_chars})")
+            elif len(value) < min_chars:
+                issues.append(f"too_short: {key} has {len(value)} characters (min {min_chars})")
+
+        keywords = [k for k in card.get("keywords") or [] if isinstance(k, str)]
+        if any(marker in k for k in keywords + list(card.get("difficulty_tags") or []) for marker in PLACEHOLDER_MARKERS):
+            issues.append("placeholder: keywords/difficulty could not be parsed")
+        elif len(keywords) < MIN_KEYWORDS:
+            issues.append(f"too_short: {len(keywords)} keywords (min {MIN_KEYWORDS})")
+
+        if self.language in STOPWORDS:
+            detected = detect_language(f"{card.get('summary', '')} {card.get('detailed_content', '')}")
+            if detected and detected != self.language:
+                issues.append(f"language: text looks like '{detected}', expected '{self.language}'")
+
+        title = card.get("title")
+        if isinstance(title, str) and normalize_title(title) in self._titles:
+            issues.append(f"duplicate_title: '{title}' already used in this set")
+
+        kinds = [issue.split(":", 1)[0] for issue in issues]
+        score = max(0.0, 1.0 - sum(ISSUE_PENALTIES.get(kind, 0.1) for kind in kinds))
+        return QualityReport(score=round(score, 2), issues=issues, hard=any(kind in HARD_ISSUES for kind in kinds))
+
+    def accept(self, card: Dict[str, Any]):
+        """Registers the title of a card that is being saved."""
+        if isinstance(card.get("title"), str):
+            self._titles.add(normalize_title(card["title"]))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Global request-rate and concurrency limits for LLM provider calls.
+Thread-safe, so it holds across event loops (e.g. bulk_generate.py running several sets in threads);
+waiting is done with asyncio.sleep so a loop is never blocked.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+POLL_INTERVAL_SECONDS = 0.05
+
+
+class RateLimiter:
+    """Token bucket (requests per minute, with burst) plus a cap on calls in flight. None disables a limit."""
+
+    def __init__(self, requests_per_minute: Optional[float] = None, max_concurrent: Optional[int] = None,
+                 burst: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrent = max_concurrent
+        self.capacity = float(burst or max(1, int((requests_per_minute or 60) / 6))) # Default burst: 10s worth
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _try_take_token(self) -> float:
+        """Takes a token if available and returns 0, else returns seconds until the next one."""
+        if not self.requests_per_minute:
+            return 0.0
+        rate_per_second = self.requests_per_minute / 60.0
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * rate_per_second)
+        self._last_refill = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / rate_per_second
+
+    async def acquire(self):
+        while True:
+            with self._lock:
+                if self.max_concurrent is None or self._in_flight < self.max_concurrent:
+                    wait = self._try_take_token()
+                    if wait == 0.0:
+                        self._in_flight += 1
+                        return
+                else:
+                    wait = POLL_INTERVAL_SECONDS
+            await asyncio.sleep(max(wait, POLL_INTERVAL_SECONDS) if wait else POLL_INTERVAL_SECONDS)
+
+    def release(self):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    @asynccontextmanager
+    async def slot(self):
+        """`async with limiter.slot():` around one provider call."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def describe(self) -> str:
+        rpm = f"{self.requests_per_minute:g} req/min" if self.requests_per_minute else "no rate limit"
+        concurrency = f"max {self.max_concurrent} in flight" if self.max_concurrent else "unbounded concurrency"
+        return f"{rpm}, {concurrency}"
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test Navigation Index - Orders computed from card metadata by navigation_index.py
+Chronological values (int years, ISO dates, both mixed) and the lunar cards' thematic order
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from navigation_index import compute_order, lunar_navigation_index
+
+LUNAR_CARDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'viewer', 'data',
+                                'lunar_cards_json_10q_v1.json')
+
+
+def cards_with(field_name, values):
+    """One card per value (card ids c0, c1, ... in set order)"""
+    return [{"card_id": f"c{i}", "order_index": i, "domain_data": {field_name: value}} for i, value in enumerate(values)]
+
+
+def check(label, actual, expected):
+    ok = actual == expected
+    print(f"{'✅' if ok else '❌'} {label}: {actual}" + ("" if ok else f" (expected {expected})"))
+    return ok
+
+
+def test_navigation_index():
+    print("🧭 Testing navigation index orders...")
+    results = [
+        check("numeric years", compute_order(cards_with("year", [1969, 476, 2024]), "timeline"), ["c1", "c0", "c2"]),
+        check("ISO dates", compute_order(cards_with("date", ["2024-01-19", "1969-07-20", "1969-07-16", "966-03-01"]), "timeline"),
+              ["c3", "c2", "c1", "c0"]),
+        check("int and str years mixed", compute_order(cards_with("year", [2024, "476", 1969, "1000"]), "timeline"),
+              ["c1", "c3", "c2", "c0"]),
+        check("int years mixed with ISO dates",
+              compute_order([{"card_id": "c0", "order_index": 0, "domain_data": {"date": "1969-07-20"}},
+                             {"card_id": "c1", "order_index": 1, "domain_data": {"year": 476}},
+                             {"card_id": "c2", "order_index": 2, "domain_data": {"year": 1969}},
+                             {"card_id": "c3", "order_index": 3, "domain_data": {}}], "timeline"),
+              ["c1", "c2", "c0", "c3"]),
+        check("lunar thematic order", lunar_navigation_index(LUNAR_CARDS_FILE)["orders"]["thematic"],
+              [1, 4, 2, 3, 5, 6, 8, 7, 9, 10]),
+    ]
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_navigation_index() else 1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Topic Cache - In-memory LRU of extracted topic lists, so re-extracting the same source is instant.
+The key hashes the source after case and whitespace normalization, together with the guidance, creator,
+provider and the topic_extraction template version (editing the prompt invalidates old entries).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+TOPIC_CACHE_MAX_ENTRIES = 256
+
+
+def normalize_source(content: str) -> str:
+    """Case- and whitespace-insensitive form of the source text."""
+    return " ".join(content.casefold().split())
+
+
+def topic_cache_key(content: str, guidance: str, creator_name: str, provider: str, template_version: str) -> str:
+    digest = hashlib.sha256()
+    for part in (normalize_source(content), " ".join((guidance or "").split()), creator_name or "", provider, template_version):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class TopicCache:
+    """Thread-safe LRU mapping a topic_cache_key to the parsed topic list; least recently used entries are evicted."""
+
+    def __init__(self, max_entries: int = TOPIC_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            topics = self._entries.get(key)
+            if topics is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(topics)
+
+    def put(self, key: str, topics: List[str]):
+        with self._lock:
+            self._entries[key] = list(topics)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
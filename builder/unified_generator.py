@@ -7,11 +7,15 @@ and other LLM providers with a unified interface.
 
 import json
 import asyncio
-from typing import Dict, List, Any, Optional, Union
+import importlib
+import re
+from typing import Dict, List, Any, Optional, Union, AsyncIterator, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import os
+import time
 import traceback
+from contextlib import nullcontext
 
 # Provider imports with fallbacks
 try:
@@ -37,6 +41,31 @@ except ImportError:
 #     print("Warning: google-generativeai library not found for native access.")
 
 
+from metrics import METRICS, MetricsRegistry, record_llm_call, record_cards_generated
+from fake_llm import FakeLLMClient, FakeLLMConfig, FAKE_MODEL_NAME
+from rate_limiter import RateLimiter
+from async_runtime import get_background_loop
+from prompt_templates import PromptRegistry, PromptTemplate, get_prompt_registry, DEFAULT_LANGUAGE
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError: # Comes with the openai/anthropic SDKs (newer releases bundle httpx2 instead, see _sdk_http_module)
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2 # noqa: F401 - presence enables HTTP/2 in httpx/httpx2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Long-lived connection pool per provider client: connections (and TLS sessions) are reused across cards
+HTTP_KEEPALIVE_CONNECTIONS = 20
+HTTP_MAX_CONNECTIONS = 100
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 120
+HTTP_TIMEOUT_SECONDS = 600
+HTTP_CONNECT_TIMEOUT_SECONDS = 10
+
 # Assuming core_models.py is in the same directory or Python path
 try:
     from core_models import ContentType, NavigationType
@@ -45,6 +74,10 @@ except ImportError:
     # Define dummy enums if core_models is not found, to allow this file to be parsed
     class ContentType(Enum):
         GENERAL = "general"
+        SPACE_EXPLORATION = "space_exploration"
+        WELLNESS = "wellness"
+        NUTRITION = "nutrition"
+        EARTH_MYSTERIES = "earth_mysteries"
     class NavigationType(Enum):
         THEMATIC = "thematic"
 
@@ -54,6 +87,7 @@ class LLMProvider(Enum):
     ANTHROPIC = "anthropic"
     GEMINI_OPENAI = "gemini_openai"  # Gemini via OpenAI-compatible API (Primary Gemini access)
     OPENAI = "openai"
+    FAKE = "fake"  # Deterministic offline provider for load testing (fake_llm.py)
     # GEMINI = "gemini" # Native Gemini - removing as primary to simplify to one Gemini method
 
 
@@ -76,14 +110,213 @@ class ContentGenerationError(Exception):
     pass
 
 
+# Batched card generation defaults. A Portuguese card (title + summary + ~1500 char
+# detailed text + keywords) costs roughly 700-900 output tokens; the budget below
+# leaves headroom for the JSON wrapping.
+DEFAULT_BATCH_SIZE = 4
+OUTPUT_TOKENS_PER_CARD = 1000
+MAX_CONCURRENT_BATCHES = 3
+
+# Name of the forced tool used to get schema-conforming JSON out of Anthropic models
+STRUCTURED_OUTPUT_TOOL = "emit_structured_output"
+
+# Card prompts live in builder/prompts/ (see prompt_templates.py): card_system, card_json, card_text
+# and card_batch, with per-content-type guidance variants (guidance.<content_type>.txt).
+
+
+# Fallback parser for the TITLE:/SUMMARY:/... line format, compiled once at import time.
+# The JSON structured-output path below is preferred; these only run when a provider
+# ignored JSON mode or structured output is disabled.
+TITLE_PATTERN = re.compile(r'^TITLE:\s*(.+?)(?=\nSUMMARY:|\nDETAILED:|\nKEYWORDS:|\nDIFFICULTY:|$)', re.MULTILINE | re.IGNORECASE)
+SUMMARY_PATTERN = re.compile(r'^SUMMARY:\s*(.+?)(?=\nDETAILED:|\nKEYWORDS:|\nDIFFICULTY:|$)', re.MULTILINE | re.IGNORECASE | re.DOTALL)
+DETAILED_PATTERN = re.compile(r'^DETAILED:\s*(.+?)(?=\nKEYWORDS:|\nDIFFICULTY:|$)', re.MULTILINE | re.IGNORECASE | re.DOTALL)
+KEYWORDS_PATTERN = re.compile(r'^KEYWORDS:\s*(.+?)(?=\nDIFFICULTY:|$)', re.MULTILINE | re.IGNORECASE)
+DIFFICULTY_PATTERN = re.compile(r'^DIFFICULTY:\s*(.+?)(?=\n|$)', re.MULTILINE | re.IGNORECASE)
+
+def extract_json_fragment(response_text: str) -> Optional[str]:
+    """Returns the text from the first '{' or '[' onwards, dropping markdown fences and chatter."""
+    starts = [i for i in (response_text.find('{'), response_text.find('[')) if i != -1]
+    if not starts:
+        return None
+    fragment = response_text[min(starts):].rstrip()
+    if fragment.endswith('```'):
+        fragment = fragment[:-3].rstrip()
+    return fragment
+
+
+def repair_truncated_json(fragment: str) -> str:
+    """
+    Closes a JSON document that was cut off mid-way (e.g. the provider hit max_tokens).
+    Single pass over the text tracking open containers and string state; a dangling key,
+    separator or partial literal at the end is dropped, then open strings/containers are closed.
+    """
+    # Each open container: [closing char, expecting a key, index where the current key started]
+    stack: List[List[Any]] = []
+    in_string = False
+    escape = False
+    for index, char in enumerate(fragment):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+            if stack and stack[-1][0] == '}' and stack[-1][1]:
+                stack[-1][2] = index
+        elif char in '{[':
+            stack.append(['}' if char == '{' else ']', char == '{', None])
+        elif char in '}]':
+            if stack:
+                stack.pop()
+        elif char == ':' and stack:
+            stack[-1][1] = False
+        elif char == ',' and stack and stack[-1][0] == '}':
+            stack[-1][1] = True
+            stack[-1][2] = None
+
+    repaired = fragment
+    if in_string:
+        if escape:
+            repaired = repaired[:-1]
+        repaired += '"'
+    repaired = repaired.rstrip()
+
+    # Drop an incomplete literal/number at the very end (e.g. `tru`, `12.`)
+    tail = len(repaired)
+    while tail > 0 and (repaired[tail - 1].isalnum() or repaired[tail - 1] in '.-+'):
+        tail -= 1
+    token = repaired[tail:]
+    if token:
+        try:
+            json.loads(token)
+        except json.JSONDecodeError:
+            repaired = repaired[:tail].rstrip()
+
+    if stack and stack[-1][0] == '}':
+        top = stack[-1]
+        # Cut off a key that never received a value: `{"a": 1, "b"` or `{"a": 1, "b":`
+        key_without_value = top[2] is not None and (top[1] or repaired.endswith(':'))
+        if key_without_value:
+            repaired = repaired[:top[2]].rstrip()
+    repaired = repaired.rstrip(',: \n\t')
+    return repaired + ''.join(closer for closer, _, _ in reversed(stack))
+
+
+def parse_json_response(response_text: str) -> Tuple[Any, bool]:
+    """
+    Parses a provider's JSON output in one pass, repairing truncation if needed.
+    Returns (parsed_value, was_repaired); parsed_value is None if nothing usable was found.
+    """
+    fragment = extract_json_fragment(response_text or "")
+    if fragment is None:
+        return None, False
+    try:
+        return json.loads(fragment), False
+    except json.JSONDecodeError:
+        pass
+    # Trailing chatter after a complete document: decode the first value only
+    try:
+        value, _ = json.JSONDecoder().raw_decode(fragment)
+        return value, False
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(repair_truncated_json(fragment)), True
+    except json.JSONDecodeError:
+        return None, False
+
+
+class StreamingCardParser:
+    """
+    Incrementally parses the TITLE/SUMMARY/DETAILED/KEYWORDS/DIFFICULTY line format
+    while a card is being streamed. Each completed line is classified exactly once;
+    only the unfinished trailing line is re-examined when a snapshot is taken.
+    """
+
+    SECTION_MARKERS = {
+        'TITLE': 'title',
+        'SUMMARY': 'summary',
+        'DETAILED': 'detailed_content',
+        'KEYWORDS': 'keywords',
+        'DIFFICULTY': 'difficulty_tags',
+    }
+
+    def __init__(self):
+        self.text = ""
+        self._pending_line = ""
+        self._current_section: Optional[str] = None
+        self._sections: Dict[str, List[str]] = {}
+
+    def _consume_line(self, line: str):
+        marker, sep, rest = line.partition(':')
+        section = self.SECTION_MARKERS.get(marker.strip().upper()) if sep else None
+        if section:
+            self._current_section = section
+            self._sections[section] = [rest.strip()]
+        elif self._current_section:
+            self._sections[self._current_section].append(line.strip())
+
+    def feed(self, text_delta: str) -> Dict[str, Any]:
+        """Adds a streamed delta and returns the fields parsed so far."""
+        self.text += text_delta
+        lines = (self._pending_line + text_delta).split('\n')
+        self._pending_line = lines.pop()
+        for line in lines:
+            self._consume_line(line)
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current partial card; the unfinished last line is included provisionally."""
+        sections = {key: list(value) for key, value in self._sections.items()}
+        if self._pending_line:
+            marker, sep, rest = self._pending_line.partition(':')
+            section = self.SECTION_MARKERS.get(marker.strip().upper()) if sep else None
+            if section:
+                sections[section] = [rest.strip()]
+            elif self._current_section:
+                sections[self._current_section].append(self._pending_line.strip())
+
+        partial: Dict[str, Any] = {}
+        for key, parts in sections.items():
+            value = "\n".join(part for part in parts if part).strip()
+            if key in ('keywords', 'difficulty_tags'):
+                partial[key] = [item.strip() for item in value.split(',') if item.strip()]
+            else:
+                partial[key] = value
+        return partial
+
+
 class UnifiedContentGenerator:
     """Unified content generator supporting multiple LLM providers."""
     
     def __init__(self, 
                  anthropic_api_key: Optional[str] = None,
                  gemini_openai_api_key: Optional[str] = None, # For Google's OpenAI-compatible endpoint
-                 openai_api_key: Optional[str] = None):
+                 openai_api_key: Optional[str] = None,
+                 structured_output: bool = True,
+                 metrics: Optional[MetricsRegistry] = None,
+                 fake_llm_config: Optional[FakeLLMConfig] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 language: str = DEFAULT_LANGUAGE,
+                 prompt_registry: Optional[PromptRegistry] = None):
         
+        # Token, latency and cost accounting for every provider call
+        self.metrics = metrics or METRICS
+        # Optional global request-rate / concurrency limit shared by every provider call
+        self.rate_limiter = rate_limiter
+        # All async work runs on one persistent loop so HTTP connections stay warm between requests
+        self.runtime = get_background_loop()
+        # Ask providers for native JSON (OpenAI/Gemini JSON mode, Anthropic tool use)
+        # instead of the TITLE:/SUMMARY: line format
+        self.structured_output = structured_output
+        # Card prompts are compiled once per (template, content type, language) from builder/prompts/
+        self.prompts = prompt_registry or get_prompt_registry()
+        self.language = language
+        self._card_system_prompts: Dict[PromptTemplate, str] = {}
         self.providers: Dict[LLMProvider, Any] = {}
         self.provider_configs: Dict[LLMProvider, Dict[str, Any]] = {}
         self.default_provider: Optional[LLMProvider] = None
@@ -92,6 +325,7 @@ class UnifiedContentGenerator:
         self._setup_anthropic(anthropic_api_key)
         self._setup_gemini_openai(gemini_openai_api_key) # Primary Gemini access
         self._setup_openai(openai_api_key)
+        self._setup_fake(fake_llm_config)
         # self._setup_gemini_native(gemini_openai_api_key) # Keeping this out for now for "one way"
 
         # Determine default provider based on availability and preference
@@ -111,13 +345,68 @@ class UnifiedContentGenerator:
             
         self.card_schema = self._create_card_schema()
 
+    @staticmethod
+    def _sdk_http_module(client_class: Any) -> Optional[Any]:
+        """httpx-compatible module the SDK of client_class checks http_client against: httpx, or httpx2
+        in SDK releases that moved to it. None when neither is importable."""
+        try:
+            base_client = importlib.import_module(f"{client_class.__module__.split('.')[0]}._base_client")
+        except ImportError:
+            base_client = None
+        for module_name in ("httpx2", "httpx"):
+            module = getattr(base_client, module_name, None)
+            if module is not None:
+                return module
+        return httpx if HTTPX_AVAILABLE else None
+
+    @staticmethod
+    def _create_http_client(http_module: Any) -> Any:
+        """Keep-alive pool (HTTP/2 when the h2 package is installed) owned by one provider client,
+        built with the SDK's own HTTP module so the SDK accepts it."""
+        return http_module.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=http_module.Limits(max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS, max_connections=HTTP_MAX_CONNECTIONS,
+                                      keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS),
+            timeout=http_module.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            follow_redirects=True,
+        )
+
+    def _sdk_client(self, client_class: Any, **kwargs: Any) -> Any:
+        """Builds an SDK client on our keep-alive pool. If the SDK still rejects it, the pool is closed on
+        the background loop and the SDK's default (still long-lived) client is used."""
+        http_module = self._sdk_http_module(client_class)
+        if http_module is None:
+            return client_class(**kwargs)
+        http_client = self._create_http_client(http_module)
+        try:
+            return client_class(http_client=http_client, **kwargs)
+        except TypeError as e:
+            self.run_sync(http_client.aclose())
+            print(f"⚠️ {client_class.__name__} rejected the shared HTTP client ({e}); using its default client.")
+            return client_class(**kwargs)
+
+    def run_sync(self, coroutine, timeout: Optional[float] = None):
+        """Sync facade for Gradio/CLI callers: runs the coroutine on the persistent background loop,
+        where the provider clients' connection pools live."""
+        return self.runtime.run(coroutine, timeout)
+
+    async def run_async(self, coroutine):
+        """Awaitable from any event loop: the coroutine itself runs on the background loop that owns
+        the provider clients (awaited directly when already on it)."""
+        return await self.runtime.submit(coroutine)
+
+    def iterate_sync(self, async_iterator: AsyncIterator[Any]):
+        """Sync facade for async generators such as stream_content_card."""
+        return self.runtime.iterate(async_iterator)
+
     def _setup_anthropic(self, api_key: Optional[str]):
         if ANTHROPIC_AVAILABLE and api_key and api_key != "your-anthropic-api-key-here":
             try:
                 # Using AsyncAnthropic for consistency with OpenAI's async client
                 # For synchronous calls, one would typically wrap async calls or use anthropic.Anthropic()
-                self.providers[LLMProvider.ANTHROPIC] = anthropic.AsyncAnthropic(api_key=api_key)
-                self.provider_configs[LLMProvider.ANTHROPIC] = {"model": "claude-3-haiku-20240307"}
+                self.providers[LLMProvider.ANTHROPIC] = self._sdk_client(anthropic.AsyncAnthropic, api_key=api_key)
+                # claude-3-haiku: 200k context but only 4096 output tokens -> ~4 cards per batch call
+                self.provider_configs[LLMProvider.ANTHROPIC] = {"model": "claude-3-haiku-20240307", "batch_size": 4, "max_output_tokens": 4096}
                 print("✅ Anthropic Claude provider initialized (claude-3-haiku).")
             except Exception as e:
                 print(f"❌ Anthropic setup failed: {e}")
@@ -127,12 +416,14 @@ class UnifiedContentGenerator:
         """Setup Gemini via OpenAI-compatible API."""
         if OPENAI_AVAILABLE and api_key and api_key != "your-google-gemini-api-key-here": # Check against placeholder
             try:
-                self.providers[LLMProvider.GEMINI_OPENAI] = AsyncOpenAI(
+                self.providers[LLMProvider.GEMINI_OPENAI] = self._sdk_client(
+                    AsyncOpenAI,
                     api_key=api_key,
                     base_url="https://generativelanguage.googleapis.com/v1beta" # Corrected base URL structure
                 )
                 # Model will be specified per call, e.g., "models/gemini-1.5-flash-latest"
-                self.provider_configs[LLMProvider.GEMINI_OPENAI] = {"model_prefix": "models/"} # Store prefix
+                # gemini-1.5-flash allows 8192 output tokens, so larger batches fit in one call
+                self.provider_configs[LLMProvider.GEMINI_OPENAI] = {"model_prefix": "models/", "batch_size": 8, "max_output_tokens": 8192} # Store prefix
                 print("✅ Gemini (OpenAI-compatible API) provider initialized.")
             except Exception as e:
                 print(f"❌ Gemini (OpenAI-compatible API) setup failed: {e}")
@@ -141,13 +432,22 @@ class UnifiedContentGenerator:
     def _setup_openai(self, api_key: Optional[str]):
         if OPENAI_AVAILABLE and api_key and api_key != "your-openai-api-key-here":
             try:
-                self.providers[LLMProvider.OPENAI] = AsyncOpenAI(api_key=api_key)
-                self.provider_configs[LLMProvider.OPENAI] = {"model": "gpt-3.5-turbo"} # Or "gpt-4o-mini"
+                self.providers[LLMProvider.OPENAI] = self._sdk_client(AsyncOpenAI, api_key=api_key)
+                # gpt-3.5-turbo: 16k context, 4096 output tokens
+                self.provider_configs[LLMProvider.OPENAI] = {"model": "gpt-3.5-turbo", "batch_size": 4, "max_output_tokens": 4096} # Or "gpt-4o-mini"
                 print("✅ OpenAI provider initialized (gpt-3.5-turbo).")
             except Exception as e:
                 print(f"❌ OpenAI setup failed: {e}")
                 traceback.print_exc()
 
+    def _setup_fake(self, config: Optional[FakeLLMConfig]):
+        """Offline provider; never preferred over a real one, but becomes the default when it is the only one."""
+        if config is not None:
+            self.providers[LLMProvider.FAKE] = FakeLLMClient(config)
+            self.provider_configs[LLMProvider.FAKE] = {"model": FAKE_MODEL_NAME, "batch_size": 8, "max_output_tokens": 8192}
+            print(f"🧪 Fake LLM provider initialized (latency {config.latency_ms}ms {config.latency_distribution}, "
+                  f"error rate {config.error_rate}, 429 rate {config.rate_limit_rate}).")
+
     def _create_card_schema(self) -> Dict[str, Any]:
         """JSON schema for individual content cards - simplified for clarity."""
         return {
@@ -168,41 +468,164 @@ class UnifiedContentGenerator:
     def get_available_providers(self) -> List[LLMProvider]:
         return list(self.providers.keys())
 
-    async def _call_anthropic_api(self, client: anthropic.AsyncAnthropic, model: str, system_prompt: Optional[str], user_prompt: str, max_tokens: int, temperature: float) -> str:
+    def get_batch_size(self, provider: Optional[LLMProvider] = None) -> int:
+        """Number of cards requested per LLM call for a provider (1 disables batching)."""
+        current_provider = provider if provider is not None else self.default_provider
+        config = self.provider_configs.get(current_provider, {})
+        batch_size = config.get("batch_size", DEFAULT_BATCH_SIZE)
+        # Never ask for more cards than fit in the provider's output window
+        max_cards_by_output = max(1, config.get("max_output_tokens", 4096) // OUTPUT_TOKENS_PER_CARD)
+        return max(1, min(batch_size, max_cards_by_output))
+
+    def set_batch_size(self, provider: LLMProvider, batch_size: int):
+        """Tune the batch size for a provider, e.g. when switching to a model with a larger context window."""
+        if provider not in self.provider_configs:
+            raise ContentGenerationError(f"Provider {provider.value} is not initialized.")
+        self.provider_configs[provider]["batch_size"] = max(1, int(batch_size))
+
+    @staticmethod
+    def _read_usage(usage_obj: Any, usage: Optional[Dict[str, int]]):
+        """Copies token counts from an Anthropic or OpenAI usage object into `usage`.
+        prompt_tokens is always the total input; cached_tokens/cache_write_tokens are the parts of it
+        read from / written to the provider's prompt cache."""
+        if usage is None or usage_obj is None:
+            return
+        if getattr(usage_obj, "input_tokens", None) is not None:
+            # Anthropic: input_tokens excludes the cache read/write tokens, which are reported separately
+            cached_tokens = getattr(usage_obj, "cache_read_input_tokens", None) or 0
+            cache_write_tokens = getattr(usage_obj, "cache_creation_input_tokens", None) or 0
+            usage["prompt_tokens"] = usage_obj.input_tokens + cached_tokens + cache_write_tokens
+            usage["completion_tokens"] = getattr(usage_obj, "output_tokens", None) or 0
+            usage["cached_tokens"] = cached_tokens
+            usage["cache_write_tokens"] = cache_write_tokens
+            return
+        # OpenAI-compatible: prompt_tokens includes prompt_tokens_details.cached_tokens (automatic prefix caching)
+        usage["prompt_tokens"] = getattr(usage_obj, "prompt_tokens", None) or 0
+        usage["completion_tokens"] = getattr(usage_obj, "completion_tokens", None) or 0
+        usage["cached_tokens"] = getattr(getattr(usage_obj, "prompt_tokens_details", None), "cached_tokens", None) or 0
+
+    @staticmethod
+    def _anthropic_system(system_prompt: str, cache_system_prompt: bool) -> Union[str, List[Dict[str, Any]]]:
+        """A cache-marked system block makes Anthropic cache everything up to it (tools + system).
+        Prefixes below the model's minimum (1024 tokens; 2048 for Haiku) are simply not cached."""
+        if not cache_system_prompt:
+            return system_prompt
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    async def _call_anthropic_api(self, client: "anthropic.AsyncAnthropic", model: str, system_prompt: Optional[str], user_prompt: str, max_tokens: int, temperature: float, response_schema: Optional[Dict[str, Any]] = None, usage: Optional[Dict[str, int]] = None, cache_system_prompt: bool = False) -> str:
         messages = [{"role": "user", "content": user_prompt}]
-        # Anthropic's new messages API takes an optional system prompt
-        response = await client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            system=system_prompt if system_prompt else None,
-            messages=messages
-        )
-        return response.content[0].text
+        request_kwargs = {"model": model, "max_tokens": max_tokens, "temperature": temperature, "messages": messages}
+        if system_prompt:
+            # Anthropic's new messages API takes an optional system prompt
+            request_kwargs["system"] = self._anthropic_system(system_prompt, cache_system_prompt)
+        if response_schema:
+            # Anthropic has no JSON mode; forcing a single tool call makes the model emit
+            # arguments that conform to the schema, which we hand back as JSON text.
+            request_kwargs["tools"] = [{
+                "name": STRUCTURED_OUTPUT_TOOL,
+                "description": "Return the requested content as structured data.",
+                "input_schema": response_schema
+            }]
+            request_kwargs["tool_choice"] = {"type": "tool", "name": STRUCTURED_OUTPUT_TOOL}
+
+        response = await client.messages.create(**request_kwargs)
+        self._read_usage(getattr(response, "usage", None), usage)
+        if response_schema:
+            for block in response.content:
+                if getattr(block, "type", None) == "tool_use":
+                    return json.dumps(block.input, ensure_ascii=False)
+        return "".join(getattr(block, "text", "") for block in response.content)
 
-    async def _call_openai_compatible_api(self, client: AsyncOpenAI, model: str, system_prompt: Optional[str], user_prompt: str, max_tokens: int, temperature: float) -> str:
+    async def _call_openai_compatible_api(self, client: "AsyncOpenAI", model: str, system_prompt: Optional[str], user_prompt: str, max_tokens: int, temperature: float, response_schema: Optional[Dict[str, Any]] = None, usage: Optional[Dict[str, int]] = None) -> str:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": user_prompt})
         
-        response = await client.chat.completions.create(
+        request_kwargs = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        if response_schema:
+            # JSON mode: supported by OpenAI and by Gemini's OpenAI-compatible endpoint.
+            # The schema itself is described in the prompt (json_object requires the word "JSON" there).
+            request_kwargs["response_format"] = {"type": "json_object"}
+        response = await client.chat.completions.create(**request_kwargs)
+        self._read_usage(getattr(response, "usage", None), usage)
+        return response.choices[0].message.content
+
+    async def _stream_anthropic_api(self, client: "anthropic.AsyncAnthropic", model: str, system_prompt: Optional[str], user_prompt: str, max_tokens: int, temperature: float, usage: Optional[Dict[str, int]] = None, cache_system_prompt: bool = False) -> AsyncIterator[str]:
+        """Yields text deltas from Anthropic's streaming messages API."""
+        messages = [{"role": "user", "content": user_prompt}]
+        stream_kwargs = {"model": model, "max_tokens": max_tokens, "temperature": temperature, "messages": messages}
+        if system_prompt:
+            stream_kwargs["system"] = self._anthropic_system(system_prompt, cache_system_prompt)
+        async with client.messages.stream(**stream_kwargs) as stream:
+            async for text_delta in stream.text_stream:
+                yield text_delta
+            final_message = await stream.get_final_message()
+            self._read_usage(getattr(final_message, "usage", None), usage)
+
+    async def _stream_openai_compatible_api(self, client: "AsyncOpenAI", model: str, system_prompt: Optional[str], user_prompt: str, max_tokens: int, temperature: float, usage: Optional[Dict[str, int]] = None, include_usage: bool = False) -> AsyncIterator[str]:
+        """Yields text deltas from an OpenAI-compatible chat completions stream."""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": user_prompt})
+
+        request_kwargs = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature, "stream": True}
+        if include_usage:
+            # OpenAI only sends usage for streams when asked; it arrives in a final chunk without choices
+            request_kwargs["stream_options"] = {"include_usage": True}
+        stream = await client.chat.completions.create(**request_kwargs)
+        async for chunk in stream:
+            if getattr(chunk, "usage", None):
+                self._read_usage(chunk.usage, usage)
+            if not chunk.choices:
+                continue
+            text_delta = chunk.choices[0].delta.content
+            if text_delta:
+                yield text_delta
+
+    @staticmethod
+    def _call_outcome(error: Exception) -> str:
+        """Classifies a failed provider call for metrics (rate limits are tracked separately)."""
+        status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status_code == 429:
+            return "rate_limited"
+        if isinstance(error, asyncio.TimeoutError) or "timeout" in type(error).__name__.lower():
+            return "timeout"
+        return "error"
+
+    def set_rate_limit(self, requests_per_minute: Optional[float] = None, max_concurrent: Optional[int] = None):
+        """Applies a global limit to all provider calls (None for both removes it)."""
+        self.rate_limiter = RateLimiter(requests_per_minute, max_concurrent) if (requests_per_minute or max_concurrent) else None
+
+    def _call_slot(self):
+        return self.rate_limiter.slot() if self.rate_limiter else nullcontext()
+
+    def _record_call(self, provider: LLMProvider, model: str, outcome: str, started: float, usage: Dict[str, int]):
+        record_llm_call(
+            provider=provider.value,
             model=model,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            # response_format={"type": "json_object"} # if LLM supports and strict JSON needed
+            outcome=outcome,
+            latency_seconds=time.perf_counter() - started,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            cached_tokens=usage.get("cached_tokens", 0),
+            cache_write_tokens=usage.get("cache_write_tokens", 0),
+            registry=self.metrics
         )
-        return response.choices[0].message.content
 
-    async def generate_generic_text(self, 
-                                    prompt_text: str,
-                                    system_prompt: Optional[str] = "You are a helpful assistant.",
-                                    provider: Optional[LLMProvider] = None,
-                                    max_tokens: int = 500,
-                                    temperature: float = 0.5) -> str:
-        """Generate generic text using specified or default provider."""
-        
+    def _record_cards(self, provider: Optional[LLMProvider], count: int):
+        current_provider = provider if provider in self.providers else self.default_provider
+        if current_provider is None or count <= 0:
+            return
+        try:
+            model = self._resolve_model(current_provider)
+        except ContentGenerationError:
+            model = "unknown"
+        record_cards_generated(current_provider.value, model, count, registry=self.metrics)
+
+    def _resolve_provider(self, provider: Optional[LLMProvider]) -> LLMProvider:
+        """Returns the provider to use, falling back to the first available one if needed."""
         current_provider = provider if provider is not None else self.default_provider
         
         if not current_provider or current_provider not in self.providers:
@@ -212,71 +635,129 @@ class UnifiedContentGenerator:
             # Fallback to the first available provider if current_provider is invalid
             current_provider = available[0]
             print(f"Warning: Provider '{provider.value if provider else 'default'}' not found or invalid. Falling back to '{current_provider.value}'.")
+        return current_provider
 
-        client_instance = self.providers[current_provider]
+    def _resolve_model(self, current_provider: LLMProvider) -> str:
         provider_config = self.provider_configs[current_provider]
+        if current_provider == LLMProvider.ANTHROPIC:
+            return provider_config.get("model", "claude-3-haiku-20240307")
+        elif current_provider == LLMProvider.GEMINI_OPENAI:
+            # For Gemini via OpenAI API, model name needs prefix, e.g., "models/gemini-1.5-flash-latest"
+            model_prefix = provider_config.get("model_prefix", "models/")
+            return f"{model_prefix}gemini-1.5-flash-latest" # Specify a default model
+        elif current_provider == LLMProvider.OPENAI:
+            return provider_config.get("model", "gpt-3.5-turbo")
+        elif current_provider == LLMProvider.FAKE:
+            return provider_config.get("model", FAKE_MODEL_NAME)
+        # This case should ideally not be reached if current_provider is validated from self.providers
+        raise ContentGenerationError(f"Provider {current_provider.value} not implemented for generic text generation.")
 
-        try:
-            if current_provider == LLMProvider.ANTHROPIC:
-                model_to_use = provider_config.get("model", "claude-3-haiku-20240307")
-                return await self._call_anthropic_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature)
-            
-            elif current_provider == LLMProvider.GEMINI_OPENAI:
-                # For Gemini via OpenAI API, model name needs prefix, e.g., "models/gemini-1.5-flash-latest"
-                model_prefix = provider_config.get("model_prefix", "models/")
-                model_to_use = f"{model_prefix}gemini-1.5-flash-latest" # Specify a default model
-                return await self._call_openai_compatible_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature)
-
-            elif current_provider == LLMProvider.OPENAI:
-                model_to_use = provider_config.get("model", "gpt-3.5-turbo")
-                return await self._call_openai_compatible_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature)
-            
-            else:
-                # This case should ideally not be reached if current_provider is validated from self.providers
-                raise ContentGenerationError(f"Provider {current_provider.value} not implemented for generic text generation.")
+    async def generate_generic_text(self, 
+                                    prompt_text: str,
+                                    system_prompt: Optional[str] = "You are a helpful assistant.",
+                                    provider: Optional[LLMProvider] = None,
+                                    max_tokens: int = 500,
+                                    temperature: float = 0.5,
+                                    response_schema: Optional[Dict[str, Any]] = None,
+                                    cache_system_prompt: bool = False) -> str:
+        """Generate generic text using specified or default provider.
+        With `response_schema`, the provider's native JSON mode is requested and the result is JSON text.
+        `cache_system_prompt` marks the system prompt as a reusable prefix (Anthropic cache_control; OpenAI
+        and Gemini cache identical prefixes automatically), so keep per-call text in `prompt_text`."""
+        
+        current_provider = self._resolve_provider(provider)
+        client_instance = self.providers[current_provider]
+        usage: Dict[str, int] = {}
+        model_to_use = "unknown"
+        async with self._call_slot(): # Queueing for the rate limiter is not counted as call latency
+            started = time.perf_counter()
+
+            try:
+                model_to_use = self._resolve_model(current_provider)
+                if current_provider == LLMProvider.ANTHROPIC:
+                    response_text = await self._call_anthropic_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature, response_schema, usage,
+                                                                   cache_system_prompt)
+                elif current_provider == LLMProvider.FAKE:
+                    response_text, fake_usage = await client_instance.complete(system_prompt, prompt_text, max_tokens, response_schema)
+                    usage.update(fake_usage)
+                else:
+                    response_text = await self._call_openai_compatible_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature, response_schema, usage)
+                self._record_call(current_provider, model_to_use, "success", started, usage)
+                return response_text
                 
-        except Exception as e:
-            error_message = f"Generic text generation failed with {current_provider.value}: {str(e)}"
-            print(f"Error details: {traceback.format_exc()}")
-            # Consider logging the prompt for debugging (be careful with sensitive data)
-            # print(f"Failed prompt for {current_provider.value}: {prompt_text[:200]}...") 
-            raise ContentGenerationError(error_message)
+            except Exception as e:
+                self._record_call(current_provider, model_to_use, self._call_outcome(e), started, usage)
+                error_message = f"Generic text generation failed with {current_provider.value}: {str(e)}"
+                print(f"Error details: {traceback.format_exc()}")
+                # Consider logging the prompt for debugging (be careful with sensitive data)
+                # print(f"Failed prompt for {current_provider.value}: {prompt_text[:200]}...") 
+                raise ContentGenerationError(error_message)
 
-    def _parse_structured_response(self, response_text: str) -> Dict[str, Any]:
-        """Parses a structured response text (TITLE, SUMMARY, etc.) into a dictionary."""
-        import re
+    async def stream_generic_text(self,
+                                  prompt_text: str,
+                                  system_prompt: Optional[str] = "You are a helpful assistant.",
+                                  provider: Optional[LLMProvider] = None,
+                                  max_tokens: int = 500,
+                                  temperature: float = 0.5,
+                                  cache_system_prompt: bool = False) -> AsyncIterator[str]:
+        """Same as generate_generic_text, but yields text deltas as the provider produces them."""
+        current_provider = self._resolve_provider(provider)
+        client_instance = self.providers[current_provider]
+        usage: Dict[str, int] = {}
+        model_to_use = "unknown"
+        async with self._call_slot(): # Queueing for the rate limiter is not counted as call latency
+            started = time.perf_counter()
+
+            try:
+                model_to_use = self._resolve_model(current_provider)
+                if current_provider == LLMProvider.ANTHROPIC:
+                    text_stream = self._stream_anthropic_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature, usage,
+                                                             cache_system_prompt)
+                elif current_provider == LLMProvider.FAKE:
+                    text_stream = client_instance.stream(system_prompt, prompt_text, max_tokens, usage)
+                else:
+                    text_stream = self._stream_openai_compatible_api(client_instance, model_to_use, system_prompt, prompt_text, max_tokens, temperature, usage,
+                                                                     include_usage=current_provider == LLMProvider.OPENAI)
+                async for text_delta in text_stream:
+                    yield text_delta
+                self._record_call(current_provider, model_to_use, "success", started, usage)
+
+            except Exception as e:
+                self._record_call(current_provider, model_to_use, self._call_outcome(e), started, usage)
+                error_message = f"Streaming text generation failed with {current_provider.value}: {str(e)}"
+                print(f"Error details: {traceback.format_exc()}")
+                raise ContentGenerationError(error_message)
+
+    def _match_text_sections(self, response_text: str) -> Dict[str, Any]:
+        """Regex fallback for the TITLE:/SUMMARY:/... line format. Only fields that were found are returned."""
         parsed_data = {}
-        # Expected keys roughly based on _format_structured_prompt in earlier versions
-        # This regex approach is fragile; true JSON output from LLM is better.
-        patterns = {
-            'title': r'TITLE:\s*(.+)',
-            'summary': r'SUMMARY:\s*(.+)',
-            'detailed_content': r'DETAILED:\s*(.+)',
-            'keywords': r'KEYWORDS:\s*(.+)',
-            'difficulty_tags': r'DIFFICULTY:\s*(.+)' # Matches the whole line for difficulty
-        }
 
         # Try to parse TITLE (often on its own line)
-        title_match = re.search(r'^TITLE:\s*(.+?)(?=\nSUMMARY:|\nDETAILED:|\nKEYWORDS:|\nDIFFICULTY:|$)', response_text, re.MULTILINE | re.IGNORECASE)
+        title_match = TITLE_PATTERN.search(response_text)
         if title_match:
             parsed_data['title'] = title_match.group(1).strip()
 
-        summary_match = re.search(r'^SUMMARY:\s*(.+?)(?=\nDETAILED:|\nKEYWORDS:|\nDIFFICULTY:|$)', response_text, re.MULTILINE | re.IGNORECASE | re.DOTALL)
+        summary_match = SUMMARY_PATTERN.search(response_text)
         if summary_match:
             parsed_data['summary'] = summary_match.group(1).strip()
 
-        detailed_match = re.search(r'^DETAILED:\s*(.+?)(?=\nKEYWORDS:|\nDIFFICULTY:|$)', response_text, re.MULTILINE | re.IGNORECASE | re.DOTALL)
+        detailed_match = DETAILED_PATTERN.search(response_text)
         if detailed_match:
             parsed_data['detailed_content'] = detailed_match.group(1).strip()
         
-        keywords_match = re.search(r'^KEYWORDS:\s*(.+?)(?=\nDIFFICULTY:|$)', response_text, re.MULTILINE | re.IGNORECASE)
+        keywords_match = KEYWORDS_PATTERN.search(response_text)
         if keywords_match:
             parsed_data['keywords'] = [k.strip() for k in keywords_match.group(1).split(',') if k.strip()]
         
-        difficulty_match = re.search(r'^DIFFICULTY:\s*(.+?)(?=\n|$)', response_text, re.MULTILINE | re.IGNORECASE)
+        difficulty_match = DIFFICULTY_PATTERN.search(response_text)
         if difficulty_match:
             parsed_data['difficulty_tags'] = [d.strip().lower() for d in difficulty_match.group(1).split(',') if d.strip()]
 
+        return {key: value for key, value in parsed_data.items() if value}
+
+    def _parse_structured_response(self, response_text: str) -> Dict[str, Any]:
+        """Parses a structured response text (TITLE, SUMMARY, etc.) into a dictionary."""
+        parsed_data = self._match_text_sections(response_text)
 
         # Apply schema defaults or validation if needed
         schema = self.card_schema
@@ -302,6 +783,79 @@ class UnifiedContentGenerator:
 
         return parsed_data
 
+    def _parse_card_response(self, response_text: str) -> Tuple[Dict[str, Any], str, List[str]]:
+        """
+        Parses one card response: JSON first (single pass, repairing truncation), then the
+        regex line-format fallback. Returns (card, parse_status, missing_fields) where
+        parse_status is "json", "json_repaired" or "text_fallback".
+        """
+        parsed, repaired = parse_json_response(response_text)
+        if isinstance(parsed, dict):
+            # A truncated card keeps what it has; missing keywords/difficulty are defaulted
+            card = self._validate_card_dict(parsed, lenient=repaired)
+            if card is not None:
+                return card, ("json_repaired" if repaired else "json"), []
+
+        matched = self._match_text_sections(response_text)
+        missing_fields = [key for key in self.card_schema["required"] if key not in matched]
+        return self._parse_structured_response(response_text), "text_fallback", missing_fields
+
+    def _content_type_value(self, content_type: ContentType) -> str:
+        return content_type.value if hasattr(content_type, 'value') else str(content_type)
+
+    def _card_template(self, name: str, content_type: ContentType) -> PromptTemplate:
+        return self.prompts.get(name, self._content_type_value(content_type), self.language)
+
+    def _card_system_prompt(self, template: PromptTemplate) -> str:
+        """card_system plus the template's static instruction block: the stable, cacheable prefix.
+        Built once per compiled template so repeated calls send a byte-identical prefix."""
+        system_prompt = self._card_system_prompts.get(template)
+        if system_prompt is None:
+            base = self.prompts.get("card_system", language=self.language).render()
+            system_prompt = f"{base}\n\n{template.prefix}" if template.prefix else base
+            self._card_system_prompts[template] = system_prompt
+        return system_prompt
+
+    def _build_card_prompt(self, topic: str, content_type: ContentType, card_context: str) -> Tuple[str, str, str]:
+        """(system prompt, user prompt, template version) for a single card in the TITLE/SUMMARY/... line format."""
+        template = self._card_template("card_text", content_type)
+        return self._card_system_prompt(template), template.render_dynamic(card_context=card_context, topic=topic), template.version
+
+    def _build_card_json_prompt(self, topic: str, content_type: ContentType, card_context: str) -> Tuple[str, str, str]:
+        """(system prompt, user prompt, template version) for a single card as a JSON object conforming to card_schema."""
+        template = self._card_template("card_json", content_type)
+        return self._card_system_prompt(template), template.render_dynamic(card_context=card_context, topic=topic), template.version
+
+    def _build_batch_prompt(self, topics: List[str], content_type: ContentType, card_context: str) -> Tuple[str, str, str]:
+        """(system prompt, user prompt, template version) asking for several cards at once as JSON keyed by topic.
+        The shared instructions are sent once instead of once per card."""
+        template = self._card_template("card_batch", content_type)
+        topic_lines = "\n".join(f"{i}. {topic}" for i, topic in enumerate(topics, 1))
+        user_prompt = template.render_dynamic(card_context=card_context, topic_count=len(topics), topic_lines=topic_lines)
+        return self._card_system_prompt(template), user_prompt, template.version
+
+    def _batch_schema(self) -> Dict[str, Any]:
+        item_schema = json.loads(json.dumps(self.card_schema))
+        item_schema["properties"]["topic"] = {"type": "string", "description": "The topic exactly as given"}
+        item_schema["required"] = ["topic"] + item_schema["required"]
+        return {
+            "type": "object",
+            "properties": {"cards": {"type": "array", "items": item_schema}},
+            "required": ["cards"]
+        }
+
+    def _generation_metadata(self, topic: str, content_type: ContentType, provider: Optional[LLMProvider], mode: str,
+                             template_version: str) -> Dict[str, Any]:
+        used_provider = provider or self.default_provider
+        return {
+            'provider_used': used_provider.value if used_provider else "unknown",
+            'topic_requested': topic,
+            'content_type_requested': self._content_type_value(content_type),
+            'generation_mode': mode,
+            'language': self.language,
+            'template_version': template_version
+        }
+
     async def generate_content_card(self, 
                                    topic: str, 
                                    content_type: ContentType, # Assuming ContentType enum from core_models
@@ -312,67 +866,199 @@ class UnifiedContentGenerator:
         It now relies on the LLM to follow structured prompt instructions.
         """
         
-        # 1. Build the Prompt for structured output
-        system_prompt_for_card = "You are an expert educational content creator. Generate structured content exactly as requested in the user prompt, following the specified format strictly."
-        
-        # Guidance based on content type
-        content_type_guidance = {
-            ContentType.SPACE_EXPLORATION: "Focus on historical facts, scientific accuracy, and inspiring human achievement stories.",
-            # Add other ContentType enum members from core_models.py
-            ContentType.WELLNESS: "Emphasize practical advice, scientific backing, and holistic health approaches.",
-            ContentType.NUTRITION: "Provide evidence-based information, practical tips, and myth-busting facts.",
-            ContentType.EARTH_MYSTERIES: "Balance scientific explanation with fascinating unknowns and ongoing research.",
-            ContentType.GENERAL: "Provide accurate, engaging educational content.",
-            # ... add all your ContentType enum cases from core_models.py
-        }
-        # Default guidance if content_type is not in the map or is a generic type
-        guidance = content_type_guidance.get(content_type, "Provide accurate, engaging educational content. Ensure all requested fields are present in the output.")
-
-
-        user_prompt_for_card = f"""
-Context for this card: {card_context}
-Topic to address: {topic}
-Content Type: {content_type.value if hasattr(content_type, 'value') else str(content_type)}
-Specific Guidelines for this content: {guidance}
-
-Please generate content in Portuguese (Brazil).
-
-Your response MUST strictly follow this format, with each field on a new line:
-TITLE: [An engaging title, often in a question format, related to the topic. Max 200 characters.]
-SUMMARY: [A brief answer or overview of the topic. 2-3 sentences, max 300 characters.]
-DETAILED: [A more comprehensive explanation. 3-4 paragraphs, max 1500 characters. Include interesting facts and use accessible language.]
-KEYWORDS: [Provide 5 to 7 relevant keywords, comma-separated. Example: keyword1, keyword2, keyword3]
-DIFFICULTY: [Choose one: beginner, intermediate, or advanced. Example: intermediate]
+        # 1. Build the Prompt for structured output (native JSON mode unless disabled)
+        if self.structured_output:
+            system_prompt, user_prompt_for_card, template_version = self._build_card_json_prompt(topic, content_type, card_context)
+        else:
+            system_prompt, user_prompt_for_card, template_version = self._build_card_prompt(topic, content_type, card_context)
 
-Ensure every field (TITLE, SUMMARY, DETAILED, KEYWORDS, DIFFICULTY) is present. Do not add any extra text, greetings, or explanations outside this structure.
-"""
         # 2. Call the generic text generation method
         raw_llm_response = await self.generate_generic_text(
             prompt_text=user_prompt_for_card,
-            system_prompt=system_prompt_for_card,
+            system_prompt=system_prompt,
             provider=provider,
             max_tokens=2000, # Increased for potentially longer detailed content
-            temperature=0.6 # Slightly lower for more factual card content
+            temperature=0.6, # Slightly lower for more factual card content
+            response_schema=self.card_schema if self.structured_output else None,
+            cache_system_prompt=True # Same instructions for every card of this content type; only the topic differs
         )
 
-        # 3. Parse the (hopefully) structured response
-        # This parsing needs to be robust.
-        parsed_card_data = self._parse_structured_response(raw_llm_response)
+        # 3. Parse the response: JSON in a single pass, regex line format only as fallback
+        parsed_card_data, parse_status, missing_fields = self._parse_card_response(raw_llm_response)
+        if parse_status == "text_fallback" and self.structured_output:
+            print(f"Warning: Card for topic '{topic}' was not valid JSON; used text fallback parser (missing: {missing_fields or 'none'}).")
         
         # Add some metadata from the generation process
-        parsed_card_data['generation_metadata'] = {
-            'provider_used': (provider or self.default_provider).value if (provider or self.default_provider) else "unknown",
-            'topic_requested': topic,
-            'content_type_requested': content_type.value if hasattr(content_type, 'value') else str(content_type)
-        }
+        parsed_card_data['generation_metadata'] = self._generation_metadata(topic, content_type, provider, "single", template_version)
+        parsed_card_data['generation_metadata']['parse_status'] = parse_status
+        if missing_fields:
+            parsed_card_data['generation_metadata']['missing_fields'] = missing_fields
+        self._record_cards(provider, 1)
         
         return parsed_card_data
 
+    async def stream_content_card(self,
+                                  topic: str,
+                                  content_type: ContentType,
+                                  card_context: str = "",
+                                  provider: Optional[LLMProvider] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams a single card. Yields {'topic', 'partial', 'done': False} events as the
+        sections fill in, then one final {'topic', 'card', 'done': True} event with the
+        fully parsed card (same shape as generate_content_card).
+        """
+        parser = StreamingCardParser()
+        system_prompt, user_prompt_for_card, template_version = self._build_card_prompt(topic, content_type, card_context)
+        async for text_delta in self.stream_generic_text(
+            prompt_text=user_prompt_for_card,
+            system_prompt=system_prompt,
+            provider=provider,
+            max_tokens=2000,
+            temperature=0.6,
+            cache_system_prompt=True
+        ):
+            yield {'topic': topic, 'partial': parser.feed(text_delta), 'done': False}
+
+        parsed_card_data = self._parse_structured_response(parser.text)
+        parsed_card_data['generation_metadata'] = self._generation_metadata(topic, content_type, provider, "stream", template_version)
+        self._record_cards(provider, 1)
+        yield {'topic': topic, 'card': parsed_card_data, 'done': True}
+
+    def _parse_batch_response(self, response_text: str, topics: List[str]) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """Splits a batched JSON response into per-topic card dicts, plus whether the JSON had to be repaired.
+        Only items that pass validation are returned; missing topics are handled by the caller."""
+        items, repaired = parse_json_response(response_text)
+        if isinstance(items, dict):
+            items = items.get('cards')
+        if not isinstance(items, list):
+            print("Warning: Batched response is not valid JSON. Falling back to single-card calls.")
+            return {}, repaired
+        if repaired:
+            print("Warning: Batched response was truncated; incomplete cards will be regenerated individually.")
+
+        topics_by_key = {topic.strip().casefold(): topic for topic in topics}
+        cards: Dict[str, Dict[str, Any]] = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            # Match by the echoed topic first, then by position in the array
+            topic = topics_by_key.get(str(item.get('topic', '')).strip().casefold())
+            if topic is None and index < len(topics) and not item.get('topic'):
+                topic = topics[index]
+            if topic is None or topic in cards:
+                continue
+            card = self._validate_card_dict(item)
+            if card is not None:
+                cards[topic] = card
+        return cards, repaired
+
+    def _validate_card_dict(self, item: Dict[str, Any], lenient: bool = False) -> Optional[Dict[str, Any]]:
+        """Normalizes a JSON card object to the card schema, or returns None if it is incomplete.
+        With `lenient`, only the text fields are required (used for repaired, truncated output)."""
+        card: Dict[str, Any] = {}
+        for key in ('title', 'summary', 'detailed_content'):
+            value = item.get(key)
+            if not isinstance(value, str) or not value.strip():
+                return None
+            card[key] = value.strip()
+
+        keywords = item.get('keywords')
+        if isinstance(keywords, str):
+            keywords = keywords.split(',')
+        if not isinstance(keywords, list):
+            if not lenient:
+                return None
+            keywords = []
+        card['keywords'] = [str(k).strip() for k in keywords if str(k).strip()]
+
+        difficulty = item.get('difficulty_tags', item.get('difficulty'))
+        if isinstance(difficulty, str):
+            difficulty = difficulty.split(',')
+        valid_levels = self.card_schema["properties"]["difficulty_tags"]["items"]["enum"]
+        tags = [str(d).strip().lower() for d in (difficulty or [])]
+        card['difficulty_tags'] = [d for d in tags if d in valid_levels] or ["intermediate"]
+
+        if not card['keywords'] and not lenient:
+            return None
+        return card
+
+    async def _generate_card_batch(self, topics: List[str], content_type: ContentType, card_context: str, provider: Optional[LLMProvider]) -> List[Optional[Dict[str, Any]]]:
+        """Generates one batch of cards with a single call, falling back to single-card calls per failed item."""
+        current_provider = provider if provider is not None else self.default_provider
+        max_output_tokens = self.provider_configs.get(current_provider, {}).get("max_output_tokens", 4096)
+        cards: Dict[str, Dict[str, Any]] = {}
+
+        if len(topics) > 1:
+            try:
+                system_prompt, batch_prompt, template_version = self._build_batch_prompt(topics, content_type, card_context)
+                raw_llm_response = await self.generate_generic_text(
+                    prompt_text=batch_prompt,
+                    system_prompt=system_prompt,
+                    provider=provider,
+                    max_tokens=min(max_output_tokens, OUTPUT_TOKENS_PER_CARD * len(topics)),
+                    temperature=0.6,
+                    response_schema=self._batch_schema(),
+                    cache_system_prompt=True
+                )
+                cards, repaired = self._parse_batch_response(raw_llm_response, topics)
+                for topic, card in cards.items():
+                    card['generation_metadata'] = self._generation_metadata(topic, content_type, provider, "batch", template_version)
+                    card['generation_metadata']['batch_size'] = len(topics)
+                    card['generation_metadata']['parse_status'] = "json_repaired" if repaired else "json"
+                self._record_cards(provider, len(cards))
+            except ContentGenerationError as e:
+                print(f"Warning: Batched generation failed for {len(topics)} topics: {e}")
+
+        missing = [topic for topic in topics if topic not in cards]
+        if missing and len(topics) > 1:
+            print(f"   ↩️ {len(missing)}/{len(topics)} topics missing from batch, retrying them one by one...")
+
+        async def single_card(topic: str) -> Optional[Dict[str, Any]]:
+            try:
+                return await self.generate_content_card(topic, content_type, card_context, provider)
+            except ContentGenerationError as e:
+                print(f"   ❌ Single-card fallback failed for topic '{topic}': {e}")
+                return None
+
+        fallback_cards = await asyncio.gather(*(single_card(topic) for topic in missing))
+        for topic, card in zip(missing, fallback_cards):
+            if card is not None:
+                cards[topic] = card
+
+        return [cards.get(topic) for topic in topics]
+
+    async def generate_content_cards_batch(self,
+                                           topics: List[str],
+                                           content_type: ContentType,
+                                           card_context: str = "",
+                                           provider: Optional[LLMProvider] = None,
+                                           batch_size: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Generates cards for several topics, requesting `batch_size` cards per LLM call so
+        the system prompt and format instructions are only paid for once per batch.
+        Returns a list aligned with `topics`; entries are None where generation failed.
+        """
+        if not topics:
+            return []
+        size = batch_size if batch_size else self.get_batch_size(provider)
+        batches = [topics[i:i + size] for i in range(0, len(topics), size)]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+
+        async def run_batch(batch: List[str]) -> List[Optional[Dict[str, Any]]]:
+            async with semaphore:
+                return await self._generate_card_batch(batch, content_type, card_context, provider)
+
+        results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+        return [card for batch_result in results for card in batch_result]
+
 
 def get_unified_generator(anthropic_key: Optional[str] = None, 
                          gemini_openai_key: Optional[str] = None, # Renamed for clarity
-                         openai_key: Optional[str] = None) -> UnifiedContentGenerator:
-    """Factory function to get unified content generator with available providers."""
+                         openai_key: Optional[str] = None,
+                         structured_output: bool = True,
+                         fake_llm: Optional[bool] = None) -> UnifiedContentGenerator:
+    """Factory function to get unified content generator with available providers.
+    `fake_llm=True` (or INFOGEN_FAKE_LLM=1) adds the offline fake provider, configured from INFOGEN_FAKE_* variables."""
     
     # Try to get API keys from environment if not provided
     # Check against common placeholder values
@@ -388,11 +1074,15 @@ def get_unified_generator(anthropic_key: Optional[str] = None,
     anthropic_k = get_key(["ANTHROPIC_API_KEY"], anthropic_key)
     gemini_k = get_key(["GOOGLE_API_KEY", "GEMINI_API_KEY"], gemini_openai_key) # For OpenAI-compatible
     openai_k = get_key(["OPENAI_API_KEY"], openai_key)
+    if fake_llm is None:
+        fake_llm = os.getenv("INFOGEN_FAKE_LLM", "").lower() in ("1", "true", "yes")
     
     generator = UnifiedContentGenerator(
         anthropic_api_key=anthropic_k,
         gemini_openai_api_key=gemini_k,
-        openai_api_key=openai_k
+        openai_api_key=openai_k,
+        structured_output=structured_output,
+        fake_llm_config=FakeLLMConfig.from_env() if fake_llm else None
     )
     
     available_providers = generator.get_available_providers()
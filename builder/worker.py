@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Worker - Background processes that execute queued generation and topic-extraction jobs.
+Started by card_builder.py (INFOGEN_QUEUE_WORKERS, default 2) or standalone:
+    python worker.py --processes 4
+Each process owns its own ContentManager and LLM clients and claims jobs from job_queue.py.
+Its metrics registry is published to the queue database (after each job and while jobs run), where
+the UI's usage panel and /metrics endpoint pick it up.
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from generation_jobs import JOB_CANCELLED
+from job_queue import JobQueue, KIND_GENERATE_CARDS, KIND_RESUME_GENERATION, KIND_EXTRACT_TOPICS
+
+BUILDER_DIR = Path(__file__).resolve().parent
+DEFAULT_DATA_DIR = BUILDER_DIR / "data"
+DEFAULT_QUEUE_PATH = DEFAULT_DATA_DIR / "job_queue.sqlite3"
+POLL_INTERVAL_SECONDS = 1.0
+METRICS_PUBLISH_INTERVAL_SECONDS = 5.0
+
+
+def default_queue(queue_path: Optional[str] = None) -> JobQueue:
+    return JobQueue(str(queue_path or DEFAULT_QUEUE_PATH))
+
+
+def is_worker_alive(worker_id: str) -> bool:
+    """Worker ids are host:pid:index; only processes on this host can be checked, others are assumed alive."""
+    host, _, rest = worker_id.partition(":")
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(int(rest.split(":")[0]), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass # Exists but owned by another user
+    return True
+
+
+def process_job(queue: JobQueue, content_manager: Any, job: Dict[str, Any], on_progress: Optional[Callable[[], None]] = None):
+    """Runs one claimed job and records its outcome in the queue."""
+    queue_id, kind, payload = job["queue_id"], job["kind"], job["payload"]
+
+    def report_progress(done: int, total: int, message: str):
+        queue.update_progress(queue_id, done / total if total else 1.0, message)
+        if on_progress:
+            on_progress()
+
+    def cancel_requested() -> bool:
+        return queue.is_cancel_requested(queue_id)
+
+    if kind == KIND_EXTRACT_TOPICS:
+        queue.update_progress(queue_id, 0.1, "Extracting topics...")
+        topics, from_cache = content_manager.extract_topics_with_ai(payload["content"], payload.get("guidance", ""),
+                                                                    payload.get("creator_name", ""), payload.get("provider", ""),
+                                                                    use_cache=payload.get("use_cache", True), return_cache_status=True)
+        if cancel_requested():
+            queue.mark_cancelled(queue_id)
+        elif topics:
+            queue.complete(queue_id, {"topics": topics, "from_cache": from_cache},
+                           f"{len(topics)} topics extracted{' (cached)' if from_cache else ''}")
+        else:
+            queue.fail(queue_id, "No topics extracted (see worker log)")
+        return
+
+    if kind in (KIND_GENERATE_CARDS, KIND_RESUME_GENERATION):
+        # A requeued job (worker crash/restart) continues from its checkpoint instead of starting over
+        generation_job_id = job.get("generation_job_id") or payload.get("generation_job_id")
+        if generation_job_id:
+            generation_job = content_manager.resume_generation_job(generation_job_id, report_progress, cancel_requested)
+        else:
+            generation_job = content_manager.create_generation_job(payload["creator_name"], payload.get("guidance", ""),
+                                                                   payload["topics"], payload["provider"], payload.get("batch_size"))
+            queue.set_generation_job_id(queue_id, generation_job.job_id)
+            queue.update_progress(queue_id, 0.0, f"Generating {len(generation_job.topics)} cards (job {generation_job.job_id})")
+            generation_job = content_manager.run_generation_job(generation_job, report_progress, cancel_requested)
+
+        result = {"generation_job_id": generation_job.job_id, "set_id": generation_job.set_id, **generation_job.counts()}
+        if generation_job.status == JOB_CANCELLED:
+            queue.mark_cancelled(queue_id, f"Cancelled; resume with job id {generation_job.job_id}")
+        else:
+            queue.complete(queue_id, result, generation_job.summary())
+        return
+
+    queue.fail(queue_id, f"Unknown job kind '{kind}'")
+
+
+def worker_loop(worker_index: int, data_dir: str, queue_path: str, poll_interval: float = POLL_INTERVAL_SECONDS):
+    """Entry point of one worker process: claim, run, repeat."""
+    dotenv_path = BUILDER_DIR.parent / ".env"
+    if dotenv_path.exists():
+        load_dotenv(dotenv_path=dotenv_path)
+
+    # Imported here so each spawned process builds its own clients
+    from json_database import JSONDatabaseManager
+    from content_manager import ContentManager
+    from metrics import METRICS
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{worker_index}"
+    queue = JobQueue(queue_path)
+    content_manager = ContentManager(JSONDatabaseManager(data_dir=data_dir))
+    print(f"👷 Worker {worker_id} ready (queue: {queue_path})")
+    last_published = 0.0
+
+    def publish_metrics(force: bool = False):
+        """Stores this process's token/cost/latency metrics in the queue database, at most every few seconds mid-job."""
+        nonlocal last_published
+        if not force and time.time() - last_published < METRICS_PUBLISH_INTERVAL_SECONDS:
+            return
+        try:
+            queue.save_worker_metrics(worker_id, METRICS.snapshot())
+            last_published = time.time()
+        except Exception as e:
+            print(f"⚠️ Worker {worker_id} could not publish metrics: {e}")
+
+    while True:
+        try:
+            job = queue.claim_next(worker_id)
+        except Exception as e:
+            print(f"⚠️ Worker {worker_id} could not poll the queue: {e}")
+            time.sleep(poll_interval * 5)
+            continue
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        print(f"👷 Worker {worker_id} running {job['kind']} job {job['queue_id']}")
+        try:
+            process_job(queue, content_manager, job, publish_metrics)
+        except Exception as e:
+            traceback.print_exc()
+            queue.fail(job["queue_id"], str(e))
+        publish_metrics(force=True)
+
+
+def start_worker_pool(processes: int = 2, data_dir: Optional[str] = None, queue_path: Optional[str] = None) -> List[multiprocessing.Process]:
+    """Starts worker processes (spawned, so no UI threads or sockets are inherited)."""
+    data_dir = str(data_dir or DEFAULT_DATA_DIR)
+    queue_path = str(queue_path or DEFAULT_QUEUE_PATH)
+    default_queue(queue_path).requeue_interrupted(is_worker_alive)
+
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for worker_index in range(processes):
+        process = context.Process(target=worker_loop, args=(worker_index, data_dir, queue_path),
+                                  name=f"infogen-worker-{worker_index}", daemon=True)
+        process.start()
+        workers.append(process)
+    print(f"🚀 Started {processes} background worker process(es)")
+    return workers
+
+
+def stop_worker_pool(workers: List[multiprocessing.Process], timeout: float = 5.0):
+    for process in workers:
+        process.terminate()
+    for process in workers:
+        process.join(timeout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background workers for the card generation queue.")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR))
+    parser.add_argument("--queue", default=str(DEFAULT_QUEUE_PATH))
+    args = parser.parse_args()
+
+    pool = start_worker_pool(args.processes, args.data_dir, args.queue)
+    try:
+        for worker_process in pool:
+            worker_process.join()
+    except KeyboardInterrupt:
+        stop_worker_pool(pool)
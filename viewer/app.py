@@ -4,108 +4,221 @@ Lunar Cards Explorer - Educational Card Game about Moon Exploration
 A Flask web application for exploring lunar history through interactive cards.
 """
 
-from flask import Flask, render_template, jsonify, request
-import json
-import random
+from flask import Flask, render_template, jsonify, request, redirect, send_from_directory, url_for, make_response
+import click
 import os
+import re
+import secrets
+
+from catalog import process_video_url
+from data_provider import DataProvider
+from prerender import prerender_all
+from seeded_order import SeededOrder
 
 app = Flask(__name__)
 
-# Global data storage
-cards_data = {}
-images_data = {}
+# Browser/CDN caching. JSON is revalidated with ETags after JSON_MAX_AGE seconds (data can be hot-reloaded);
+# static and builder media files carry Last-Modified/ETag from Flask and are cached for STATIC_MAX_AGE
+JSON_MAX_AGE = int(os.getenv("VIEWER_JSON_MAX_AGE", "60"))
+STATIC_MAX_AGE = int(os.getenv("VIEWER_STATIC_MAX_AGE", "86400"))
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+
+# Random mode is a permutation of the timeline keyed by a seed: ?seed= in the URL, else the session cookie
+RANDOM_SEED_COOKIE = 'nav_seed'
+RANDOM_SEED_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,32}')
+
+# Button label and icon of the known navigation modes; any other mode in a navigation index gets its
+# capitalized name and a generic icon
+NAVIGATION_MODE_LABELS = {
+    'timeline': ('Tempo', 'fa-clock'),
+    'thematic': ('Temas', 'fa-globe'),
+    'difficulty': ('Dificuldade', 'fa-signal'),
+    'random': ('Aleatório', 'fa-shuffle'),
+}
+
+def navigation_modes(navigation_orders):
+    """[(mode, label, icon)] for the card page: the indexed orders plus random"""
+    return [(mode, *NAVIGATION_MODE_LABELS.get(mode, (mode.replace('_', ' ').capitalize(), 'fa-compass')))
+            for mode in list(navigation_orders) + ['random']]
+
+def prerender_snapshot(data):
+    """Serialize and compress every deterministic lunar API response once per data load"""
+    payloads = {f"card-{card_id}": card_payload(data, card_id) for card_id in data.cards_by_id}
+    payloads["cards-all"] = cards_summary(data)
+    payloads["sets"] = {'sets': data.catalog.list_sets()}
+    for nav_type in data.navigation_orders:
+        for card_id in data.cards_by_id:
+            payloads[f"nav-{nav_type}-{card_id}"] = navigation_payload(data, nav_type, card_id)
+    data.responses = prerender_all(payloads)
+
+def prerender_set(card_set):
+    """Same for a builder set, when it is loaded"""
+    payloads = {f"card-{card['id']}": card for card in card_set.cards}
+    payloads["cards"] = card_set.summary()
+    for nav_type in card_set.navigation_orders:
+        for card in card_set.cards:
+            payloads[f"nav-{nav_type}-{card['id']}"] = set_navigation(card_set, nav_type, card['id'])
+    card_set.responses = prerender_all(payloads)
+
+# All data (lunar cards, indexes, builder catalog, prerendered responses) lives in immutable snapshots
+# that are loaded on the first request and swapped when the data files change (see data_provider.py)
+data_provider = DataProvider(on_snapshot=prerender_snapshot, on_set_loaded=prerender_set)
 
 def load_data():
-    """Load JSON data files"""
-    global cards_data, images_data
-    
-    # Load cards data
-    with open('data/lunar_cards_json_10q_v1.json', 'r', encoding='utf-8') as f:
-        cards_data = json.load(f)
+    """Load JSON data files (the first request would otherwise do it)"""
+    return data_provider.get()
+
+def cached_json(etag_key, build_payload, not_found='Not found', prerendered=None):
+    """JSON response with a strong ETag (data version + resource key) and Last-Modified.
+    Answers 304 when the client's copy is current (without building the payload on an ETag match).
+    prerendered(data) may return a PrerenderedJSON, which is sent as-is in the best accepted encoding."""
+    data = data_provider.get()
+    rendered = prerendered(data) if prerendered else None
+    body, encoding = rendered.select(request.accept_encodings) if rendered else (None, None)
+    # Each encoding is a different representation, so it gets its own strong ETag
+    etag = f"{data.version}-{etag_key}" + (f"-{encoding}" if encoding else "")
     
-    # Load images data
-    with open('data/lunar_card_images.json', 'r', encoding='utf-8') as f:
-        images_data = json.load(f)
+    if request.if_none_match and request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        payload = None
+        if rendered is None:
+            payload = build_payload(data)
+            if payload is None:
+                return jsonify({'error': not_found}), 404
+        if (not request.if_none_match and request.if_modified_since is not None
+                and request.if_modified_since >= data.last_modified):
+            response = app.response_class(status=304)
+        elif rendered is not None:
+            response = app.response_class(body, mimetype='application/json')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        else:
+            response = jsonify(payload)
     
-    print(f"📚 Loaded {len(cards_data['cards'])} cards")
+    if rendered is not None:
+        response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.last_modified = data.last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = JSON_MAX_AGE
+    return response
+
+# Prefetch window: how many neighbours /api/window returns on each side of the current card
+WINDOW_BEFORE_DEFAULT = 2
+WINDOW_AFTER_DEFAULT = 5
+WINDOW_MAX = 10
+
+def window_bounds():
+    """before/after from the query string, clamped to 0..WINDOW_MAX"""
+    before = request.args.get('before', WINDOW_BEFORE_DEFAULT, type=int)
+    after = request.args.get('after', WINDOW_AFTER_DEFAULT, type=int)
+    return max(0, min(before, WINDOW_MAX)), max(0, min(after, WINDOW_MAX))
+
+def window_payload(order, positions, current_id, before, after, entry_for, nav_type, extra=None):
+    """The cards around current_id in a (circular) navigation order, each with its own navigation data,
+    so the client can move several steps without another request. None if current_id is not in the order."""
+    if current_id not in positions:
+        return None
+    index = positions[current_id]
+    total = len(order)
+    cards = []
+    seen = set()
+    for offset in range(-before, after + 1):
+        position = (index + offset) % total
+        card_id = order[position]
+        if card_id in seen: # Window larger than the order
+            continue
+        seen.add(card_id)
+        entry = dict(entry_for(card_id))
+        entry['offset'] = offset
+        entry['navigation'] = {
+            'next_id': order[(position + 1) % total],
+            'prev_id': order[(position - 1) % total],
+            'current_index': position + 1,
+            'total_cards': total,
+            'navigation_type': nav_type
+        }
+        cards.append(entry)
+    return {'navigation_type': nav_type, 'current_id': current_id, 'cards': cards, **(extra or {})}
+
+def lunar_window_entry(data, card_id):
+    """Card payload plus the URL of its image (None for video cards)"""
+    entry = card_payload(data, card_id)
+    entry['image_url'] = None if entry['video_url'] else url_for('static', filename=entry['image_path'])
+    return entry
+
+def navigation_seed():
+    """(seed, explicit) for random mode: ?seed= (explicit, the URL alone determines the order),
+    else the session cookie, else a new seed"""
+    seed = request.args.get('seed', '')
+    if RANDOM_SEED_PATTERN.fullmatch(seed):
+        return seed, True
+    seed = request.cookies.get(RANDOM_SEED_COOKIE, '')
+    if RANDOM_SEED_PATTERN.fullmatch(seed):
+        return seed, False
+    return secrets.token_urlsafe(6), False
+
+def remember_seed(response, seed):
+    """Keep the session on this seed"""
+    if request.cookies.get(RANDOM_SEED_COOKIE) != seed:
+        response.set_cookie(RANDOM_SEED_COOKIE, seed, httponly=True, samesite='Lax')
+    return response
+
+def random_extra(nav_type, seed):
+    """Extra payload keys of random mode (the seed, so clients can put it in their URLs)"""
+    return {'seed': seed} if nav_type == 'random' else {}
+
+def random_json(etag_key, build_payload, not_found='Not found'):
+    """Random-mode response for build_payload(data, seed). With ?seed= it is cached like the other modes
+    (one cache entry per seed); with the cookie seed it depends on the cookie, so it is not stored."""
+    seed, explicit = navigation_seed()
+    if explicit:
+        return cached_json(f"{etag_key}-seed-{seed}", lambda data: build_payload(data, seed), not_found=not_found)
+    payload = build_payload(data_provider.get(), seed)
+    if payload is None:
+        return jsonify({'error': not_found}), 404
+    return remember_seed(uncached_json(payload), seed)
+
+def resolve_order(navigation_orders, navigation_positions, nav_type, seed=None):
+    """(order, positions) of a navigation mode. Random is the timeline permuted by the seed: both are
+    computed per access, nothing is shuffled or stored."""
+    if nav_type == 'random':
+        order = SeededOrder(navigation_orders['timeline'], navigation_positions['timeline'],
+                            seed or secrets.token_urlsafe(6))
+        return order, order.positions
+    if nav_type not in navigation_orders:
+        nav_type = 'timeline'
+    return navigation_orders[nav_type], navigation_positions[nav_type]
+
+def set_response(data, set_id, key):
+    """Prerendered response of a builder set, or None"""
+    card_set = data.catalog.get_set(set_id)
+    return card_set.responses.get(key) if card_set else None
+
+def uncached_json(payload):
+    """JSON response that must not be stored (e.g. a fresh random order)"""
+    response = jsonify(payload)
+    response.cache_control.no_store = True
+    return response
 
 def get_card_by_id(card_id):
     """Get a specific card by ID"""
-    for card in cards_data['cards']:
-        if card['id'] == card_id:
-            return card
-    return None
+    return data_provider.get().cards_by_id.get(card_id)
 
 def get_image_path(card_id):
     """Get local image path for a card"""
     return f"images/card_{card_id}.jpg"
 
-def process_video_url(url):
-    """Process video URL to get embeddable format"""
-    if not url:
-        return None
-    
-    # Handle YouTube URLs with timestamps
-    if 'youtube.com/watch' in url or 'youtu.be/' in url:
-        # Extract video ID and timestamp
-        if 'youtube.com/watch' in url:
-            video_id = url.split('v=')[1].split('&')[0]
-            if '&t=' in url:
-                timestamp = url.split('&t=')[1].split('&')[0]
-                if 's' in timestamp:
-                    timestamp = timestamp.replace('s', '')
-            else:
-                timestamp = None
-        elif 'youtu.be/' in url:
-            video_parts = url.split('youtu.be/')[1].split('?')
-            video_id = video_parts[0]
-            if len(video_parts) > 1 and 't=' in video_parts[1]:
-                timestamp = video_parts[1].split('t=')[1].split('&')[0]
-                if 's' in timestamp:
-                    timestamp = timestamp.replace('s', '')
-            else:
-                timestamp = None
-        
-        # Build embed URL
-        embed_url = f"https://www.youtube.com/embed/{video_id}"
-        if timestamp:
-            embed_url += f"?start={timestamp}&autoplay=0&rel=0"
-        else:
-            embed_url += "?autoplay=0&rel=0"
-        
-        return embed_url
-    
-    return url
-
-def get_navigation_order(nav_type, current_id=1):
+def get_navigation_order(nav_type, current_id=1, data=None, seed=None):
     """Get card order based on navigation type"""
-    total_cards = len(cards_data['cards'])
-    
-    if nav_type == 'timeline':
-        # Chronological order (cards are already in chronological order)
-        return list(range(1, total_cards + 1))
-    
-    elif nav_type == 'thematic':
-        # Group by themes (Soviet era, American era, Modern era)
-        soviet_era = [1, 4]  # Luna missions
-        american_era = [2, 3]  # Apollo and Gemini
-        international_era = [5, 6, 8]  # China, India, ESA
-        modern_commercial = [7, 9, 10]  # Artemis, Private, Mars prep
-        return soviet_era + american_era + international_era + modern_commercial
-    
-    elif nav_type == 'random':
-        # Random order
-        order = list(range(1, total_cards + 1))
-        random.shuffle(order)
-        return order
-    
-    # Default to timeline
-    return list(range(1, total_cards + 1))
+    data = data or data_provider.get()
+    return resolve_order(data.navigation_orders, data.navigation_positions, nav_type, seed)[0]
 
 @app.route('/')
 def index():
     """Homepage - show first card"""
-    return render_template('index.html')
+    return render_template('index.html', sets=data_provider.get().catalog.list_sets())
 
 @app.route('/card/<int:card_id>')
 def show_card(card_id):
@@ -124,42 +237,45 @@ def show_card(card_id):
     else:
         card_with_media['video_url'] = None
     
-    return render_template('card.html', card=card_with_media)
+    seed, _ = navigation_seed()
+    nav_modes = navigation_modes(data_provider.get().navigation_orders)
+    response = make_response(render_template('card.html', card=card_with_media, nav_seed=seed, nav_modes=nav_modes))
+    return remember_seed(response, seed)
 
-@app.route('/api/navigation/<nav_type>/<int:current_id>')
-def get_navigation(nav_type, current_id):
-    """API endpoint for navigation logic"""
-    order = get_navigation_order(nav_type)
+def navigation_payload(data, nav_type, current_id, seed=None):
+    """Next/previous card ids and position of a card in a navigation order"""
+    order, positions = resolve_order(data.navigation_orders, data.navigation_positions, nav_type, seed)
     
     try:
-        current_index = order.index(current_id)
+        current_index = positions[current_id]
         
         next_id = order[(current_index + 1) % len(order)]
         prev_id = order[(current_index - 1) % len(order)]
         
-        return jsonify({
+        return {
             'next_id': next_id,
             'prev_id': prev_id,
             'current_index': current_index + 1,
             'total_cards': len(order),
-            'navigation_type': nav_type
-        })
-    except ValueError:
+            'navigation_type': nav_type,
+            **random_extra(nav_type, seed)
+        }
+    except (KeyError, ValueError):
         # Current ID not in order, default to first card
-        return jsonify({
+        return {
             'next_id': order[1] if len(order) > 1 else order[0],
             'prev_id': order[-1],
             'current_index': 1,
             'total_cards': len(order),
-            'navigation_type': nav_type
-        })
+            'navigation_type': nav_type,
+            **random_extra(nav_type, seed)
+        }
 
-@app.route('/api/card/<int:card_id>')
-def get_card_data(card_id):
-    """API endpoint to get card data as JSON"""
-    card = get_card_by_id(card_id)
+def card_payload(data, card_id):
+    """Card data with its image path and embeddable video URL, or None"""
+    card = data.cards_by_id.get(card_id)
     if not card:
-        return jsonify({'error': 'Card not found'}), 404
+        return None
     
     card_with_media = card.copy()
     card_with_media['image_path'] = get_image_path(card_id)
@@ -170,19 +286,180 @@ def get_card_data(card_id):
     else:
         card_with_media['video_url'] = None
     
-    return jsonify(card_with_media)
+    return card_with_media
+
+@app.route('/api/navigation/<nav_type>/<int:current_id>')
+def get_navigation(nav_type, current_id):
+    """API endpoint for navigation logic"""
+    if nav_type == 'random':
+        return random_json(f"nav-random-{current_id}", lambda data, seed: navigation_payload(data, nav_type, current_id, seed))
+    # Timeline and thematic orders only change with the data
+    key = f"nav-{nav_type}-{current_id}"
+    return cached_json(key, lambda data: navigation_payload(data, nav_type, current_id),
+                       prerendered=lambda data: data.responses.get(key))
+
+@app.route('/api/window/<nav_type>/<int:card_id>')
+def get_window(nav_type, card_id):
+    """API endpoint returning the neighbouring cards of a card (payloads, positions, image URLs) in one response"""
+    before, after = window_bounds()
+    
+    def build(data, seed=None):
+        order, positions = resolve_order(data.navigation_orders, data.navigation_positions, nav_type, seed)
+        return window_payload(order, positions, card_id, before, after,
+                              lambda n: lunar_window_entry(data, n), nav_type, random_extra(nav_type, seed))
+    
+    key = f"window-{nav_type}-{card_id}-{before}-{after}"
+    if nav_type == 'random':
+        return random_json(key, build, not_found='Card not found')
+    return cached_json(key, build, not_found='Card not found')
+
+@app.route('/api/card/<int:card_id>')
+def get_card_data(card_id):
+    """API endpoint to get card data as JSON"""
+    key = f"card-{card_id}"
+    return cached_json(key, lambda data: card_payload(data, card_id), not_found='Card not found',
+                       prerendered=lambda data: data.responses.get(key))
 
 @app.route('/api/cards/all')
 def get_all_cards():
     """API endpoint to get all cards metadata"""
+    return cached_json("cards-all", cards_summary, prerendered=lambda data: data.responses.get("cards-all"))
+
+def cards_summary(data):
+    """Id, title and summary of every lunar card"""
     cards_summary = []
-    for card in cards_data['cards']:
+    for card in data.cards_data['cards']:
         cards_summary.append({
             'id': card['id'],
             'titulo': card['titulo'],
             'resumo': card['resumo']
         })
-    return jsonify({'cards': cards_summary})
+    return {'cards': cards_summary}
+
+def set_navigation(card_set, nav_type, number, seed=None):
+    """Navigation payload within a builder set"""
+    order, positions = resolve_order(card_set.navigation_orders, card_set.navigation_positions, nav_type, seed)
+    
+    current_index = positions.get(number, 0)
+    return {
+        'next_id': order[(current_index + 1) % len(order)],
+        'prev_id': order[(current_index - 1) % len(order)],
+        'current_index': current_index + 1,
+        'total_cards': len(order),
+        'navigation_type': nav_type,
+        'set_id': card_set.set_id,
+        **random_extra(nav_type, seed)
+    }
+
+@app.route('/set/<set_id>')
+def show_set(set_id):
+    """Start a builder set at its first card"""
+    if not data_provider.get().catalog.get_set(set_id):
+        return "Set not found", 404
+    return redirect(f"/set/{set_id}/card/1?nav={request.args.get('nav', 'timeline')}")
+
+@app.route('/set/<set_id>/card/<int:number>')
+def show_set_card(set_id, number):
+    """Display card number <number> of a builder set"""
+    card_set = data_provider.get().catalog.get_set(set_id)
+    card = card_set.card(number) if card_set else None
+    if not card:
+        return "Card not found", 404
+    seed, _ = navigation_seed()
+    response = make_response(render_template(
+        'card.html', card=card, card_set=card_set.meta, nav_seed=seed,
+        nav_modes=navigation_modes(card_set.navigation_orders), card_base=f"/set/{set_id}/card/",
+        navigation_base=f"/api/set/{set_id}/navigation/", window_base=f"/api/set/{set_id}/window/"))
+    return remember_seed(response, seed)
+
+@app.route('/api/sets')
+def get_sets():
+    """API endpoint listing the published builder sets"""
+    return cached_json("sets", lambda data: {'sets': data.catalog.list_sets()},
+                       prerendered=lambda data: data.responses.get("sets"))
+
+@app.route('/api/set/<set_id>/cards')
+def get_set_cards(set_id):
+    """API endpoint to get the cards metadata of a builder set"""
+    def build(data):
+        card_set = data.catalog.get_set(set_id)
+        return card_set.summary() if card_set else None
+    return cached_json(f"set-{set_id}", build, not_found='Set not found',
+                       prerendered=lambda data: set_response(data, set_id, "cards"))
+
+@app.route('/api/set/<set_id>/card/<int:number>')
+def get_set_card(set_id, number):
+    """API endpoint to get a builder card as JSON"""
+    def build(data):
+        card_set = data.catalog.get_set(set_id)
+        return card_set.card(number) if card_set else None
+    return cached_json(f"set-{set_id}-card-{number}", build, not_found='Card not found',
+                       prerendered=lambda data: set_response(data, set_id, f"card-{number}"))
+
+@app.route('/api/set/<set_id>/navigation/<nav_type>/<int:number>')
+def get_set_navigation(set_id, nav_type, number):
+    """API endpoint for navigation logic within a builder set"""
+    def build(data, seed=None):
+        card_set = data.catalog.get_set(set_id)
+        return set_navigation(card_set, nav_type, number, seed) if card_set and len(card_set) else None
+    if nav_type == 'random':
+        return random_json(f"set-{set_id}-nav-random-{number}", build, not_found='Set not found')
+    return cached_json(f"set-{set_id}-nav-{nav_type}-{number}", build, not_found='Set not found',
+                       prerendered=lambda data: set_response(data, set_id, f"nav-{nav_type}-{number}"))
+
+@app.route('/api/set/<set_id>/window/<nav_type>/<int:number>')
+def get_set_window(set_id, nav_type, number):
+    """API endpoint returning the neighbouring cards of a builder card in one response"""
+    before, after = window_bounds()
+    
+    def build(data, seed=None):
+        card_set = data.catalog.get_set(set_id)
+        if not card_set or not len(card_set):
+            return None
+        order, positions = resolve_order(card_set.navigation_orders, card_set.navigation_positions, nav_type, seed)
+        return window_payload(order, positions, number, before, after, card_set.card, nav_type,
+                              {'set_id': set_id, **random_extra(nav_type, seed)})
+    
+    key = f"set-{set_id}-window-{nav_type}-{number}-{before}-{after}"
+    if nav_type == 'random':
+        return random_json(key, build, not_found='Card not found')
+    return cached_json(key, build, not_found='Card not found')
+
+@app.route('/media/<path:filename>')
+def builder_media(filename):
+    """Media files stored in the builder's images directory (the rest of the data dir is not exposed)"""
+    return send_from_directory(data_provider.get().catalog.images_dir, filename)
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return uncached_json({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: data is loaded and can be served"""
+    try:
+        data = data_provider.get()
+    except Exception as e:
+        response = uncached_json({'status': 'unavailable', 'error': str(e)})
+        response.status_code = 503
+        return response
+    return uncached_json({
+        'status': 'ready',
+        'data_version': data.version,
+        'loaded_at': data.loaded_at,
+        'cards': len(data.cards_by_id),
+        'sets': len(data.catalog.list_sets()),
+        'sets_loaded': len(data.catalog.loaded_set_ids())
+    })
+
+@app.cli.command('export')
+@click.option('--output', default=None, help='Output directory (default: viewer/dist)')
+@click.option('--force', is_flag=True, help='Re-render everything, ignoring the manifest')
+def export_command(output, force):
+    """Export the viewer as a static site (see export_static.py)"""
+    from export_static import export_site, EXPORT_DIR
+    export_site(output or EXPORT_DIR, force)
 
 if __name__ == '__main__':
     # Load data on startup
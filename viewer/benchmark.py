@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Viewer API benchmark - Measures requests/second and latency of the card and navigation APIs against
+a running server, using keep-alive connections from a pool of client threads.
+
+    gunicorn -c gunicorn.conf.py &
+    python benchmark.py --url http://127.0.0.1:5001 --duration 20 --concurrency 32 --server-cores 4
+
+Requests/second per core = total requests/second / --server-cores (the cores the server may use).
+Run the client on other cores or another machine: on the same cores it competes with the server and
+the numbers understate the server's capacity.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+SCENARIOS = {
+    "card": lambda ids, i: f"/api/card/{ids[i % len(ids)]}",
+    "navigation": lambda ids, i: f"/api/navigation/{('timeline', 'thematic')[i % 2]}/{ids[i % len(ids)]}",
+}
+
+
+def fetch_card_ids(base_url):
+    parts = urlsplit(base_url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    connection.request("GET", "/api/cards/all")
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    if response.status != 200:
+        raise SystemExit(f"GET /api/cards/all returned HTTP {response.status}; is the viewer running at {base_url}?")
+    return [card['id'] for card in json.loads(body)['cards']]
+
+
+def run_scenario(base_url, scenario, ids, duration, concurrency, accept_encoding):
+    parts = urlsplit(base_url)
+    make_path = SCENARIOS[scenario]
+    deadline = time.perf_counter() + duration
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+
+    def client(slot):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+        i = slot
+        while time.perf_counter() < deadline:
+            path = make_path(ids, i)
+            i += concurrency
+            start = time.perf_counter()
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[slot] += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                errors[slot] += 1
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+                continue
+            latencies[slot].append(time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = sorted(latency for slot in latencies for latency in slot)
+    count = len(all_latencies)
+    return {
+        "scenario": scenario,
+        "requests": count,
+        "errors": sum(errors),
+        "seconds": round(elapsed, 2),
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(all_latencies) * 1000, 2) if count else None,
+        "p99_ms": round(all_latencies[min(count - 1, int(count * 0.99))] * 1000, 2) if count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the viewer's card and navigation APIs")
+    parser.add_argument("--url", default="http://127.0.0.1:5001", help="Base URL of a running viewer")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Client threads (keep-alive connections)")
+    parser.add_argument("--server-cores", type=int, default=1, help="Cores available to the server, for req/s per core")
+    parser.add_argument("--scenarios", default="card,navigation", help="Comma-separated: " + ", ".join(SCENARIOS))
+    parser.add_argument("--accept-encoding", default="gzip, br", help="Accept-Encoding sent by the clients ('' for none)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    ids = fetch_card_ids(args.url)
+    results = []
+    for scenario in args.scenarios.split(","):
+        result = run_scenario(args.url, scenario.strip(), ids, args.duration, args.concurrency, args.accept_encoding)
+        result["rps_per_core"] = round(result["rps"] / max(1, args.server_cores), 1)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'Scenario':<12} {'Requests':>9} {'Errors':>7} {'Req/s':>9} {'Req/s/core':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['scenario']:<12} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9} {r['rps_per_core']:>11} "
+              f"{r['p50_ms']:>8} {r['p99_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
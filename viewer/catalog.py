@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Builder Catalog - Read-only access to the builder's JSON database (creators.json, content_sets.json, cards.json).
+Set metadata is loaded on first use; the cards of a set are loaded and indexed only when that set is
+visited, and a bounded LRU keeps the most recently visited sets in memory. Navigation orders come from
+the index files the builder writes to navigation/<set_id>.json (see builder/navigation_index.py).
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+BUILDER_DATA_DIR = Path(os.getenv("INFOGEN_DATA_DIR", Path(__file__).resolve().parent.parent / "builder" / "data"))
+SET_CACHE_SIZE = int(os.getenv("VIEWER_SET_CACHE_SIZE", "32"))
+PUBLIC_SET_STATUSES = ("published",)
+NAVIGATION_INDEX_DIR = "navigation"
+
+
+def process_video_url(url):
+    """Process video URL to get embeddable format"""
+    if not url:
+        return None
+
+    # Handle YouTube URLs with timestamps
+    if 'youtube.com/watch' in url or 'youtu.be/' in url:
+        # Extract video ID and timestamp
+        if 'youtube.com/watch' in url:
+            video_id = url.split('v=')[1].split('&')[0]
+            if '&t=' in url:
+                timestamp = url.split('&t=')[1].split('&')[0]
+                if 's' in timestamp:
+                    timestamp = timestamp.replace('s', '')
+            else:
+                timestamp = None
+        elif 'youtu.be/' in url:
+            video_parts = url.split('youtu.be/')[1].split('?')
+            video_id = video_parts[0]
+            if len(video_parts) > 1 and 't=' in video_parts[1]:
+                timestamp = video_parts[1].split('t=')[1].split('&')[0]
+                if 's' in timestamp:
+                    timestamp = timestamp.replace('s', '')
+            else:
+                timestamp = None
+
+        # Build embed URL
+        embed_url = f"https://www.youtube.com/embed/{video_id}"
+        if timestamp:
+            embed_url += f"?start={timestamp}&autoplay=0&rel=0"
+        else:
+            embed_url += "?autoplay=0&rel=0"
+
+        return embed_url
+
+    return url
+
+
+def media_url(url):
+    """Remote media is linked as-is; files under the builder's data/images/ are served under /media/"""
+    if not url or url.startswith(("http://", "https://", "/")):
+        return url or None
+    path = url[2:] if url.startswith("./") else url
+    if path.startswith("images/"):
+        path = path[len("images/"):]
+    return f"/media/{path}"
+
+
+def card_view(card, number):
+    """Map a builder card to the viewer's card schema (titulo/resumo/detalhado), numbered 1..n in its set"""
+    media = card.get('media') or []
+    image = next((m for m in media if m.get('media_type') == 'image' and m.get('url')), None)
+    video = next((m for m in media if m.get('media_type') == 'video' and m.get('url')), None)
+    return {
+        'id': number,
+        'card_id': card['card_id'],
+        'set_id': card['set_id'],
+        'titulo': card.get('title', ''),
+        'resumo': card.get('summary', ''),
+        'detalhado': card.get('detailed_content', ''),
+        'tags': card.get('tags', []),
+        'domain_data': card.get('domain_data', {}),
+        'image_url': media_url(image['url']) if image else None,
+        'image_alt': image.get('alt_text', '') if image else '',
+        'video_url': process_video_url(video['url']) if video else None,
+    }
+
+
+def read_navigation_index(path):
+    """{navigation type: [card id, ...]} from a navigation index file; {} if it is missing or invalid"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            orders = json.load(f).get('orders', {})
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"⚠️ Navigation index {path} ignored: {e}")
+        return {}
+    return orders if isinstance(orders, dict) else {}
+
+
+def navigation_orders_from_index(index_orders, timeline):
+    """{navigation type: order} over the card ids in timeline (set order), for every type in the index.
+    Cards the index does not know (added after it was written) follow in set order, unknown ids are
+    dropped. Timeline is always present; random is never indexed (it is seeded per request)."""
+    known = set(timeline)
+    orders = {'timeline': list(timeline)}
+    for nav_type, index_order in index_orders.items():
+        if nav_type == 'random' or not isinstance(index_order, list):
+            continue
+        order = list(dict.fromkeys(card_id for card_id in index_order if card_id in known))
+        listed = set(order)
+        orders[nav_type] = order + [card_id for card_id in timeline if card_id not in listed]
+    return orders
+
+
+def navigation_positions(navigation_orders):
+    """{navigation type: {card id: position}}"""
+    return {nav_type: {card_id: index for index, card_id in enumerate(order)}
+            for nav_type, order in navigation_orders.items()}
+
+
+class CardSet:
+    """One loaded set: cards in set order plus navigation orders and position maps"""
+
+    def __init__(self, meta, cards, navigation_index=None):
+        self.set_id = meta['set_id']
+        self.meta = meta
+        self.responses = {}  # Pre-serialized API responses, filled by the on_set_loaded hook
+        ordered = sorted(cards, key=lambda c: (c.get('order_index', 0), c.get('created_at', '')))
+        self.cards = [card_view(card, number) for number, card in enumerate(ordered, 1)]
+        self.number_by_card_id = {card['card_id']: card['id'] for card in self.cards}
+
+        # The index lists builder card ids; the viewer navigates by card number
+        orders = navigation_orders_from_index(navigation_index or {}, [card['card_id'] for card in self.cards])
+        self.navigation_orders = {nav_type: [self.number_by_card_id[card_id] for card_id in order]
+                                  for nav_type, order in orders.items()}
+        self.navigation_positions = navigation_positions(self.navigation_orders)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def card(self, number):
+        """Card by its 1-based number in the set, or None"""
+        if 1 <= number <= len(self.cards):
+            return self.cards[number - 1]
+        return None
+
+    def summary(self):
+        return {'set_id': self.set_id, 'cards': [
+            {'id': card['id'], 'card_id': card['card_id'], 'titulo': card['titulo'], 'resumo': card['resumo']}
+            for card in self.cards
+        ]}
+
+
+class BuilderCatalog:
+    """Lazily loaded view of the builder's store"""
+
+    def __init__(self, data_dir=BUILDER_DATA_DIR, max_sets=SET_CACHE_SIZE, on_set_loaded=None):
+        self.data_dir = Path(data_dir)
+        self.on_set_loaded = on_set_loaded  # Called with each CardSet before it is shared
+        self.images_dir = self.data_dir / "images"
+        self.max_sets = max_sets
+        self._sets_meta = None
+        self._creators = None
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def navigation_index_path(self, set_id):
+        return self.data_dir / NAVIGATION_INDEX_DIR / f"{set_id}.json"
+
+    def _read(self, name):
+        path = self.data_dir / name
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _ensure_metadata(self):
+        if self._sets_meta is None:
+            with self._lock:
+                if self._sets_meta is None:
+                    self._creators = {c['creator_id']: c for c in self._read('creators.json')}
+                    self._sets_meta = {s['set_id']: s for s in self._read('content_sets.json')
+                                       if s.get('status') in PUBLIC_SET_STATUSES}
+                    print(f"📚 Builder catalog: {len(self._sets_meta)} published sets in {self.data_dir}")
+
+    def list_sets(self):
+        """Published sets with their creator's display name, newest first"""
+        self._ensure_metadata()
+        sets = []
+        for meta in self._sets_meta.values():
+            creator = self._creators.get(meta.get('creator_id'), {})
+            sets.append({
+                'set_id': meta['set_id'],
+                'title': meta.get('title', ''),
+                'description': meta.get('description', ''),
+                'category': meta.get('category', ''),
+                'card_count': meta.get('card_count', 0),
+                'creator_id': meta.get('creator_id'),
+                'creator_name': creator.get('display_name', meta.get('creator_id', '')),
+                'updated_at': meta.get('updated_at', ''),
+            })
+        return sorted(sets, key=lambda s: s['updated_at'], reverse=True)
+
+    def loaded_set_ids(self):
+        """Ids of the sets currently indexed in memory, least recently used first"""
+        with self._lock:
+            return list(self._loaded)
+
+    def get_set(self, set_id):
+        """The loaded CardSet, or None for unknown/unpublished sets"""
+        self._ensure_metadata()
+        meta = self._sets_meta.get(set_id)
+        if meta is None:
+            return None
+        with self._lock:
+            card_set = self._loaded.get(set_id)
+            if card_set is not None:
+                self._loaded.move_to_end(set_id)
+                return card_set
+
+        # cards.json holds every set; only this set's cards are kept after parsing
+        cards = [card for card in self._read('cards.json') if card.get('set_id') == set_id]
+        card_set = CardSet(meta, cards, read_navigation_index(self.navigation_index_path(set_id)))
+        if self.on_set_loaded:
+            self.on_set_loaded(card_set)
+        with self._lock:
+            self._loaded[set_id] = card_set
+            self._loaded.move_to_end(set_id)
+            while len(self._loaded) > self.max_sets:
+                self._loaded.popitem(last=False)
+        print(f"📖 Loaded set {set_id} ({len(card_set)} cards)")
+        return card_set
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Data Provider - Loads the viewer's data on first request and reloads it when the data files change.
+Every load builds a complete, read-only ViewerData snapshot; publishing it is a single reference
+assignment, so requests see either the old or the new snapshot, never a half-built one. A daemon
+thread polls file mtimes and rebuilds in the background, so reloads never block requests. The thread
+is started lazily per process, which keeps the provider safe to import before a server forks workers.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from catalog import (BuilderCatalog, BUILDER_DATA_DIR, NAVIGATION_INDEX_DIR, navigation_orders_from_index,
+                     navigation_positions, read_navigation_index)
+
+VIEWER_DATA_DIR = Path(__file__).resolve().parent / "data"
+LUNAR_CARDS_FILE = VIEWER_DATA_DIR / "lunar_cards_json_10q_v1.json"
+LUNAR_IMAGES_FILE = VIEWER_DATA_DIR / "lunar_card_images.json"
+LUNAR_NAVIGATION_FILE = VIEWER_DATA_DIR / "lunar_navigation.json"  # Written by builder/navigation_index.py --lunar
+BUILDER_FILES = ("creators.json", "content_sets.json", "cards.json")
+RELOAD_INTERVAL_SECONDS = float(os.getenv("VIEWER_RELOAD_INTERVAL", "2"))
+
+
+class ViewerData:
+    """One immutable snapshot: the lunar cards with their indexes, plus the builder catalog"""
+
+    def __init__(self, cards_data, images_data, catalog, version, last_modified=None, navigation_index=None):
+        self.cards_data = cards_data
+        self.images_data = images_data
+        self.catalog = catalog
+        self.version = version              # Short hash of the data files' mtimes and sizes, used in ETags
+        self.last_modified = last_modified  # Newest data file mtime (whole seconds, UTC), for Last-Modified
+        self.loaded_at = time.time()
+        self.responses = {}                 # Pre-serialized API responses, filled by the on_snapshot hook
+
+        # Card id -> card, and per navigation type (from the navigation index; timeline = file order when
+        # there is none) the card id order plus card id -> position
+        self.cards_by_id = {card['id']: card for card in cards_data['cards']}
+        self.navigation_orders = navigation_orders_from_index(navigation_index or {},
+                                                              [card['id'] for card in cards_data['cards']])
+        self.navigation_positions = navigation_positions(self.navigation_orders)
+
+
+class DataProvider:
+    """Holds the current ViewerData snapshot and swaps in a new one when the watched files change"""
+
+    def __init__(self, builder_data_dir=BUILDER_DATA_DIR, interval=RELOAD_INTERVAL_SECONDS,
+                 on_snapshot=None, on_set_loaded=None):
+        self.builder_data_dir = Path(builder_data_dir)
+        self.interval = interval
+        self.on_snapshot = on_snapshot      # Called with each new ViewerData before it is published
+        self.on_set_loaded = on_set_loaded  # Passed to every BuilderCatalog
+        self.preload_sets = False           # Load every published set with each snapshot (see preload())
+        self._snapshot = None
+        self._signature = None
+        self._failed_signature = None
+        self._load_lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher_pid = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Threads do not survive fork and a lock held by one of them would never be released
+        self._load_lock = threading.Lock()
+        self._watcher_lock = threading.Lock()
+        self._watcher_pid = None
+
+    def watched_files(self):
+        # Navigation index files are listed on every poll, so new sets' indexes are picked up too
+        navigation_files = sorted((self.builder_data_dir / NAVIGATION_INDEX_DIR).glob("*.json"))
+        return ([LUNAR_CARDS_FILE, LUNAR_IMAGES_FILE, LUNAR_NAVIGATION_FILE]
+                + [self.builder_data_dir / name for name in BUILDER_FILES] + navigation_files)
+
+    def _file_signature(self):
+        signature = []
+        for path in self.watched_files():
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def _build(self, signature):
+        with open(LUNAR_CARDS_FILE, 'r', encoding='utf-8') as f:
+            cards_data = json.load(f)
+        with open(LUNAR_IMAGES_FILE, 'r', encoding='utf-8') as f:
+            images_data = json.load(f)
+        navigation_index = read_navigation_index(LUNAR_NAVIGATION_FILE)
+        catalog = BuilderCatalog(self.builder_data_dir, on_set_loaded=self.on_set_loaded)
+        sets = catalog.list_sets() # Read set metadata now, not on the first request that needs it
+        if self.preload_sets:
+            # Every set in memory, so request handlers never read from disk
+            catalog.max_sets = max(catalog.max_sets, len(sets))
+            for set_info in sets:
+                catalog.get_set(set_info['set_id'])
+        elif self._snapshot is not None:
+            # Sets that were being read keep their indexes warm across reloads
+            for set_id in self._snapshot.catalog.loaded_set_ids():
+                catalog.get_set(set_id)
+        version = hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:12] # Same in every worker process
+        newest_mtime = max((mtime for _, mtime, _ in signature if mtime is not None), default=0)
+        last_modified = datetime.fromtimestamp(newest_mtime // 1_000_000_000, tz=timezone.utc)
+        snapshot = ViewerData(cards_data, images_data, catalog, version, last_modified, navigation_index)
+        if self.on_snapshot:
+            self.on_snapshot(snapshot)
+        return snapshot
+
+    def reload(self, force=False):
+        """Rebuild the snapshot if the data files changed; returns True when a new snapshot was published"""
+        with self._load_lock:
+            signature = self._file_signature()
+            if not force and self._snapshot is not None and signature in (self._signature, self._failed_signature):
+                return False
+            try:
+                snapshot = self._build(signature)
+            except (OSError, ValueError) as e:
+                # A file caught mid-write or invalid JSON: keep serving the previous snapshot
+                if self._snapshot is None:
+                    raise
+                self._failed_signature = signature # Retried once the files change again
+                print(f"⚠️ Data reload failed, keeping version {self._snapshot.version}: {e}")
+                return False
+            self._snapshot = snapshot
+            self._signature = signature
+            print(f"📚 Loaded {len(snapshot.cards_data['cards'])} cards, "
+                  f"{len(snapshot.catalog.list_sets())} builder sets (data version {snapshot.version})")
+            return True
+
+    def preload(self, all_sets=True):
+        """Load the snapshot now without starting the watcher, e.g. in a server's master process before it
+        forks workers: they share the loaded data copy-on-write and each starts its own watcher on first use."""
+        self.preload_sets = all_sets
+        self.reload()
+        return self._snapshot
+
+    def current(self):
+        """Current snapshot or None, without loading anything"""
+        return self._snapshot
+
+    def get(self):
+        """Current snapshot; the first call in a process loads it and starts the file watcher"""
+        if self._watcher_pid != os.getpid():
+            self._start_watcher()
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.reload()
+            snapshot = self._snapshot
+        return snapshot
+
+    def _start_watcher(self):
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+        if self.interval > 0:
+            threading.Thread(target=self._watch, name="viewer-data-watcher", daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️ Data watcher error: {e}")
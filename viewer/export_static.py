@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Static Export - Renders the viewer into a directory that any static file server (nginx, object storage)
+can host: index.html, every card page, and every /api/... JSON response for each navigation mode (the
+indexed ones plus random, with the default prefetch windows), for the lunar cards and every published set.
+
+Images are copied with a content hash in their name (card_1.3f2a9c1e.jpg) and every reference is
+rewritten, so they can be cached forever. Each HTML/JSON file gets .gz and .br siblings when smaller
+(nginx gzip_static / brotli_static). The export is incremental: .export-manifest.json stores a hash of
+each unit's inputs (a card, a navigation order...), and only units whose hash changed are re-rendered.
+
+API responses are written at their URL path without an extension (api/card/3), so the server must send
+them as application/json (nginx: `location /api/ { default_type application/json; }`). Window files hold
+the default before/after, which is what the card page asks for; the query string is ignored by the server.
+
+Usage:
+    python export_static.py [--output dist] [--force]
+    flask --app app export [--output dist] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from app import app, data_provider, cards_summary
+from prerender import compress_variants, dumps
+
+EXPORT_DIR = Path(__file__).resolve().parent / "dist"
+MANIFEST_NAME = ".export-manifest.json"
+EXPORT_FORMAT_VERSION = 3  # Bump when the output layout changes, to force a full re-render
+COMPRESSED_SUFFIXES = (".gz", ".br")
+STATIC_SEED = "static"  # The export has no per-visitor randomness: one random order, the same on every page
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprinted_name(relative_path, digest):
+    path = Path(relative_path)
+    return str(path.with_name(f"{path.stem}.{digest[:8]}{path.suffix}"))
+
+
+def redirect_page(url):
+    return (f'<!DOCTYPE html><html><head><meta charset="UTF-8"><meta http-equiv="refresh" content="0; url={url}">'
+            f'<link rel="canonical" href="{url}"></head><body><a href="{url}">{url}</a></body></html>\n').encode('utf-8')
+
+
+class StaticExporter:
+    """Renders export units, skipping those whose input hash is unchanged since the last export"""
+
+    def __init__(self, output_dir=EXPORT_DIR, force=False):
+        self.output_dir = Path(output_dir)
+        self.force = force
+        self.client = app.test_client()
+        self.data = data_provider.get()
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.stats = {"rendered": 0, "skipped": 0, "removed": 0, "files": 0, "images": 0}
+
+    # Images
+
+    def fingerprint_images(self):
+        """Copy static and builder images under hashed names; returns {original URL: fingerprinted URL}"""
+        url_map = {}
+        sources = [(Path(app.static_folder), "static", "/static/"), (self.data.catalog.images_dir, "media", "/media/")]
+        for source_dir, target_prefix, url_prefix in sources:
+            if not source_dir.is_dir():
+                continue
+            for path in sorted(source_dir.rglob("*")):
+                if not path.is_file() or ":" in path.name:
+                    continue
+                relative = path.relative_to(source_dir).as_posix()
+                hashed = fingerprinted_name(relative, file_hash(path))
+                target = self.output_dir / target_prefix / hashed
+                if not target.exists():
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(path, target)
+                    self.stats["images"] += 1
+                url_map[url_prefix + relative] = url_prefix + hashed
+                if target_prefix == "static":
+                    url_map[relative] = hashed # Lunar card JSON carries image_path relative to /static/
+        return url_map
+
+    # Units
+
+    def fetch(self, url):
+        # Pages embed the seed and random responses follow it (query strings are ignored once static)
+        response = self.client.get(url, query_string={'seed': STATIC_SEED}, headers={'Accept-Encoding': 'identity'})
+        if response.status_code != 200:
+            raise RuntimeError(f"Export of {url} failed with HTTP {response.status_code}")
+        return response.data
+
+    def units(self):
+        """(unit key, inputs, render) triples; render() returns {relative output path: bytes}"""
+        data = self.data
+        fetch = self.fetch
+        sets = data.catalog.list_sets()
+
+        yield "index", sets, lambda: {"index.html": fetch("/")}
+        yield "api-sets", sets, lambda: {"api/sets": fetch("/api/sets")}
+        yield "api-cards-all", cards_summary(data), lambda: {"api/cards/all": fetch("/api/cards/all")}
+
+        for card_id, card in data.cards_by_id.items():
+            yield f"card-{card_id}", card, lambda card_id=card_id: {
+                f"card/{card_id}/index.html": fetch(f"/card/{card_id}"),
+                f"api/card/{card_id}": fetch(f"/api/card/{card_id}"),
+            }
+
+        for nav_type in list(data.navigation_orders) + ["random"]:
+            order = data.navigation_orders.get(nav_type, data.navigation_orders['timeline'])
+            render = lambda nav_type=nav_type, order=order: {
+                path: body for card_id in order for path, body in (
+                    (f"api/navigation/{nav_type}/{card_id}", fetch(f"/api/navigation/{nav_type}/{card_id}")),
+                    (f"api/window/{nav_type}/{card_id}", fetch(f"/api/window/{nav_type}/{card_id}")))}
+            # Windows hold card payloads, so they change with any card
+            yield f"nav-{nav_type}", [order, cards_summary(data), list(data.cards_by_id.values())], render
+
+        for set_info in sets:
+            set_id = set_info['set_id']
+            card_set = data.catalog.get_set(set_id)
+            if not card_set or not len(card_set):
+                continue
+            base = f"/set/{set_id}"
+            yield f"set-{set_id}", card_set.summary(), lambda set_id=set_id, base=base: {
+                f"set/{set_id}/index.html": redirect_page(f"{base}/card/1"),
+                f"api/set/{set_id}/cards": fetch(f"/api/set/{set_id}/cards"),
+            }
+            for card in card_set.cards:
+                number = card['id']
+                yield f"set-{set_id}-card-{number}", card, lambda set_id=set_id, number=number: {
+                    f"set/{set_id}/card/{number}/index.html": fetch(f"/set/{set_id}/card/{number}"),
+                    f"api/set/{set_id}/card/{number}": fetch(f"/api/set/{set_id}/card/{number}"),
+                }
+            for nav_type in list(card_set.navigation_orders) + ["random"]:
+                order = card_set.navigation_orders.get(nav_type, card_set.navigation_orders['timeline'])
+                render = lambda set_id=set_id, nav_type=nav_type, order=order: {
+                    path: body for number in order for path, body in (
+                        (f"api/set/{set_id}/navigation/{nav_type}/{number}",
+                         fetch(f"/api/set/{set_id}/navigation/{nav_type}/{number}")),
+                        (f"api/set/{set_id}/window/{nav_type}/{number}",
+                         fetch(f"/api/set/{set_id}/window/{nav_type}/{number}")))}
+                yield f"set-{set_id}-nav-{nav_type}", [order, card_set.cards], render
+
+    # Output
+
+    def write(self, relative_path, body, url_pattern, url_map):
+        if url_pattern is not None:
+            body = url_pattern.sub(lambda m: url_map[m.group(0)], body.decode('utf-8')).encode('utf-8')
+        path = self.output_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        for suffix, compressed in zip(COMPRESSED_SUFFIXES, compress_variants(body)):
+            variant = path.with_name(path.name + suffix)
+            if compressed is not None:
+                variant.write_bytes(compressed)
+            elif variant.exists():
+                variant.unlink()
+        self.stats["files"] += 1
+
+    def remove(self, relative_path):
+        path = self.output_dir / relative_path
+        for candidate in [path] + [path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES]:
+            if candidate.exists():
+                candidate.unlink()
+
+    def templates_hash(self):
+        template_dir = Path(app.root_path) / app.template_folder
+        return [file_hash(path) for path in sorted(template_dir.glob("*.html"))]
+
+    def run(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        previous = {}
+        if self.manifest_path.exists() and not self.force:
+            manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+            if manifest.get("format") == EXPORT_FORMAT_VERSION:
+                previous = manifest.get("units", {})
+
+        url_map = self.fingerprint_images()
+        url_pattern = re.compile("|".join(re.escape(url) for url in sorted(url_map, key=len, reverse=True))) if url_map else None
+        # Anything every unit depends on: templates and image names
+        base_hash = hashlib.sha256(dumps([EXPORT_FORMAT_VERSION, self.templates_hash(), url_map])).hexdigest()
+
+        units = {}
+        for key, inputs, render in self.units():
+            input_hash = hashlib.sha256(dumps([base_hash, inputs])).hexdigest()
+            old = previous.get(key)
+            if old and old["hash"] == input_hash and all((self.output_dir / p).exists() for p in old["outputs"]):
+                units[key] = old
+                self.stats["skipped"] += 1
+                continue
+            outputs = render()
+            for relative_path, body in outputs.items():
+                self.write(relative_path, body, url_pattern, url_map)
+            if old:
+                for relative_path in set(old["outputs"]) - set(outputs):
+                    self.remove(relative_path)
+            units[key] = {"hash": input_hash, "outputs": sorted(outputs)}
+            self.stats["rendered"] += 1
+
+        for key in set(previous) - set(units):
+            for relative_path in previous[key]["outputs"]:
+                self.remove(relative_path)
+            self.stats["removed"] += 1
+
+        tmp_path = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp_path.write_text(json.dumps({"format": EXPORT_FORMAT_VERSION, "data_version": self.data.version,
+                                        "units": units}, indent=1), encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+        print(f"📦 Static export in {self.output_dir}: {self.stats['rendered']} units rendered "
+              f"({self.stats['files']} files), {self.stats['skipped']} unchanged, {self.stats['removed']} removed, "
+              f"{self.stats['images']} images copied")
+        return self.stats
+
+
+def export_site(output_dir=EXPORT_DIR, force=False):
+    return StaticExporter(output_dir, force).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the viewer as a static site")
+    parser.add_argument("--output", default=str(EXPORT_DIR), help="Output directory (default: viewer/dist)")
+    parser.add_argument("--force", action="store_true", help="Re-render everything, ignoring the manifest")
+    args = parser.parse_args()
+    export_site(args.output, args.force)
+
+
+if __name__ == "__main__":
+    main()
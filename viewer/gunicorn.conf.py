@@ -0,0 +1,35 @@
+"""
+Gunicorn production profile for the viewer:
+    gunicorn -c gunicorn.conf.py
+
+One process per core with a few threads each (handlers are short and read only memory). The app is
+imported once in the master (preload_app) and the workers are forked from it, sharing the data.
+Settings can be overridden with VIEWER_* environment variables or gunicorn command-line flags.
+"""
+
+import gc
+import multiprocessing
+import os
+
+wsgi_app = "wsgi:application"
+bind = os.getenv("VIEWER_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("VIEWER_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.getenv("VIEWER_THREADS", "4"))
+preload_app = True
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+accesslog = os.getenv("VIEWER_ACCESS_LOG") # Off by default; "-" logs to stdout
+errorlog = "-"
+
+
+def when_ready(server):
+    # Data is loaded by now (preload_app). Moving it to the permanent GC generation keeps the workers'
+    # garbage collector from walking, and so copying, the shared pages after fork.
+    gc.freeze()
+    server.log.info(f"Viewer ready: {workers} workers x {threads} threads, {gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} started")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Prerendered Responses - JSON payloads serialized once per data snapshot, with gzip and brotli variants,
+so API requests are answered from ready bytes (no per-request copying, serialization or compression).
+Brotli is optional: without the package only gzip and identity variants are built.
+"""
+
+import gzip
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_BYTES = 512  # Smaller bodies are not worth a Content-Encoding
+GZIP_LEVEL = 9            # Compression runs once per reload, so the slowest/best levels are fine
+BROTLI_QUALITY = 11
+
+
+def dumps(payload):
+    """Compact UTF-8 JSON, keys sorted (same bytes for the same data in every process)"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8') + b"\n"
+
+
+def compress_variants(body):
+    """(gzip bytes or None, brotli bytes or None), each kept only when smaller than body"""
+    gzip_body = br_body = None
+    if len(body) >= MIN_COMPRESS_BYTES:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(body):
+            gzip_body = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+            if len(compressed) < len(body):
+                br_body = compressed
+    return gzip_body, br_body
+
+
+class PrerenderedJSON:
+    """One payload as identity bytes plus the compressed variants that are actually smaller"""
+
+    __slots__ = ("identity", "gzip", "br")
+
+    def __init__(self, payload):
+        self.identity = dumps(payload)
+        self.gzip, self.br = compress_variants(self.identity)
+
+    def select(self, accept_encodings):
+        """(body, content_encoding or None) for a request's Accept-Encoding (werkzeug Accept object)"""
+        if self.br is not None and accept_encodings.quality('br') > 0:
+            return self.br, 'br'
+        if self.gzip is not None and accept_encodings.quality('gzip') > 0:
+            return self.gzip, 'gzip'
+        return self.identity, None
+
+
+def prerender_all(payloads):
+    """{key: payload} -> {key: PrerenderedJSON}"""
+    return {key: PrerenderedJSON(payload) for key, payload in payloads.items()}
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Seeded Order - Random navigation order as a keyed permutation, so a seed always gives the same order
+and no shuffled list is ever built or stored.
+
+Positions 0..n-1 are permuted with a small Feistel network over the smallest 2^(2h) >= n domain, plus
+cycle-walking (re-encrypt until the value falls below n). Both directions are O(1): card at a position
+(forward) and position of a card (inverse), whatever the size of the set.
+"""
+
+import hashlib
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+
+FEISTEL_ROUNDS = 4
+MASK_64 = (1 << 64) - 1
+
+
+@lru_cache(maxsize=1024)
+def round_keys(seed):
+    """64-bit round keys derived from the seed (computed once per seed)"""
+    digest = hashlib.sha256(f"navigation:{seed}".encode('utf-8')).digest()
+    return tuple(int.from_bytes(digest[i * 8:(i + 1) * 8], 'big') for i in range(FEISTEL_ROUNDS))
+
+
+def round_function(value, key):
+    """splitmix64-style mix of a half-block with a round key"""
+    z = (value + key + 0x9E3779B97F4A7C15) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+class SeededPermutation:
+    """Bijection of range(size) determined by seed"""
+
+    __slots__ = ("size", "keys", "half_bits", "half_mask")
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.keys = round_keys(seed)
+        half_bits = 1
+        while (1 << (2 * half_bits)) < size:
+            half_bits += 1
+        self.half_bits = half_bits
+        self.half_mask = (1 << half_bits) - 1
+
+    def _encrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ (round_function(right, key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def _decrypt(self, value):
+        left, right = value >> self.half_bits, value & self.half_mask
+        for key in reversed(self.keys):
+            left, right = right ^ (round_function(left, key) & self.half_mask), left
+        return (left << self.half_bits) | right
+
+    def forward(self, index):
+        """Permuted value of index (0 <= index < size)"""
+        value = self._encrypt(index)
+        while value >= self.size: # Cycle-walking: the domain is at most 4x size, so few steps on average
+            value = self._encrypt(value)
+        return value
+
+    def inverse(self, value):
+        """index such that forward(index) == value"""
+        index = self._decrypt(value)
+        while index >= self.size:
+            index = self._decrypt(index)
+        return index
+
+
+class SeededOrder(Sequence):
+    """A base navigation order, shuffled by seed: order[position] -> card id, and
+    .positions[card id] -> position, both computed on access"""
+
+    def __init__(self, base_order, base_positions, seed):
+        self.base_order = base_order
+        self.permutation = SeededPermutation(len(base_order), seed)
+        self.positions = SeededPositions(self, base_positions)
+
+    def __len__(self):
+        return len(self.base_order)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("position out of range")
+        return self.base_order[self.permutation.forward(position)]
+
+
+class SeededPositions(Mapping):
+    """Card id -> position in a SeededOrder"""
+
+    def __init__(self, order, base_positions):
+        self.order = order
+        self.base_positions = base_positions
+
+    def __getitem__(self, card_id):
+        return self.order.permutation.inverse(self.base_positions[card_id])
+
+    def __contains__(self, card_id):
+        return card_id in self.base_positions
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for production servers:
+    gunicorn -c gunicorn.conf.py            (uses wsgi:application)
+
+Importing this module loads all data, every published builder set and the templates up front, so
+request handlers only read memory. With preload_app the import happens once in the gunicorn master and
+the forked workers share that memory copy-on-write; each worker then runs its own reload watcher.
+"""
+
+from app import app, data_provider
+
+data_provider.preload(all_sets=True)
+for template_name in ('index.html', 'card.html'):
+    app.jinja_env.get_template(template_name)
+
+application = app